@@ -0,0 +1,186 @@
+"""Baked asset cache: decoded, pre-scaled pixel data kept on disk between runs.
+
+Decoding the JPEG/PNG textures, scaling them to TEX_SIZE, building the atlas
+mips and shaded rows and drawing the fallback sprites is the same work on
+every launch. The first run does it (decoding on a thread pool) and writes the
+resulting pixels to ASSET_CACHE_DIR; later runs memory-map those files and
+hand them to pygame.image.frombuffer, so nothing is decoded or rescaled.
+
+Entries are keyed by a hash of what went into them: the source files' content
+(or "missing" for procedural fallbacks), the target size and anything else the
+caller passes, plus FORMAT_VERSION. Edit a texture and its key changes, so the
+entry is rebuilt on the next start; old entries are just never read again
+(`clear` removes them).
+
+    entry    header 4s magic "MWAS", u16 version, u16 width, u16 height, u8 channels (3 RGB / 4 RGBA),
+             7x pad, then width*height*channels pixel bytes
+
+    python asset_cache.py bake      # fill the cache for game.py and maze.py
+    python asset_cache.py info
+    python asset_cache.py clear
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+ASSET_CACHE_DIR = ".asset_cache"
+ASSET_DECODE_WORKERS = 4
+FORMAT_VERSION = 1
+
+MAGIC = b"MWAS"
+HEADER = struct.Struct("<4sHHHB7x")
+FORMATS = {3: "RGB", 4: "RGBA"}
+
+
+def finish(surf, alpha):
+    """convert()/convert_alpha() once a display exists (the cache itself never needs one)."""
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+
+class AssetCache:
+    def __init__(self, directory=ASSET_CACHE_DIR, workers=ASSET_DECODE_WORKERS):
+        self.directory = directory
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self._sources = {}  # path -> (mtime_ns, size, digest)
+        self._maps = []     # mmaps still backing frombuffer surfaces
+
+    # ---- keys ----
+    def source_id(self, path):
+        """Content hash of a source file, or "missing:<path>" when it doesn't exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return "missing:" + path
+        known = self._sources.get(path)
+        if known and known[:2] == (st.st_mtime_ns, st.st_size):
+            return known[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self._sources[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def key(self, *parts):
+        return hashlib.sha1(repr((FORMAT_VERSION,) + parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".px")
+
+    # ---- entries ----
+    def get(self, key):
+        """Cached surface for key, or None. The surface reads straight from the mapped file."""
+        try:
+            with open(self._path(key), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mm) < HEADER.size:
+            mm.close()
+            return None
+        magic, version, w, h, ch = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or ch not in FORMATS \
+                or len(mm) != HEADER.size + w * h * ch:
+            mm.close()
+            return None
+        self._maps.append(mm)
+        self.hits += 1
+        return pygame.image.frombuffer(memoryview(mm)[HEADER.size:], (w, h), FORMATS[ch])
+
+    def put(self, key, surf, alpha=False):
+        """Store surf's pixels (RGBA when alpha, else RGB) under key; temp file + rename."""
+        os.makedirs(self.directory, exist_ok=True)
+        ch = 4 if alpha else 3
+        w, h = surf.get_size()
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, w, h, ch))
+            f.write(pygame.image.tobytes(surf, FORMATS[ch]))
+        os.replace(tmp, path)
+
+    def surfaces(self, items):
+        """[(key, build, alpha)] -> surfaces in order. Misses are built by build() on a thread
+        pool (decode/scale only, no convert) and stored. Nothing is converted here."""
+        out = [self.get(key) for key, _, _ in items]
+        todo = [i for i, s in enumerate(out) if s is None]
+        if not todo:
+            return out
+        self.misses += len(todo)
+        if len(todo) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(min(self.workers, len(todo))) as pool:
+                built = list(pool.map(lambda i: items[i][1](), todo))
+        else:
+            built = [items[i][1]() for i in todo]
+        for i, surf in zip(todo, built):
+            self.put(items[i][0], surf, items[i][2])
+            out[i] = surf
+        return out
+
+    def surface(self, key, build, alpha=False):
+        return self.surfaces([(key, build, alpha)])[0]
+
+    def atlas(self, atlas, textures):
+        """Fill a TextureAtlas from [(name, path, build)]: one cached surface holds the whole
+        built atlas (mips and shaded rows); on a miss the textures are built in parallel."""
+        import atlas as atlas_mod
+        key = self.key("atlas", atlas.tex_size, atlas.levels, atlas_mod.SIDE_SHADE,
+                       tuple((name, self.source_id(path)) for name, path, _ in textures))
+        names = [t[0] for t in textures]
+        surf = self.get(key)
+        if surf is not None:
+            atlas.adopt(names, finish(surf, False))
+            return
+        self.misses += 1
+        if self.workers > 1:
+            with ThreadPoolExecutor(min(self.workers, len(textures))) as pool:
+                built = list(pool.map(lambda t: t[2](), textures))
+        else:
+            built = [t[2]() for t in textures]
+        for name, surf in zip(names, built):
+            atlas.add(name, finish(surf, False))
+        atlas.build()
+        self.put(key, atlas.surface)
+
+    # ---- maintenance ----
+    def entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith(".px"))
+
+    def clear(self):
+        for path in self.entries():
+            os.remove(path)
+
+
+def bake():
+    """Populate the cache the way game.py and maze.py would on start-up (no window needed)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import game
+    import maze
+    game.init_display()
+    for name in game.SPRITE_FILES:
+        game.sprite(name)
+    maze.init_display()
+    return game.ASSETS, maze.ASSETS
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args == ["bake"]:
+        for c in bake():
+            print(f"{c.directory}: {c.hits} cached, {c.misses} baked")
+    elif args == ["info"]:
+        entries = AssetCache().entries()
+        print(f"{ASSET_CACHE_DIR}: {len(entries)} entries, {sum(os.path.getsize(p) for p in entries)} bytes")
+    elif args == ["clear"]:
+        AssetCache().clear()
+    else:
+        print(__doc__)
@@ -0,0 +1,102 @@
+"""Wall texture atlas: materials packed into one surface with mips and shaded copies.
+
+Layout: every material owns two rows of height `tex_size` (lit, then y-side
+shaded). Inside a row the mip chain runs left to right: level 0 at x=0, level
+1 at x=size, level 2 at x=size+size/2, ... so the atlas is 2*size wide.
+Slots are subsurfaces of the one atlas surface, so nothing is copied per frame.
+"""
+import pygame
+
+SIDE_SHADE = 195    # y-side faces are multiplied by 195/255, same as the old 60-alpha black overlay
+MIN_MIP_SIZE = 4
+
+
+class TextureAtlas:
+    def __init__(self, tex_size):
+        self.tex_size = tex_size
+        self.levels = 1
+        while (tex_size >> self.levels) >= MIN_MIP_SIZE:
+            self.levels += 1
+        self.names = []
+        self._sources = []
+        self.surface = None
+        self._slots = {}  # (material, shaded, level) -> subsurface
+
+    def add(self, name, surf):
+        """Register a texture and return its material id."""
+        if surf.get_size() != (self.tex_size, self.tex_size):
+            surf = pygame.transform.smoothscale(surf, (self.tex_size, self.tex_size))
+        self.names.append(name)
+        self._sources.append(surf)
+        if self.surface is not None:
+            self.build()
+        return len(self.names) - 1
+
+    def material(self, name):
+        return self.names.index(name)
+
+    def build(self):
+        size = self.tex_size
+        fmt = self._sources[0] if self._sources else None
+        atlas = pygame.Surface((2 * size, 2 * size * max(1, len(self._sources))), 0, fmt) if fmt \
+            else pygame.Surface((2 * size, 2 * size))
+        for mat, src in enumerate(self._sources):
+            for shaded in (0, 1):
+                row_y = (2 * mat + shaded) * size
+                level_img = src.copy()
+                if shaded:
+                    level_img.fill((SIDE_SHADE,) * 3, special_flags=pygame.BLEND_MULT)
+                x = 0
+                for level in range(self.levels):
+                    s = size >> level
+                    if level:
+                        level_img = pygame.transform.smoothscale(level_img, (s, s))
+                    atlas.blit(level_img, (x, row_y))
+                    x += s
+        self._index(atlas)
+
+    def adopt(self, names, surface):
+        """Use an atlas surface built earlier (e.g. by the asset cache) for `names`."""
+        size = self.tex_size
+        if surface.get_size() != (2 * size, 2 * size * max(1, len(names))):
+            raise ValueError("atlas surface doesn't match the material count / texture size")
+        self.names = list(names)
+        self._sources = [surface.subsurface(pygame.Rect(0, 2 * mat * size, size, size)).copy()
+                         for mat in range(len(names))]
+        self._index(surface)
+
+    def _index(self, atlas):
+        size = self.tex_size
+        slots = {}
+        for mat in range(len(self._sources)):
+            for shaded in (0, 1):
+                row_y = (2 * mat + shaded) * size
+                x = 0
+                for level in range(self.levels):
+                    s = size >> level
+                    slots[(mat, shaded, level)] = atlas.subsurface(pygame.Rect(x, row_y, s, s))
+                    x += s
+        self.surface = atlas
+        self._slots = slots
+
+    def mip_level(self, line_h):
+        """Smallest mip still at least as tall as the on-screen column."""
+        level = 0
+        s = self.tex_size >> 1
+        while level + 1 < self.levels and s >= line_h:
+            level += 1
+            s >>= 1
+        return level
+
+    def slot(self, material, shaded, level=0):
+        return self._slots[(material, 1 if shaded else 0, level)]
+
+    def texture_for(self, material, shaded, line_h):
+        """(slot surface, level) to sample for a column `line_h` pixels tall."""
+        level = self.mip_level(line_h)
+        return self._slots[(material, 1 if shaded else 0, level)], level
+
+    def slot_rect(self, material, shaded, level=0):
+        """Position of a slot inside `surface` (for array-based renderers)."""
+        return pygame.Rect(self._slots[(material, 1 if shaded else 0, level)].get_offset(),
+                           (self.tex_size >> level,) * 2)
@@ -0,0 +1,240 @@
+"""Headless end-to-end frame benchmark for game.py and maze.py.
+
+Each scene runs in its own process under SDL's dummy video driver (no
+window), flies the camera along a scripted path through the map and times
+every subsystem separately, and records the scene's startup (module import,
+display + texture init, first frame). Results go to a JSON file so runs on
+different commits can be diffed.
+
+    python bench.py [--frames 300] [--warmup 20] [--out bench.json]
+                    [--scenes game:map2.txt,game:map.txt,maze:31,maze:63,maze:127]
+
+Scene specs are `game:<map file>` or `maze:<size>` (a generated size x size maze).
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import deque
+
+DEFAULT_SCENES = "game:map2.txt,game:map.txt,maze:31,maze:63,maze:127"
+BENCH_SEED = 1234
+WALK_SPEED = 0.08    # cells per frame along the path
+SWEEP = 0.6          # radians the view swings either side of the walking direction
+GAME_ENTITY_FILES = {"map.txt": "map_ents.txt", "map2.txt": "map_ents2.txt"}
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+# =========================
+# Camera paths
+# =========================
+def camera_path(grid, start, frames):
+    """[(x, y, ang)] per frame: walk from start to the furthest reachable floor cell
+    and back along the shortest path, sweeping the view side to side."""
+    h = len(grid); w = len(grid[0])
+    prev = {start: None}
+    q = deque([start])
+    last = start
+    while q:
+        last = cx, cy = q.popleft()
+        for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if 0 <= nx < w and 0 <= ny < h and grid[ny][nx] == 0 and (nx, ny) not in prev:
+                prev[(nx, ny)] = (cx, cy)
+                q.append((nx, ny))
+    cells = []
+    c = last
+    while c is not None:
+        cells.append(c); c = prev[c]
+    cells.reverse()
+    out = []
+    if len(cells) < 2:
+        x, y = start[0] + 0.5, start[1] + 0.5
+        return [(x, y, (i * 0.03) % (2 * math.pi)) for i in range(frames)]
+    pts = [(x + 0.5, y + 0.5) for x, y in cells]
+    pts += pts[-2::-1]  # and back again
+    seg = 0; t = 0.0
+    for i in range(frames):
+        (x0, y0), (x1, y1) = pts[seg], pts[seg + 1]
+        ang = math.atan2(y1 - y0, x1 - x0) + SWEEP * math.sin(i * 0.05)
+        out.append((x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, ang % (2 * math.pi)))
+        t += WALK_SPEED
+        while t >= 1.0:
+            t -= 1.0
+            seg = (seg + 1) % (len(pts) - 1)
+    return out
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}
+
+    def timed(self, name, fn, *args):
+        t0 = time.perf_counter()
+        res = fn(*args)
+        self.samples.setdefault(name, []).append((time.perf_counter() - t0) * 1000.0)
+        return res
+
+    def summary(self, skip):
+        out = {}
+        frame = None
+        for name, ms in self.samples.items():
+            ms = ms[skip:]
+            frame = ms if frame is None else [a + b for a, b in zip(frame, ms)]
+            out[name] = stats(ms)
+        out["frame"] = stats(frame or [])
+        return out
+
+
+def stats(ms):
+    if not ms:
+        return {}
+    s = sorted(ms)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {"mean_ms": round(sum(s) / len(s), 4), "p50_ms": round(pick(0.50), 4),
+            "p95_ms": round(pick(0.95), 4), "p99_ms": round(pick(0.99), 4),
+            "max_ms": round(s[-1], 4)}
+
+
+# =========================
+# Scenes (run inside the child process)
+# =========================
+def run_game(map_path, frames, warmup):
+    import random
+    random.seed(BENCH_SEED)
+    import pygame
+    import game
+    game.init_display()
+    game.DYNRES_ENABLED = False
+    game.BASE_MAP[:] = game.load_map(map_path)
+    game.update_map_dimensions(); game.map_changed(); game.rebuild_materials()
+    ents = GAME_ENTITY_FILES.get(os.path.basename(map_path))
+    if ents and os.path.exists(ents):
+        game.load_entities(ents)
+    else:
+        game.clear_entities()
+    game.reset_run_from_map()
+    start = (int(game.player_pos.x), int(game.player_pos.y))
+    path = camera_path(game.BASE_MAP, start, frames + warmup)
+    zbuf = (game.raycast.np.full(game.SCREEN_W, game.MAX_VIEW_DIST) if game.raycast.HAVE_NUMPY
+            else [game.MAX_VIEW_DIST] * game.SCREEN_W)
+    tm = Timings()
+    for x, y, ang in path:
+        game.player_pos.update(x, y); game.player_ang = ang
+        game.player_health = game.START_HEALTH; game.died = False
+        game.snap_camera()
+        tm.timed("cast", game.cast_and_draw, zbuf, game.screen)
+        tm.timed("sprites", game.render_sprites, zbuf, game.screen)
+        tm.timed("minimap", game.draw_minimap)
+        tm.timed("hud", game.draw_hud)
+        tm.timed("ai", sim_step, game)
+        tm.timed("present", pygame.display.flip)
+        if "first_frame" not in game.STARTUP_MS:
+            game.report_startup()
+    return {"map": map_path, "map_size": [game.MAP_W, game.MAP_H], "enemies": len(game.enemies),
+            "view": [game.SCREEN_W, game.SCREEN_H], "startup": game.STARTUP_MS, "timings": tm.summary(warmup)}
+
+
+def sim_step(game):
+    game.update_enemies(game.SIM_DT)
+    game.try_pickups()
+
+
+def run_maze(size, frames, warmup):
+    import random
+    random.seed(BENCH_SEED)
+    import pygame
+    import maze
+    maze.init_display()
+    maze.RNG_SEED = BENCH_SEED
+    maze.new_level(size, size)
+    path = camera_path(maze.BASE_MAP, (int(maze.player_pos.x), int(maze.player_pos.y)), frames + warmup)
+    tm = Timings()
+    for i, (x, y, ang) in enumerate(path):
+        maze.player_pos.update(x, y); maze.player_ang = ang
+        phase_idx = int((i / 60.0) // maze.PHASE_PERIOD)
+        grid = tm.timed("morph", maze.view_grid, x, y, phase_idx)
+        tm.timed("cast", maze.cast_and_draw, phase_idx, grid)
+        tm.timed("minimap", maze.draw_minimap, grid)
+        tm.timed("hud", maze.draw_hud)
+        tm.timed("present", pygame.display.flip)
+        if "first_frame" not in maze.STARTUP_MS:
+            maze.report_startup()
+    return {"maze_size": size, "map_size": [maze.MAP_W, maze.MAP_H],
+            "view": [maze.SCREEN_W, maze.SCREEN_H], "startup": maze.STARTUP_MS, "timings": tm.summary(warmup)}
+
+
+def run_scene(spec, frames, warmup):
+    kind, _, arg = spec.partition(":")
+    if kind == "game":
+        res = run_game(arg or "map2.txt", frames, warmup)
+    elif kind == "maze":
+        res = run_maze(int(arg or 31), frames, warmup)
+    else:
+        raise SystemExit(f"unknown scene {spec!r}")
+    res["scene"] = spec
+    res["frames"] = frames
+    return res
+
+
+# =========================
+# Driver
+# =========================
+def meta():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    for mod in ("pygame", "numpy"):
+        try:
+            info[mod] = __import__(mod).__version__
+        except ImportError:
+            info[mod] = None
+    try:
+        info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                        text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+    return info
+
+
+def main(args):
+    def opt(name, default):
+        return type(default)(args[args.index(name) + 1]) if name in args else default
+
+    frames = opt("--frames", 300); warmup = opt("--warmup", 20)
+    if "--child" in args:
+        # one scene per process: game.py and maze.py each own the display and module state
+        with open(opt("--result", ""), "w") as f:
+            json.dump(run_scene(opt("--child", ""), frames, warmup), f)
+        return
+    out_path = opt("--out", "bench.json")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {"meta": meta(), "scenes": []}
+    results["meta"].update(frames=frames, warmup=warmup)
+    tmp = out_path + ".part"
+    for spec in opt("--scenes", DEFAULT_SCENES).split(","):
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", spec, "--result", os.path.abspath(tmp),
+               "--frames", str(frames), "--warmup", str(warmup)]
+        proc = subprocess.run(cmd, cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(f"{spec}: failed\n{proc.stderr}", file=sys.stderr)
+            results["scenes"].append({"scene": spec, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        with open(tmp) as f:
+            res = json.load(f)
+        results["scenes"].append(res)
+        t = res["timings"]
+        parts = "  ".join(f"{k} {v['mean_ms']:.2f}" for k, v in t.items() if k != "frame")
+        print(f"{spec:<16} frame {t['frame']['mean_ms']:7.2f} ms (p95 {t['frame']['p95_ms']:.2f})  {parts}"
+              f"  | first frame {res['startup']['first_frame']:.0f} ms")
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+"""Bounded LRU cache of prescaled 1-pixel texture columns.
+
+The wall renderers used to subsurface + transform.scale every visible column
+every frame. Columns are now keyed by (texture, tex_x, quantized height) and
+reused until they fall out of the LRU, so a still or slow camera mostly costs
+dictionary lookups.
+"""
+from collections import OrderedDict
+
+import pygame
+
+COLUMN_CACHE_BYTES = 32 * 1024 * 1024  # default memory ceiling
+COLUMN_CACHE_MAX_H = 4096              # taller columns (face pressed to a wall) are scaled uncached
+
+
+def quantize_height(h):
+    """Round h to a step that grows with h (exact below 64px, ~3% error above).
+
+    Nearby distances then share one cached column instead of missing on every
+    sub-pixel change in wall distance.
+    """
+    if h < 64:
+        return max(1, h)
+    step = 1 << (h.bit_length() - 6)
+    return ((h + step // 2) // step) * step
+
+
+class ColumnCache:
+    def __init__(self, max_bytes=COLUMN_CACHE_BYTES, max_h=COLUMN_CACHE_MAX_H):
+        self.max_bytes = max_bytes
+        self.max_h = max_h
+        self._cols = OrderedDict()  # key -> (surface, nbytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def column(self, tex, tex_x, line_h):
+        """Scaled column of `tex` at `tex_x`; its height is quantize_height(line_h)."""
+        h = quantize_height(line_h)
+        if h > self.max_h:
+            self.bypassed += 1
+            return _scale_column(tex, tex_x, h)
+        key = (tex, tex_x, h)
+        entry = self._cols.get(key)
+        if entry is not None:
+            self._cols.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        col = _scale_column(tex, tex_x, h)
+        nbytes = h * col.get_bytesize()
+        self._cols[key] = (col, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes and self._cols:
+            _, (_, old) = self._cols.popitem(last=False)
+            self.bytes -= old
+            self.evictions += 1
+        return col
+
+    def set_limit(self, max_bytes):
+        self.max_bytes = max_bytes
+        while self.bytes > self.max_bytes and self._cols:
+            _, (_, old) = self._cols.popitem(last=False)
+            self.bytes -= old
+            self.evictions += 1
+
+    def clear(self):
+        self._cols.clear()
+        self.bytes = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = self.bypassed = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"entries": len(self._cols), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "bypassed": self.bypassed, "hit_rate": self.hit_rate()}
+
+    def summary(self):
+        return (f"columns {len(self._cols)}  {self.bytes / 1048576:.1f}/{self.max_bytes / 1048576:.0f} MB  "
+                f"hit {self.hit_rate() * 100:.1f}%  ({self.hits} hit / {self.misses} miss / {self.evictions} evict)")
+
+
+def _scale_column(tex, tex_x, h):
+    column = tex.subsurface(pygame.Rect(tex_x, 0, 1, tex.get_height()))
+    return pygame.transform.scale(column, (1, h))
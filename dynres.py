@@ -0,0 +1,56 @@
+"""Dynamic resolution: pick the 3D view scale needed to hold a frame-time budget.
+
+Feed it the CPU time each frame took (not the clock.tick delay), read back
+`scale`, render the view at view_size() and upscale to the window.
+"""
+import math
+from collections import deque
+
+DYNRES_WINDOW = 20      # frames averaged per decision
+DYNRES_HEADROOM = 0.80  # step back up only when frames come in under 80% of budget
+DYNRES_STEP = 0.05      # scale granularity (keeps the framebuffer from being reallocated every frame)
+
+
+class DynamicResolution:
+    def __init__(self, target_fps=60, min_scale=0.5, max_scale=1.0, window=DYNRES_WINDOW):
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale = max_scale
+        self.samples = deque(maxlen=window)
+        self.set_target_fps(target_fps)
+
+    def set_target_fps(self, fps):
+        self.target_fps = fps
+        self.budget_ms = 1000.0 / fps
+        self.samples.clear()
+
+    def set_limits(self, min_scale, max_scale):
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale = self._quantize(self.scale)
+
+    def frame(self, frame_ms):
+        """Record one frame's work time; returns True when the scale changed."""
+        self.samples.append(frame_ms)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        avg = sum(self.samples) / len(self.samples)
+        scale = self.scale
+        if avg > self.budget_ms:
+            # raycast/blit cost is roughly linear in pixel count, i.e. scale squared
+            scale *= math.sqrt(self.budget_ms / avg)
+        elif avg < self.budget_ms * DYNRES_HEADROOM:
+            scale += DYNRES_STEP
+        scale = self._quantize(scale)
+        self.samples.clear()
+        if scale != self.scale:
+            self.scale = scale
+            return True
+        return False
+
+    def _quantize(self, scale):
+        scale = round(scale / DYNRES_STEP) * DYNRES_STEP
+        return max(self.min_scale, min(self.max_scale, round(scale, 3)))
+
+    def view_size(self, w, h):
+        return max(16, int(w * self.scale)), max(16, int(h * self.scale))
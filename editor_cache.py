@@ -0,0 +1,86 @@
+"""Chunked surface cache and icon cache for the map editor view.
+
+The editor grid is drawn as EDITOR_CHUNK x EDITOR_CHUNK tile blocks. Each block
+is rendered once into its own surface (by a callback supplied by the game) and
+reused until a tile or entity inside it is marked dirty or the zoom changes.
+Only blocks overlapping the window are drawn; blocks that scroll out of view
+are evicted least-recently-used under a memory ceiling.
+"""
+from collections import OrderedDict
+
+import pygame
+
+EDITOR_CHUNK = 16                 # tiles per chunk side
+EDITOR_CHUNK_CACHE_MB = 64        # ceiling for cached chunk surfaces
+
+
+class ChunkCache:
+    def __init__(self, render, chunk=EDITOR_CHUNK, max_bytes=EDITOR_CHUNK_CACHE_MB * 1024 * 1024):
+        self.render = render  # render(x0, y0, w, h, cell_px) -> Surface for that tile block
+        self.chunk = chunk
+        self.max_bytes = max_bytes
+        self.cell_px = None
+        self.bytes = 0
+        self.renders = 0
+        self._surfs = OrderedDict()  # (cx, cy) -> (surface, nbytes)
+
+    def clear(self):
+        self._surfs.clear()
+        self.bytes = 0
+
+    def mark(self, x, y):
+        """Tile (x, y) changed: its chunk is re-rendered next time it is drawn."""
+        entry = self._surfs.pop((x // self.chunk, y // self.chunk), None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def draw(self, target, origin_x, origin_y, map_w, map_h, cell_px):
+        """Blit the chunks of a map_w x map_h grid whose top-left lands at origin
+        that overlap `target`; returns how many chunks were drawn."""
+        if cell_px != self.cell_px:
+            self.clear()
+            self.cell_px = cell_px
+        n = self.chunk
+        size = n * cell_px
+        tw, th = target.get_size()
+        cx0 = max(0, -origin_x // size); cy0 = max(0, -origin_y // size)
+        cx1 = min((map_w - 1) // n, (tw - 1 - origin_x) // size)
+        cy1 = min((map_h - 1) // n, (th - 1 - origin_y) // size)
+        surfs = self._surfs
+        drawn = 0
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                key = (cx, cy)
+                entry = surfs.get(key)
+                if entry is None:
+                    x0 = cx * n; y0 = cy * n
+                    surf = self.render(x0, y0, min(n, map_w - x0), min(n, map_h - y0), cell_px)
+                    entry = (surf, surf.get_width() * surf.get_height() * surf.get_bytesize())
+                    surfs[key] = entry
+                    self.bytes += entry[1]
+                    self.renders += 1
+                else:
+                    surfs.move_to_end(key)
+                target.blit(entry[0], (origin_x + cx * size, origin_y + cy * size))
+                drawn += 1
+        while self.bytes > self.max_bytes and len(surfs) > drawn:
+            _, (_, old) = surfs.popitem(last=False)
+            self.bytes -= old
+        return drawn
+
+
+class IconCache:
+    """Entity icons smooth-scaled once per zoom level."""
+
+    def __init__(self):
+        self.size = None
+        self._icons = {}
+
+    def get(self, surf, size):
+        if size != self.size:
+            self._icons.clear()
+            self.size = size
+        icon = self._icons.get(surf)
+        if icon is None:
+            icon = self._icons[surf] = pygame.transform.smoothscale(surf, (size, size))
+        return icon
@@ -0,0 +1,193 @@
+"""Undo/redo journal and background saving for the map editor.
+
+Every edit the editor makes between begin() and end() (one mouse stroke, one
+delete) becomes a single command. Tile changes are kept as sorted cell
+indices run-length encoded into (start, length) pairs plus the old and new
+tile/material bytes, so a long drag stroke costs a few bytes per cell.
+Entity changes keep each touched cell's state before and after. Commands are
+dropped oldest-first once the journal passes its memory cap.
+
+BackgroundSaver writes a snapshot of the level on a worker thread, so saving
+never blocks the frame; writers use temp files + os.replace so a save is
+either complete or not there at all.
+"""
+import threading
+import time
+from array import array
+from collections import deque
+
+EDITOR_UNDO_MB = 16  # journal memory cap (undo + redo)
+
+
+class Command:
+    __slots__ = ("runs", "old_tiles", "old_mats", "new_tiles", "new_mats", "entities")
+
+    def __init__(self, runs, old_tiles, old_mats, new_tiles, new_mats, entities):
+        self.runs = runs            # array('I'): start, length, start, length, ...
+        self.old_tiles = old_tiles  # bytes, one per cell in run order
+        self.old_mats = old_mats
+        self.new_tiles = new_tiles
+        self.new_mats = new_mats
+        self.entities = entities    # [(x, y, state_before, state_after)]
+
+    def cells(self):
+        """Cell indices in the same order as the tile/material bytes."""
+        runs = self.runs
+        for k in range(0, len(runs), 2):
+            yield from range(runs[k], runs[k] + runs[k + 1])
+
+    @property
+    def nbytes(self):
+        return 96 + 4 * len(self.runs) + 4 * len(self.old_tiles) + 64 * len(self.entities)
+
+
+def encode_runs(indices):
+    """Sorted unique indices -> array('I') of (start, length) pairs."""
+    runs = array("I")
+    start = prev = None
+    for i in indices:
+        if prev is not None and i == prev + 1:
+            prev = i
+            continue
+        if start is not None:
+            runs.extend((start, prev - start + 1))
+        start = prev = i
+    if start is not None:
+        runs.extend((start, prev - start + 1))
+    return runs
+
+
+class Journal:
+    def __init__(self, tile_state, entity_state, max_bytes=EDITOR_UNDO_MB * 1024 * 1024):
+        """tile_state(i) -> (tile, material) of flat cell i; entity_state(x, y) -> hashable
+        description of everything placed on that cell."""
+        self.tile_state = tile_state
+        self.entity_state = entity_state
+        self.max_bytes = max_bytes
+        self.done = deque()
+        self.undone = []
+        self.bytes = 0
+        self.rev = 0  # bumped on every change to the level made through the journal
+        self.saved_rev = 0  # rev when the level last matched what's on disk
+        self._tiles = None  # open command: {cell index: (tile, material) before}
+        self._ents = None   # open command: {(x, y): state before}
+
+    def clear(self):
+        """Forget all history (the level was replaced wholesale); the new level counts as clean."""
+        self.done.clear(); self.undone.clear()
+        self.bytes = 0
+        self._tiles = self._ents = None
+        self.saved_rev = self.rev
+
+    def mark_saved(self, rev=None):
+        """The level as of rev (default: now) is on disk. Called once a save has finished,
+        so a failed write leaves the level dirty; never moves back to an older rev."""
+        self.saved_rev = max(self.saved_rev, self.rev if rev is None else rev)
+
+    @property
+    def dirty(self):
+        """True when there are edits since the last clear() or mark_saved()."""
+        return self.rev != self.saved_rev
+
+    # ---- recording ----
+    def begin(self):
+        if self._tiles is None:
+            self._tiles = {}; self._ents = {}
+
+    def tile(self, i):
+        """Call before cell i changes."""
+        self.begin()
+        if i not in self._tiles:
+            self._tiles[i] = self.tile_state(i)
+
+    def entity(self, x, y):
+        """Call before the entities on (x, y) change."""
+        self.begin()
+        if (x, y) not in self._ents:
+            self._ents[(x, y)] = self.entity_state(x, y)
+
+    def end(self):
+        """Close the open command; returns it, or None when it changed nothing."""
+        tiles, ents = self._tiles, self._ents
+        self._tiles = self._ents = None
+        if tiles is None:
+            return None
+        order = sorted(i for i, old in tiles.items() if self.tile_state(i) != old)
+        entities = [(x, y, old, self.entity_state(x, y)) for (x, y), old in ents.items()]
+        entities = [e for e in entities if e[2] != e[3]]
+        if not order and not entities:
+            return None
+        after = [self.tile_state(i) for i in order]
+        cmd = Command(encode_runs(order), bytes(tiles[i][0] for i in order), bytes(tiles[i][1] for i in order),
+                      bytes(t for t, _ in after), bytes(m for _, m in after), entities)
+        self.done.append(cmd)
+        self.bytes += cmd.nbytes
+        for c in self.undone:
+            self.bytes -= c.nbytes
+        self.undone.clear()
+        while self.bytes > self.max_bytes and len(self.done) > 1:
+            self.bytes -= self.done.popleft().nbytes
+        self.rev += 1
+        return cmd
+
+    # ---- undo / redo ----
+    def undo(self):
+        """Command to revert (apply its old_* side), or None."""
+        self.end()
+        if not self.done:
+            return None
+        cmd = self.done.pop()
+        self.undone.append(cmd)
+        self.rev += 1
+        return cmd
+
+    def redo(self):
+        """Command to re-apply (its new_* side), or None."""
+        self.end()
+        if not self.undone:
+            return None
+        cmd = self.undone.pop()
+        self.done.append(cmd)
+        self.rev += 1
+        return cmd
+
+
+class BackgroundSaver:
+    """Runs save(snapshot) on a worker thread; requests made while a save is running
+    are coalesced into one follow-up save of the newest snapshot."""
+
+    def __init__(self, save):
+        self.save = save
+        self.busy = False
+        self.last_error = None
+        self.saves = 0
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def submit(self, snapshot):
+        with self._lock:
+            if self.busy:
+                self._pending = snapshot
+                return
+            self.busy = True
+        threading.Thread(target=self._run, args=(snapshot,), daemon=True).start()
+
+    def _run(self, snapshot):
+        while snapshot is not None:
+            try:
+                self.save(snapshot)
+                self.saves += 1
+            except Exception as exc:  # keep the editor running; report on the console
+                self.last_error = exc
+                print(f"Background save failed: {exc}")
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    self.busy = False
+
+    def wait(self, timeout=None):
+        """Block until the current save finishes (used on exit and in scripts)."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.busy and (end is None or time.monotonic() < end):
+            time.sleep(0.01)
+        return not self.busy
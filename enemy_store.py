@@ -0,0 +1,254 @@
+"""Struct-of-arrays enemy store: every enemy's state lives in NumPy arrays.
+
+One update() call moves the whole population with array operations (chase,
+wander, patrol and the axis-separated wall slide), instead of a Python loop
+doing Vector2 maths per enemy. EnemyRef objects stand in for SpriteEnt where
+the rest of the game (spatial index, sprites, hitscan, minimap) expects an
+object with .pos/.hp/.alive.
+
+Requires NumPy.
+"""
+import random
+
+import pygame
+
+import raycast
+
+np = raycast.np
+
+CHASER, WANDER, PATROL = 0, 1, 2
+BEHAVIOR_CODES = {"chaser": CHASER, "wander": WANDER, "patrol": PATROL}
+MAX_PATROL_POINTS = 4
+TOUCH_RANGE = 0.6
+TOUCH_COOLDOWN = 0.8
+
+
+class EnemyRef:
+    """Per-enemy handle onto an EnemyStore row (SpriteEnt-compatible attributes)."""
+    __slots__ = ("store", "i", "surf", "kind", "enemy_type", "minimap_color", "behavior")
+
+    def __init__(self, store, i, surf, enemy_type, minimap_color, behavior):
+        self.store = store
+        self.i = i
+        self.surf = surf
+        self.kind = "enemy"
+        self.enemy_type = enemy_type
+        self.minimap_color = minimap_color
+        self.behavior = behavior
+
+    @property
+    def pos(self):
+        return pygame.Vector2(self.store.x[self.i], self.store.y[self.i])
+
+    def draw_pos(self, alpha):
+        """Position interpolated between the last snapshot() and now."""
+        s = self.store; i = self.i
+        return pygame.Vector2(s.prev_x[i] + (s.x[i] - s.prev_x[i]) * alpha,
+                              s.prev_y[i] + (s.y[i] - s.prev_y[i]) * alpha)
+
+    @property
+    def hp(self):
+        return int(self.store.hp[self.i])
+
+    @hp.setter
+    def hp(self, v):
+        self.store.hp[self.i] = v
+
+    @property
+    def alive(self):
+        return bool(self.store.alive[self.i])
+
+    @alive.setter
+    def alive(self, v):
+        self.store.alive[self.i] = v
+
+
+class EnemyStore:
+    def __init__(self, n):
+        if np is None:
+            raise RuntimeError("EnemyStore needs numpy")
+        self.count = n
+        self.x = np.zeros(n); self.y = np.zeros(n)
+        self.prev_x = np.zeros(n); self.prev_y = np.zeros(n)  # positions at the last snapshot()
+        self.hp = np.zeros(n, dtype=np.int32)
+        self.speed = np.zeros(n)
+        self.detect = np.zeros(n)
+        self.cooldown = np.zeros(n)
+        self.behavior = np.zeros(n, dtype=np.int8)
+        self.alive = np.ones(n, dtype=bool)
+        self.wander_dx = np.zeros(n); self.wander_dy = np.zeros(n)
+        self.wander_t = np.zeros(n)
+        self.points = np.zeros((n, MAX_PATROL_POINTS, 2))
+        self.npoints = np.ones(n, dtype=np.int32)
+        self.pidx = np.zeros(n, dtype=np.int32)
+        self.refs = []
+        # seeded from `random` so runs stay reproducible under random.seed()
+        self.rng = np.random.default_rng(random.getrandbits(32))
+
+    @classmethod
+    def from_placements(cls, xs, ys, type_ids, types, tiles):
+        """Store for enemies placed at cell centres straight from placement columns.
+
+        types[type_id] is (surf, enemy_type, hp, speed, detect, minimap_color, behavior);
+        tiles is the whole level's (h, w) tile array, used to pick patrol waypoints.
+        """
+        n = len(xs)
+        store = cls(n)
+        tid = np.asarray(type_ids, dtype=np.intp)
+        store.x[:] = np.asarray(xs, dtype=np.float64) + 0.5
+        store.y[:] = np.asarray(ys, dtype=np.float64) + 0.5
+        if types:
+            store.hp[:] = np.array([t[2] for t in types], dtype=np.int32)[tid]
+            store.speed[:] = np.array([t[3] for t in types])[tid]
+            store.detect[:] = np.array([t[4] for t in types])[tid]
+            store.behavior[:] = np.array([BEHAVIOR_CODES.get(t[6], CHASER) for t in types], dtype=np.int8)[tid]
+        wander = np.flatnonzero(store.behavior == WANDER)
+        if wander.size:
+            ang = store.rng.uniform(0.0, 2 * np.pi, wander.size)
+            store.wander_dx[wander] = np.cos(ang); store.wander_dy[wander] = np.sin(ang)
+        store.points[:, 0, 0] = store.x; store.points[:, 0, 1] = store.y
+        patrol = np.flatnonzero(store.behavior == PATROL)
+        if patrol.size:
+            store._pick_patrol_points(patrol, tiles)
+        refs = store.refs
+        for i, t in enumerate(type_ids):
+            surf, enemy_type, _, _, _, color, behavior = types[t]
+            refs.append(EnemyRef(store, i, surf, enemy_type, color, behavior))
+        store.snapshot()
+        return store
+
+    def __len__(self):
+        return self.count
+
+    def snapshot(self):
+        self.prev_x[:] = self.x; self.prev_y[:] = self.y
+
+    def update(self, dt, px, py, tiles, los, cell_size, flow=None, origin=(0, 0), lookup=None, awake=None):
+        """Advance every enemy by dt toward/around the player at (px, py).
+
+        tiles is the (h, w) tile array (non-zero blocks) whose [0, 0] is the
+        world cell `origin`; cells outside it are read through lookup(xs, ys)
+        -> tile ids (a streamed world's tiles_many) or block when there is none.
+        los(x0, y0, x1, y1) is a cell line-of-sight test and flow an
+        up-to-date FlowField (optional). awake is an optional bool mask; enemies
+        outside it stay put (their cooldowns still run down).
+        Returns (touch_hits, refs) where refs are the enemies that moved into a
+        different cell_size bucket.
+        """
+        n = self.count
+        if not n:
+            return 0, []
+        x = self.x; y = self.y
+        np.maximum(self.cooldown - dt, 0.0, out=self.cooldown)
+        tx = px - x; ty = py - y
+        dist = np.hypot(tx, ty)
+        act = self.alive & (dist >= 0.001)
+        if awake is not None:
+            act &= awake
+
+        # line of sight once per occupied cell rather than once per enemy
+        detected = act & (dist < self.detect)
+        cand = np.flatnonzero(detected)
+        if cand.size:
+            keys = (y[cand].astype(np.int64) << 32) | x[cand].astype(np.int64)
+            cells, inv = np.unique(keys, return_inverse=True)
+            pcx, pcy = int(px), int(py)
+            seen = np.array([los(int(k & 0xFFFFFFFF), int(k >> 32), pcx, pcy) for k in cells], dtype=bool)
+            detected[cand] = seen[inv.ravel()]
+
+        beh = self.behavior
+        engaged = detected
+        if flow is not None:
+            fx, fy, pdist, fok = flow.steer_many(x, y)
+            # chasers hunt by path distance, so walls between them and the player don't stop them
+            engaged = detected | (act & (beh == CHASER) & (pdist <= self.detect))
+        safe = np.where(act, dist, 1.0)
+        dirx = np.where(engaged, tx / safe, 0.0)
+        diry = np.where(engaged, ty / safe, 0.0)
+        if flow is not None:
+            use = engaged & fok
+            dirx[use] = fx[use]; diry[use] = fy[use]
+
+        wander = act & (beh == WANDER) & ~engaged
+        self.wander_t[wander] -= dt
+        reroll = np.flatnonzero(wander & (self.wander_t <= 0))
+        if reroll.size:
+            v = self.rng.uniform(-1.0, 1.0, (reroll.size, 2))
+            norm = np.hypot(v[:, 0], v[:, 1])
+            v /= np.where(norm > 0, norm, 1.0)[:, None]
+            self.wander_dx[reroll] = v[:, 0]; self.wander_dy[reroll] = v[:, 1]
+            self.wander_t[reroll] = self.rng.uniform(1.0, 2.4, reroll.size)
+        dirx[wander] = self.wander_dx[wander]; diry[wander] = self.wander_dy[wander]
+
+        pat = np.flatnonzero(act & (beh == PATROL) & ~engaged)
+        if pat.size:
+            dx, dy = self._patrol_delta(pat)
+            arrived = np.hypot(dx, dy) < 0.2
+            if arrived.any():
+                a = pat[arrived]
+                self.pidx[a] = (self.pidx[a] + 1) % self.npoints[a]
+                dx, dy = self._patrol_delta(pat)
+            dlen = np.hypot(dx, dy)
+            ok = dlen > 0.001
+            dlen[~ok] = 1.0
+            dirx[pat] = np.where(ok, dx / dlen, 0.0); diry[pat] = np.where(ok, dy / dlen, 0.0)
+
+        m = np.flatnonzero(act & (engaged | (beh != CHASER)))
+        moved = []
+        if m.size:
+            step = self.speed[m] * dt
+            ox = x[m]; oy = y[m]
+            # axis-separated slide: x first, then y against the updated x
+            nx = ox + dirx[m] * step
+            cx = np.where(_blocked(tiles, nx, oy, origin, lookup), ox, nx)
+            ny = oy + diry[m] * step
+            cy = np.where(_blocked(tiles, cx, ny, origin, lookup), oy, ny)
+            x[m] = cx; y[m] = cy
+            inv_cell = 1.0 / cell_size
+            crossed = ((np.floor(ox * inv_cell) != np.floor(cx * inv_cell)) |
+                       (np.floor(oy * inv_cell) != np.floor(cy * inv_cell)))
+            refs = self.refs
+            moved = [refs[i] for i in m[crossed].tolist()]
+
+        hit = act & (dist < TOUCH_RANGE) & (self.cooldown <= 0.0)
+        hits = int(np.count_nonzero(hit))
+        if hits:
+            self.cooldown[hit] = TOUCH_COOLDOWN
+        return hits, moved
+
+    def _pick_patrol_points(self, idx, tiles, reach=3):
+        """Up to MAX_PATROL_POINTS random floor cells within `reach` of each enemy in idx
+        (enemies with fewer than two to choose from keep their spawn point)."""
+        off = np.arange(-reach, reach + 1)
+        dy, dx = np.meshgrid(off, off, indexing="ij")
+        cx = self.x[idx].astype(np.int64)[:, None] + dx.ravel()
+        cy = self.y[idx].astype(np.int64)[:, None] + dy.ravel()
+        h, w = tiles.shape
+        ok = (cx >= 0) & (cy >= 0) & (cx < w) & (cy < h)
+        ok[ok] = tiles[cy[ok], cx[ok]] == 0
+        keys = self.rng.random(ok.shape)
+        keys[~ok] = 2.0  # shuffle the floor cells to the front
+        pick = np.argsort(keys, axis=1)[:, :MAX_PATROL_POINTS]
+        rows = np.arange(len(idx))[:, None]
+        count = np.minimum(ok.sum(axis=1), MAX_PATROL_POINTS)
+        use = count >= 2
+        self.points[idx[use], :, 0] = cx[rows, pick][use] + 0.5
+        self.points[idx[use], :, 1] = cy[rows, pick][use] + 0.5
+        self.npoints[idx[use]] = count[use]
+
+    def _patrol_delta(self, idx):
+        tgt = self.points[idx, self.pidx[idx]]
+        return tgt[:, 0] - self.x[idx], tgt[:, 1] - self.y[idx]
+
+
+def _blocked(tiles, fx, fy, origin=(0, 0), lookup=None):
+    """Per-point blocking test; points outside tiles go to lookup, or count as blocked."""
+    h, w = tiles.shape
+    ix = fx.astype(np.int64) - origin[0]; iy = fy.astype(np.int64) - origin[1]  # truncates like int()
+    inside = (ix >= 0) & (iy >= 0) & (ix < w) & (iy < h)
+    out = ~inside
+    out[inside] = tiles[iy[inside], ix[inside]] != 0
+    if lookup is not None and out.any():
+        o = np.flatnonzero(~inside)
+        out[o] = lookup(ix[o] + origin[0], iy[o] + origin[1]) != 0
+    return out
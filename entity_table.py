@@ -0,0 +1,214 @@
+"""Columnar entity placements: kind, enemy type, x, y as typed arrays.
+
+A level's placements load and save in bulk instead of line by line:
+
+    binary (.mwe)  header 4s magic "MWEN", u16 version, u16 type count, u32 row count
+                   type names, each u8 length + utf-8 bytes
+                   columns kind[u8 * n], etype[u8 * n], x[u32 * n], y[u32 * n]
+    text           the original one-placement-per-line format (spawn x y / enemy type x y /
+                   ammo x y / medkit x y)
+
+etype indexes `types` (enemy type names) and is 0 for non-enemies. With NumPy,
+filtering against the tile grid and splitting by kind are array operations.
+"""
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+KIND_ENEMY, KIND_AMMO, KIND_MEDKIT, KIND_SPAWN = 0, 1, 2, 3
+KIND_NAMES = ("enemy", "ammo", "medkit", "spawn")
+KIND_CODES = {name: i for i, name in enumerate(KIND_NAMES)}
+
+MAGIC = b"MWEN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+
+
+class EntityTable:
+    def __init__(self, types=()):
+        self.types = list(types)  # enemy type names
+        self.kind = array("B")
+        self.etype = array("B")
+        self.x = array("I")
+        self.y = array("I")
+
+    def __len__(self):
+        return len(self.kind)
+
+    def type_id(self, name):
+        try:
+            return self.types.index(name)
+        except ValueError:
+            if len(self.types) >= 256:
+                raise ValueError("at most 256 enemy types")
+            self.types.append(name)
+            return len(self.types) - 1
+
+    def add(self, kind, x, y, etype=None):
+        self.kind.append(kind)
+        self.etype.append(self.type_id(etype) if etype is not None else 0)
+        self.x.append(x)
+        self.y.append(y)
+
+    def extend(self, kind, cells, etype=None):
+        """Append many (x, y) cells of one kind (and one enemy type)."""
+        cells = list(cells)
+        n = len(cells)
+        self.kind.extend(array("B", (kind,)) * n)
+        self.etype.extend(array("B", (self.type_id(etype) if etype is not None else 0,)) * n)
+        self.x.extend(c[0] for c in cells)
+        self.y.extend(c[1] for c in cells)
+
+    def take(self, idx):
+        """New table with the rows at idx (sequence of ints), sharing the type list."""
+        out = EntityTable(self.types)
+        if np is not None:
+            idx = np.asarray(idx, dtype=np.intp)
+            for name, col in self.columns().items():
+                getattr(out, name).frombytes(col[idx].tobytes())
+        else:
+            for name in ("kind", "etype", "x", "y"):
+                src = getattr(self, name)
+                getattr(out, name).extend(src[i] for i in idx)
+        return out
+
+    def columns(self):
+        """{name: zero-copy ndarray} for kind, etype, x, y (needs numpy)."""
+        return {"kind": np.frombuffer(self.kind, dtype=np.uint8), "etype": np.frombuffer(self.etype, dtype=np.uint8),
+                "x": np.frombuffer(self.x, dtype=np.uint32), "y": np.frombuffer(self.y, dtype=np.uint32)}
+
+    @classmethod
+    def from_cells(cls, enemies, ammo, medkits, spawn=None, types=()):
+        """Build from the editor's placement model: {(x, y): enemy type}, ammo and medkit
+        cell sets and an optional spawn cell."""
+        t = cls(types)
+        ids = {name: t.type_id(name) for name in dict.fromkeys(enemies.values())}
+        if spawn is not None:
+            t.add(KIND_SPAWN, *spawn)
+        t.kind.extend(array("B", (KIND_ENEMY,)) * len(enemies))
+        t.etype.extend(ids[name] for name in enemies.values())
+        t.x.extend(c[0] for c in enemies); t.y.extend(c[1] for c in enemies)
+        t.extend(KIND_AMMO, ammo)
+        t.extend(KIND_MEDKIT, medkits)
+        return t
+
+    def to_cells(self):
+        """(enemies, ammo, medkits, spawn) in the from_cells shapes; later rows win."""
+        xs, ys, ets = self.select(KIND_ENEMY)
+        types = self.types
+        enemies = dict(zip(zip(xs, ys), [types[e] for e in ets]))
+        ammo = set(zip(*self.select(KIND_AMMO)[:2]))
+        medkits = set(zip(*self.select(KIND_MEDKIT)[:2]))
+        sx, sy, _ = self.select(KIND_SPAWN)
+        return enemies, ammo, medkits, ((sx[-1], sy[-1]) if sx else None)
+
+    # ---- queries ----
+    def on_floor(self, tiles, width, height):
+        """Rows whose cell lies inside width x height and is floor (0) in tiles:
+        an (h, w) ndarray, or anything indexable as tiles[y][x] without numpy."""
+        if np is not None:
+            c = self.columns()
+            x = c["x"].astype(np.intp); y = c["y"].astype(np.intp)
+            ok = (x < width) & (y < height)
+            ok[ok] = np.asarray(tiles)[y[ok], x[ok]] == 0
+            return self.take(np.flatnonzero(ok))
+        keep = [i for i, (x, y) in enumerate(zip(self.x, self.y)) if x < width and y < height and tiles[y][x] == 0]
+        return self.take(keep)
+
+    def select(self, kind):
+        """(xs, ys, etypes) lists for one kind, in table order."""
+        if np is not None:
+            c = self.columns()
+            idx = np.flatnonzero(c["kind"] == kind)
+            return c["x"][idx].tolist(), c["y"][idx].tolist(), c["etype"][idx].tolist()
+        rows = [i for i, k in enumerate(self.kind) if k == kind]
+        return [self.x[i] for i in rows], [self.y[i] for i in rows], [self.etype[i] for i in rows]
+
+    # ---- binary ----
+    def save(self, path):
+        names = [t.encode() for t in self.types]
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(names), len(self)))
+            for b in names:
+                f.write(bytes((len(b),)) + b)
+            for col in (self.kind, self.etype, self.x, self.y):
+                f.write(_little_endian(col).tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            buf = f.read()
+        if len(buf) < HEADER.size:
+            raise ValueError(f"{path}: not an entity file")
+        magic, version, ntypes, n = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an entity file")
+        if version > VERSION:
+            raise ValueError(f"{path}: format version {version} is newer than {VERSION}")
+        pos = HEADER.size
+        types = []
+        for _ in range(ntypes):
+            ln = buf[pos]
+            types.append(buf[pos + 1:pos + 1 + ln].decode())
+            pos += 1 + ln
+        t = cls(types)
+        if len(buf) - pos != n * 10:
+            raise ValueError(f"{path}: expected {n} rows")
+        for col, size in ((t.kind, 1), (t.etype, 1), (t.x, 4), (t.y, 4)):
+            col.frombytes(buf[pos:pos + n * size])
+            if sys.byteorder != "little":
+                col.byteswap()
+            pos += n * size
+        return t
+
+    # ---- text ----
+    def save_text(self, path):
+        """Original text format: spawn first, then enemies, ammo, medkits, each sorted by cell."""
+        order = (KIND_SPAWN, KIND_ENEMY, KIND_AMMO, KIND_MEDKIT)
+        rows = sorted(zip(self.kind, self.x, self.y, self.etype), key=lambda r: (order.index(r[0]), r[1], r[2]))
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            for k, x, y, et in rows:
+                if k == KIND_ENEMY:
+                    f.write(f"enemy {self.types[et]} {x} {y}\n")
+                else:
+                    f.write(f"{KIND_NAMES[k]} {x} {y}\n")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_text(cls, path, default_type="grunt"):
+        t = cls()
+        kind = t.kind; etype = t.etype; xs = t.x; ys = t.y
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                k = KIND_CODES.get(parts[0])
+                if k is None:
+                    continue
+                if k == KIND_ENEMY and len(parts) == 4:
+                    et = t.type_id(parts[1]); sx, sy = parts[2], parts[3]  # enemy type x y
+                elif len(parts) == 3:
+                    et = t.type_id(default_type) if k == KIND_ENEMY else 0; sx, sy = parts[1], parts[2]
+                else:
+                    continue
+                if sx.isdigit() and sy.isdigit():
+                    kind.append(k); etype.append(et); xs.append(int(sx)); ys.append(int(sy))
+        return t
+
+
+def _little_endian(col):
+    if sys.byteorder == "little" or col.itemsize == 1:
+        return col
+    out = array(col.typecode, col)
+    out.byteswap()
+    return out
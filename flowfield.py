@@ -0,0 +1,134 @@
+"""Shared BFS flow field toward the player for enemy pathing.
+
+One breadth-first search from the player's cell over open cells gives every
+cell its path distance and the next cell to step to, so any number of enemies
+steer around walls with an O(1) lookup instead of running their own search.
+The search is bounded to a square window of `radius` cells around the player
+(nothing further away is chasing anyway), and only reruns when the player
+changes cell or the map revision changes.
+"""
+from array import array
+from collections import deque
+
+import raycast
+
+np = raycast.np
+
+FLOW_RADIUS = 24
+UNREACHED = 0xFFFF
+NO_STEP = 255
+# 4 orthogonal steps first so ties prefer them; diagonals need both side cells open
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+
+class FlowField:
+    def __init__(self, blocked, radius=FLOW_RADIUS):
+        self.blocked = blocked  # blocked(mx, my) -> bool, out-of-map counts as blocked
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.origin = (0, 0)
+        self.key = None
+        self.dist = array("H", [UNREACHED]) * (self.size * self.size)
+        self.step = bytearray([NO_STEP]) * (self.size * self.size)
+        self.builds = 0
+
+    def update(self, cx, cy, rev):
+        """Rebuild for the player in cell (cx, cy) if it or the map changed; True when rebuilt."""
+        if self.key == (cx, cy, rev):
+            return False
+        self.build(cx, cy)
+        self.key = (cx, cy, rev)
+        return True
+
+    def invalidate(self):
+        self.key = None
+
+    def build(self, cx, cy):
+        r = self.radius; n = self.size
+        x0 = cx - r; y0 = cy - r
+        self.origin = (x0, y0)
+        blocked = self.blocked
+        open_ = bytearray(n * n)
+        for j in range(n):
+            row = j * n
+            for i in range(n):
+                if not blocked(x0 + i, y0 + j):
+                    open_[row + i] = 1
+        dist = array("H", [UNREACHED]) * (n * n)
+        step = bytearray([NO_STEP]) * (n * n)
+        self.dist = dist; self.step = step
+        self.builds += 1
+        start = r * n + r
+        if not open_[start]:
+            return
+        dist[start] = 0
+        order = [start]
+        q = deque(order)
+        while q:
+            k = q.popleft()
+            d = dist[k] + 1
+            j, i = divmod(k, n)
+            for kk, ok in ((k - 1, i > 0), (k + 1, i < n - 1), (k - n, j > 0), (k + n, j < n - 1)):
+                if ok and open_[kk] and dist[kk] == UNREACHED:
+                    dist[kk] = d
+                    order.append(kk)
+                    q.append(kk)
+        # each reached cell points at its lowest-distance neighbour
+        for k in order[1:]:
+            j, i = divmod(k, n)
+            best = dist[k]; best_s = NO_STEP
+            for s, (dx, dy) in enumerate(STEPS):
+                ii = i + dx; jj = j + dy
+                if not (0 <= ii < n and 0 <= jj < n):
+                    continue
+                if dx and dy and not (open_[j * n + ii] and open_[jj * n + i]):
+                    continue
+                dd = dist[jj * n + ii]
+                if dd < best:
+                    best = dd; best_s = s
+            step[k] = best_s
+
+    def _index(self, mx, my):
+        i = mx - self.origin[0]; j = my - self.origin[1]
+        if 0 <= i < self.size and 0 <= j < self.size:
+            return j * self.size + i
+        return None
+
+    def path_dist(self, mx, my):
+        """Steps from cell (mx, my) to the player's cell, or None when unreachable/out of range."""
+        k = self._index(mx, my)
+        if k is None or self.dist[k] == UNREACHED:
+            return None
+        return self.dist[k]
+
+    def steer(self, x, y):
+        """Unit vector from world position (x, y) toward the centre of the next cell on the
+        path, or None when there is no path (or already in the player's cell)."""
+        k = self._index(int(x), int(y))
+        if k is None or self.step[k] == NO_STEP:
+            return None
+        dx, dy = STEPS[self.step[k]]
+        tx = int(x) + dx + 0.5 - x; ty = int(y) + dy + 0.5 - y
+        d = (tx * tx + ty * ty) ** 0.5
+        if d < 1e-6:
+            return None
+        return tx / d, ty / d
+
+    def steer_many(self, x, y):
+        """Vectorized steer(): (dir_x, dir_y, path_dist, ok) arrays for positions x, y.
+        path_dist is UNREACHED where there is no path; ok marks rows with a direction."""
+        n = self.size
+        ix = x.astype(np.int64); iy = y.astype(np.int64)
+        i = ix - self.origin[0]; j = iy - self.origin[1]
+        inside = (i >= 0) & (i < n) & (j >= 0) & (j < n)
+        k = np.where(inside, j * n + i, 0)
+        dist = np.where(inside, np.frombuffer(self.dist, dtype=np.uint16)[k], UNREACHED).astype(np.int64)
+        step = np.where(inside, np.frombuffer(self.step, dtype=np.uint8)[k], NO_STEP)
+        ok = step != NO_STEP
+        offs = np.array(STEPS + ((0, 0),), dtype=np.float64)
+        s = np.where(ok, step, len(STEPS))
+        tx = ix + offs[s, 0] + 0.5 - x; ty = iy + offs[s, 1] + 0.5 - y
+        d = np.hypot(tx, ty)
+        ok &= d > 1e-6
+        d = np.where(ok, d, 1.0)
+        return tx / d, ty / d, dist, ok
@@ -1,8 +1,30 @@
 import math
 import sys
 import random
+import time
+IMPORT_STARTED = time.perf_counter()  # startup is reported after the first frame
 import pygame
 import os
+from operator import itemgetter
+from collections import namedtuple
+from array import array
+import raycast
+from column_cache import ColumnCache
+from atlas import TextureAtlas
+from dynres import DynamicResolution
+from sprite_cache import SpriteScaleCache, visible_spans
+from spatial import SpatialGrid
+from los import LOSCache
+from enemy_store import EnemyStore, CHASER
+from flowfield import FlowField
+from profiler import Profiler
+from editor_cache import ChunkCache, IconCache
+import mapfile
+from tilegrid import TileGrid
+from streaming import ChunkedWorld
+from entity_table import EntityTable, KIND_ENEMY, KIND_AMMO, KIND_MEDKIT
+from editor_journal import Journal, BackgroundSaver
+from asset_cache import AssetCache, finish
 
 # =========================
 # Config
@@ -16,12 +38,40 @@ MOVE_SPEED = 3.4
 SPRINT_MULT = 1.6
 TURN_SPEED = 2.2
 DEADZONE = 0.12
+SIM_HZ = 60              # fixed simulation rate; rendering interpolates between ticks
+SIM_DT = 1.0 / SIM_HZ
+SIM_MAX_STEPS = 5        # ticks allowed to catch up after a stalled frame (the rest is dropped)
+SIM_TICKS_PER_FRAME = 0  # >0: run exactly this many ticks per rendered frame instead of real time
 TEX_SIZE = 64
+VECTOR_RAYCAST = True  # cast all columns at once with NumPy when available
+COLUMN_CACHE_MB = 32   # memory ceiling for prescaled wall columns
+ASSET_CACHE_DIR = ".asset_cache"  # baked textures/sprites (asset_cache.py); rebuilt when sources change
+
+# Dynamic resolution: the 3D view renders into a smaller framebuffer when frames run over budget
+DYNRES_ENABLED = True
+DYNRES_TARGET_FPS = 60
+DYNRES_MIN_SCALE = 0.5   # quality floor (fraction of SCREEN_W x SCREEN_H)
+DYNRES_MAX_SCALE = 1.0   # quality ceiling
+PARALLEL_RENDER_WORKERS = 0  # >0: draw walls in that many worker processes (needs numpy)
+
+# Profiler (F3 overlay, F4 dump CSV, F5 cProfile the next PROFILE_CAPTURE_FRAMES frames)
+PROFILE_SCOPES = ("cast_and_draw", "render_sprites", "draw_minimap", "draw_hud",
+                  "update_enemies", "try_pickups", "editor_draw")
+PROFILE_CAPTURE_FRAMES = 120
 
 # Map defaults (no generator)
 MAP_W, MAP_H = 33, 25
-MAP_SAVE_PATH = "map2.txt"
+MAP_SAVE_PATH = "map2.mwm"   # editor Ctrl+S / Ctrl+L: binary, keeps heights and materials
+MAP_ASCII_PATH = "map2.txt"  # older ASCII map, loaded until MAP_SAVE_PATH exists
 ENT_SAVE_PATH = "map_ents2.txt"
+ENT_BINARY_EXT = ".mwe"  # entity paths with this extension use the binary columnar format (entity_table.py)
+MAP_BINARY_EXT = ".mwm"  # save/load paths with this extension use the binary layered format (mapfile.py)
+MAP_MAX_DIM = 4096      # editor resize limit
+STREAM_MIN_CELLS = 2048 * 2048  # .mwm maps bigger than this stream in chunks (streaming.py) instead of loading whole
+STREAM_CHUNK = 64
+STREAM_BUDGET_MB = 32
+STREAM_REGION_CHUNKS = math.ceil(MAX_VIEW_DIST / STREAM_CHUNK)  # region reaches past the view distance
+STREAM_ROAM_CHUNKS = STREAM_REGION_CHUNKS + 4  # roamers this many chunks from the player keep moving; farther ones freeze
 
 # Minimap
 MINIMAP_MARGIN = 10
@@ -31,6 +81,7 @@ MINIMAP_FLOOR = (150, 150, 160)
 MINIMAP_DOOR = (230, 200, 60)
 MINIMAP_PLAYER = (255, 70, 90)
 MINIMAP_FOV = (255, 255, 255)
+MINIMAP_MAX_PX = 220  # larger maps show a window of this size that scrolls with the player
 
 # Heights
 PLAYER_HEIGHT_FT = 6.0
@@ -48,6 +99,8 @@ ENEMY_TOUCH_DAMAGE = 6
 ENEMY_HP = 40
 ENEMY_SPEED = 1.6
 ENEMY_DETECT_RANGE = 20.0
+SPATIAL_CELL = 4.0       # bucket size (world units) for the enemy/pickup spatial index
+ENEMY_SOA = True         # batched NumPy enemy update (thousands of enemies); per-object loop without numpy
 # Additional enemy type base stats (multipliers / overrides)
 ENEMY_TYPES = {
     # id: (display_name, hp, speed, detect_range, color_on_minimap, behavior)
@@ -57,7 +110,9 @@ ENEMY_TYPES = {
     "brute": ("Brute", int(ENEMY_HP*2.0), ENEMY_SPEED*0.9, ENEMY_DETECT_RANGE*0.8, (255,60,120), "patrol"),
 }
 DEFAULT_ENEMY_TYPE = "grunt"
+ENEMY_MAX_DETECT = max(t[3] for t in ENEMY_TYPES.values())
 CURRENT_ENEMY_TYPE = DEFAULT_ENEMY_TYPE  # editor selection
+FLOW_RADIUS = int(ENEMY_MAX_DETECT) + 2  # cells searched around the player for enemy pathing
 
 # If you don't place any enemies/pickups, these fallbacks kick in:
 FALLBACK_ENEMIES_COUNT = 10
@@ -73,18 +128,43 @@ CURSOR_COLOR = (255, 255, 255)
 CELL_PX_DEFAULT = 24
 EDITOR_MIN_CELL = 8
 EDITOR_MAX_CELL = 48
+AUTOSAVE_SECONDS = 30    # background autosave interval while the level has unsaved edits
+AUTOSAVE_MAP_PATH = "autosave.mwm"
+AUTOSAVE_ENT_PATH = "autosave.mwe"
 
 # =========================
 # Init
 # =========================
-pygame.init()
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-pygame.display.set_caption("Microwave Raycaster (Play / Edit)")
-clock = pygame.time.Clock()
-HUD_FONT = pygame.font.SysFont(None, 20)
-SMALL_FONT = pygame.font.SysFont(None, 16)
-TITLE_FONT = pygame.font.SysFont(None, 48)
-MENU_FONT = pygame.font.SysFont(None, 26)
+# Importing this module opens no window and loads no images, so tools, tests and
+# worker processes can use the map/entity/simulation code headless. The window,
+# fonts and wall textures come up in init_display() (main() and the draw entry
+# points call it); sprites load one by one through sprite() on first use.
+screen = None
+clock = None
+HUD_FONT = SMALL_FONT = TITLE_FONT = MENU_FONT = None
+PROFILER = Profiler()
+STARTUP_MS = {}  # import / display init / first frame, milliseconds since IMPORT_STARTED
+
+def init_display():
+    """Open the window and load fonts and wall textures (once); returns the screen."""
+    global screen, clock, HUD_FONT, SMALL_FONT, TITLE_FONT, MENU_FONT
+    if screen is not None:
+        return screen
+    t0 = time.perf_counter()
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("Microwave Raycaster (Play / Edit)")
+    pygame.event.set_grab(False)
+    pygame.mouse.set_visible(True)
+    clock = pygame.time.Clock()
+    HUD_FONT = pygame.font.SysFont(None, 20)
+    SMALL_FONT = pygame.font.SysFont(None, 16)
+    TITLE_FONT = pygame.font.SysFont(None, 48)
+    MENU_FONT = pygame.font.SysFont(None, 26)
+    load_textures()
+    load_sprites()
+    STARTUP_MS["display"] = (time.perf_counter() - t0) * 1000
+    return screen
 
 # =========================
 # Assets / placeholders
@@ -103,56 +183,119 @@ def checker(size, a, b):
             s.fill(a if ((x//tile + y//tile) & 1)==0 else b, pygame.Rect(x,y,tile,tile))
     return s
 
-def load_tex(path, size=TEX_SIZE, alpha=False, fallback=None):
+# Loaders decode and scale only (they run on the asset cache's decode threads);
+# finish() converts to the display format afterwards.
+def load_tex(path, size=TEX_SIZE, fallback=None):
     try:
-        img = pygame.image.load(path).convert_alpha() if alpha else pygame.image.load(path).convert()
-        return pygame.transform.scale(img, (size, size))
+        return pygame.transform.scale(pygame.image.load(path), (size, size))
     except Exception:
         return pygame.transform.scale(fallback or checker(size, (90,90,100), (60,60,70)), (size, size))
 
 def load_sprite(path, base_color):
     size = 64
     try:
-        img = pygame.image.load(path).convert_alpha()
-        return pygame.transform.scale(img, (size, size))
+        return pygame.transform.scale(pygame.image.load(path), (size, size))
     except:
         s = pygame.Surface((size, size), pygame.SRCALPHA)
         pygame.draw.circle(s, base_color, (size//2, size//2), size//2)
         pygame.draw.circle(s, (0,0,0,180), (size//2, size//2), size//2, 2)
         return s
 
-stone = load_tex("cobblestone.png", TEX_SIZE, False, checker(TEX_SIZE,(120,120,130),(90,90,100)))
-brick = load_tex("brick.jpg", TEX_SIZE, False, checker(TEX_SIZE,(150,70,70),(110,40,40)))
-wood  = load_tex("wood.jpeg", TEX_SIZE, False, checker(TEX_SIZE,(120,90,60),(90,60,40)))
-door_red = load_tex("red.png", TEX_SIZE, False, solid(TEX_SIZE,(200,40,40)))
-door_blue= load_tex("blue.png", TEX_SIZE, False, solid(TEX_SIZE,(40,40,200)))
-
-SPRITE_ENEMY  = load_sprite("enemy.png", (240, 80, 200))  # fallback / generic
-SPRITE_AMMO   = load_sprite("pickup_ammo.png", (250, 230, 80))
-SPRITE_MEDKIT = load_sprite("pickup_medkit.png", (120, 220, 120))
-HUD_PISTOL    = load_sprite("pistol.png", (180, 180, 180))
-MUZZLE_FLASH  = load_sprite("muzzle.png", (255, 240, 200))
-
-# Per-type enemy sprites (attempt to load individual files, fallback to colored circles)
-ENEMY_SPRITES = {
-    "grunt": load_sprite("enemy_grunt.png", (240, 80, 200)),
-    "scout": load_sprite("enemy_scout.png", (255, 200, 120)),
-    "brute": load_sprite("enemy_brute.png", (255, 60, 120)),
+# Sprites by name: (file, fallback circle colour); enemy types use their type name
+SPRITE_FILES = {
+    "enemy":  ("enemy.png", (240, 80, 200)),  # fallback / generic
+    "ammo":   ("pickup_ammo.png", (250, 230, 80)),
+    "medkit": ("pickup_medkit.png", (120, 220, 120)),
+    "pistol": ("pistol.png", (180, 180, 180)),
+    "muzzle": ("muzzle.png", (255, 240, 200)),
+    "grunt":  ("enemy_grunt.png", (240, 80, 200)),
+    "scout":  ("enemy_scout.png", (255, 200, 120)),
+    "brute":  ("enemy_brute.png", (255, 60, 120)),
 }
+SPRITES = {}  # name -> Surface, loaded on first use
+ASSETS = AssetCache(ASSET_CACHE_DIR)
+
+def sprite_asset(name):
+    """(cache key, build, alpha) for the asset cache."""
+    path, color = SPRITE_FILES[name] if name in SPRITE_FILES else SPRITE_FILES["enemy"]
+    return ASSETS.key("sprite", 64, ASSETS.source_id(path), color), lambda: load_sprite(path, color), True
+
+def sprite(name):
+    surf = SPRITES.get(name)
+    if surf is None:
+        surf = SPRITES[name] = finish(ASSETS.surface(*sprite_asset(name)), True)
+    return surf
+
+def load_sprites():
+    """Every sprite in SPRITE_FILES at once (cache misses decode in parallel)."""
+    names = [n for n in SPRITE_FILES if n not in SPRITES]
+    for name, surf in zip(names, ASSETS.surfaces([sprite_asset(n) for n in names])):
+        SPRITES[name] = finish(surf, True)
+
+COLUMN_CACHE = ColumnCache(COLUMN_CACHE_MB * 1024 * 1024)
+
+# Wall/door textures live in one atlas (mips + pre-shaded y-side copies); tiles refer to them by
+# material id. Ids are fixed so material maps can be built before any texture is loaded.
+ATLAS = TextureAtlas(TEX_SIZE)
+MATERIAL_TEXTURES = (  # (name, file, fallback), in material id order
+    ("stone", "cobblestone.png", lambda: checker(TEX_SIZE,(120,120,130),(90,90,100))),
+    ("brick", "brick.jpg", lambda: checker(TEX_SIZE,(150,70,70),(110,40,40))),
+    ("wood", "wood.jpeg", lambda: checker(TEX_SIZE,(120,90,60),(90,60,40))),
+    ("door_red", "red.png", lambda: solid(TEX_SIZE,(200,40,40))),
+    ("door_blue", "blue.png", lambda: solid(TEX_SIZE,(40,40,200))),
+)
+MAT_STONE, MAT_BRICK, MAT_WOOD, MAT_DOOR_RED, MAT_DOOR_BLUE = range(len(MATERIAL_TEXTURES))
+WALL_MATERIALS = (MAT_STONE, MAT_BRICK, MAT_WOOD)
+
+def load_textures():
+    """Fill the atlas from the asset cache, baking it on a miss (call after the display is up)."""
+    if ATLAS.names: return
+    ASSETS.atlas(ATLAS, [(name, path, lambda path=path, fallback=fallback: load_tex(path, TEX_SIZE, fallback()))
+                         for name, path, fallback in MATERIAL_TEXTURES])
+
+def wall_material(mx, my):
+    return WALL_MATERIALS[(mx + my) % 3]
+
+def door_material(mx, my):
+    return MAT_DOOR_RED if ((mx ^ my) & 1) == 0 else MAT_DOOR_BLUE
+
+def default_material(t, mx, my):
+    return door_material(mx, my) if t == 2 else wall_material(mx, my)
+
+def default_material_block(tiles, x0, y0, w, h):
+    """default_material for a w x h block of tiles (flat bytes) whose corner is cell (x0, y0)."""
+    if not raycast.HAVE_NUMPY:
+        return bytes(default_material(tiles[r*w + c], x0 + c, y0 + r) for r in range(h) for c in range(w))
+    np = raycast.np
+    t = np.frombuffer(tiles, dtype=np.uint8).reshape(h, w)
+    ys, xs = np.ogrid[y0:y0+h, x0:x0+w]
+    walls = np.array(WALL_MATERIALS, dtype=np.uint8)[(xs + ys) % 3]
+    doors = np.where(((xs ^ ys) & 1) == 0, MAT_DOOR_RED, MAT_DOOR_BLUE)
+    return np.where(t == 2, doors, walls).astype(np.uint8).tobytes()
+
+def clamp_materials(mats, tiles, x0, y0, w, h):
+    """Replace material ids the atlas doesn't have, in place (mats: bytearray for a w x h
+    block of tiles whose corner is cell (x0, y0)), with default_material."""
+    n = len(MATERIAL_TEXTURES)
+    if not raycast.HAVE_NUMPY:
+        for i, m in enumerate(mats):
+            if m >= n: mats[i] = default_material(tiles[i], x0 + i % w, y0 + i // w)
+        return
+    np = raycast.np
+    m = np.frombuffer(mats, dtype=np.uint8)
+    bad = m >= n
+    if bad.any():
+        m[bad] = np.frombuffer(default_material_block(tiles, x0, y0, w, h), dtype=np.uint8)[bad]
 
-def pick_wall_texture(mx, my):
-    s = (mx + my) % 3
-    return stone if s==0 else (brick if s==1 else wood)
-
-def pick_door_texture(mx, my):
-    return door_red if ((mx ^ my) & 1) == 0 else door_blue
+def build_material_map(grid):
+    return [[default_material(t, x, y) for x, t in enumerate(row)] for y, row in enumerate(grid)]
 
 # =========================
 # Map storage (no generator)
 # Tiles: 0=floor, 1=wall, 2=door
 # =========================
 def make_blank_map(w, h):
-    grid = [[0 for _ in range(w)] for _ in range(h)]
+    grid = TileGrid(w, h)
     # perimeter walls
     for x in range(w):
         grid[0][x] = 1
@@ -171,23 +314,68 @@ def clamp(v, lo, hi): return max(lo, min(hi, v))
 def resize_map(grid, new_w, new_h):
     old_h = len(grid); old_w = len(grid[0])
     new_grid = make_blank_map(new_w, new_h)
-    for y in range(min(old_h, new_h)):
-        for x in range(min(old_w, new_w)):
-            # keep old interior where possible
-            if 0 < y < new_h-1 and 0 < x < new_w-1:
-                new_grid[y][x] = grid[y][x]
+    # keep old interior where possible
+    x1 = min(old_w, new_w-1)
+    for y in range(1, min(old_h, new_h-1)):
+        if x1 > 1:
+            new_grid[y][1:x1] = bytes(grid[y][1:x1])
     return new_grid
 
-def save_map(grid, path=MAP_SAVE_PATH):
-    with open(path, "w") as f:
+def save_map(grid, path=MAP_SAVE_PATH, heights=None, materials=None):
+    """ASCII digits, or tiles + heights + materials layers for a .mwm path."""
+    if path.endswith(MAP_BINARY_EXT):
+        layers = {mapfile.LAYER_TILES: ("B", grid.data)}
+        if heights: layers[mapfile.LAYER_HEIGHTS] = ("f", heights.data)
+        if materials: layers[mapfile.LAYER_MATERIALS] = ("B", materials.data)
+        mapfile.write_map(path, len(grid[0]), len(grid), layers)
+        print(f"Saved map to {path}")
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
         for row in grid:
             f.write("".join(str(clamp(v,0,2)) for v in row) + "\n")
+    os.replace(tmp, path)
     print(f"Saved map to {path}")
 
+TILE_CLAMP = bytes((0, 1, 2)) + b"\x01" * 253  # unknown tile ids load as walls
+
+def load_map_layers(path=MAP_SAVE_PATH):
+    """(tiles, heights, materials) from a map file; heights/materials are None when
+    the file doesn't carry them (ASCII maps never do). Each .mwm layer is copied out of
+    the mapping once, straight into the grid's own buffer."""
+    if not path.endswith(MAP_BINARY_EXT) or not os.path.exists(path):
+        return load_map(path), None, None
+    with mapfile.MapFile(path) as m:
+        w, h = m.width, m.height
+        tiles = bytearray(m.layer(mapfile.LAYER_TILES))
+        if raycast.HAVE_NUMPY:
+            a = raycast.np.frombuffer(tiles, dtype=raycast.np.uint8)
+            a[a > 2] = 1  # unknown tile ids load as walls, in place
+        else:
+            tiles = tiles.translate(TILE_CLAMP)
+        grid = TileGrid.wrap(w, h, tiles)
+        heights = materials = None
+        if m.has(mapfile.LAYER_HEIGHTS):
+            hdata = array("f"); hdata.frombytes(m.layer(mapfile.LAYER_HEIGHTS).cast("B"))
+            heights = TileGrid.wrap(w, h, hdata, "f")
+        if m.has(mapfile.LAYER_MATERIALS):
+            mats = bytearray(m.layer(mapfile.LAYER_MATERIALS))
+            clamp_materials(mats, tiles, 0, 0, w, h)  # unknown material ids load as the default
+            materials = TileGrid.wrap(w, h, mats)
+    return grid, heights, materials
+
+def map_load_path():
+    """MAP_SAVE_PATH, or the older ASCII MAP_ASCII_PATH while no binary save exists yet."""
+    if not os.path.exists(MAP_SAVE_PATH) and os.path.exists(MAP_ASCII_PATH):
+        return MAP_ASCII_PATH
+    return MAP_SAVE_PATH
+
 def load_map(path=MAP_SAVE_PATH):
     if not os.path.exists(path):
         print(f"No {path}, making a fresh blank map.")
         return make_blank_map(MAP_W, MAP_H)
+    if path.endswith(MAP_BINARY_EXT):
+        return load_map_layers(path)[0]
     grid = []
     with open(path, "r") as f:
         for line in f:
@@ -202,18 +390,60 @@ def load_map(path=MAP_SAVE_PATH):
             r.extend([1]*(w-len(r)))
     return grid
 
+# Flat TileGrids (tilegrid.py): grid[y][x] still works, .data/.array() are the raw buffer
 BASE_MAP = make_blank_map(MAP_W, MAP_H)  # Edited here
 MAP_H = len(BASE_MAP); MAP_W = len(BASE_MAP[0])
+MATERIAL_MAP = TileGrid.from_rows(build_material_map(BASE_MAP))  # per-tile material id, parallel to BASE_MAP
+
+# wall heights (static; saved with .mwm maps, rolled fresh for ASCII ones)
+def random_wall_heights(grid):
+    return [[(random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT) if t==1 else (DOOR_HEIGHT_FT if t==2 else 0.0))
+             for t in row] for row in grid]
 
-# wall heights (static)
-WALL_HEIGHTS_FT = [[(random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT) if t==1 else (DOOR_HEIGHT_FT if t==2 else 0.0))
-                    for t in row] for row in BASE_MAP]
+WALL_HEIGHTS_FT = TileGrid.from_rows(random_wall_heights(BASE_MAP), "f")
+
+# Bumped on every tile edit so derived data (tile arrays, caches) can go stale cheaply
+MAP_REV = 0
+STREAM_WORLD = None  # ChunkedWorld while a streamed level is loaded; BASE_MAP is then an empty placeholder
+
+def map_changed():
+    global MAP_REV
+    MAP_REV += 1
+    LOS_CACHE.clear()
+
+def rebuild_materials():
+    MATERIAL_MAP[:] = build_material_map(BASE_MAP)
+
+def tile_array():
+    """BASE_MAP as a 2D uint8 array for the vectorized raycaster (a view, never a copy)."""
+    return BASE_MAP.array()
 
 def in_map(mx, my): return 0 <= mx < MAP_W and 0 <= my < MAP_H
 def is_blocking_tile(t): return t in (1,2)
 def is_blocking(mx, my):
     if not in_map(mx, my): return True
-    return is_blocking_tile(BASE_MAP[my][mx])
+    if STREAM_WORLD is not None: return STREAM_WORLD.tile(mx, my) in (1,2)
+    return BASE_MAP.data[my * BASE_MAP.stride + mx] in (1,2)
+
+def tile_at(x, y):
+    """Tile id at an in-map cell, resident or streamed."""
+    if STREAM_WORLD is not None: return STREAM_WORLD.tile(x, y)
+    return BASE_MAP.data[y * BASE_MAP.stride + x]
+
+def play_region():
+    """(x0, y0, tiles, materials) the renderer and enemy store work on: the whole map, or the
+    chunks stitched together around the player in a streamed world (x0, y0 = its world cell)."""
+    if STREAM_WORLD is None: return 0, 0, BASE_MAP, MATERIAL_MAP
+    return STREAM_WORLD.region
+
+def stream_update():
+    """Keep the streamed region around the player and prefetch the way they're moving."""
+    if STREAM_WORLD is not None:
+        STREAM_WORLD.update(player_pos.x, player_pos.y, player_pos.x - prev_pos.x, player_pos.y - prev_pos.y)
+
+LOS_CACHE_ENTRIES = 1 << 16
+LOS_CACHE = LOSCache(is_blocking, LOS_CACHE_ENTRIES)  # cleared by map_changed()
+FLOW_FIELD = FlowField(is_blocking, FLOW_RADIUS)     # rebuilt when the player changes cell or MAP_REV moves
 
 # =========================
 # Entity placement (cells)
@@ -247,7 +477,7 @@ def remove_entity_at(x, y):
 def place_entity_at(x, y, kind):
     """kind: 'enemy'|'ammo'|'medkit'|'spawn'"""
     if not in_map(x,y): return
-    if BASE_MAP[y][x] != 0:  # only place on floor
+    if tile_at(x, y) != 0:  # only place on floor
         return
     remove_entity_at(x, y)
     global SPAWN_CELL, CURRENT_ENEMY_TYPE
@@ -260,58 +490,53 @@ def place_entity_at(x, y, kind):
     elif kind == "spawn":
         SPAWN_CELL = (x,y)
 
-def save_entities(path=ENT_SAVE_PATH):
-    with open(path, "w") as f:
-        if SPAWN_CELL:
-            f.write(f"spawn {SPAWN_CELL[0]} {SPAWN_CELL[1]}\n")
-        for (x,y), etype in sorted(ENEMY_CELLS.items()):
-            f.write(f"enemy {etype} {x} {y}\n")
-        for x,y in sorted(AMMO_CELLS):   f.write(f"ammo {x} {y}\n")
-        for x,y in sorted(MEDKIT_CELLS): f.write(f"medkit {x} {y}\n")
+def entity_table():
+    """Current placements as an EntityTable (what gets saved and what runs spawn from)."""
+    return EntityTable.from_cells(ENEMY_CELLS, AMMO_CELLS, MEDKIT_CELLS, SPAWN_CELL, ENEMY_TYPES)
+
+def cell_entities(x, y):
+    """Everything placed on (x, y): (enemy type or None, ammo, medkit, spawn)."""
+    c = (x,y)
+    return (ENEMY_CELLS.get(c), c in AMMO_CELLS, c in MEDKIT_CELLS, SPAWN_CELL == c)
+
+def set_cell_entities(x, y, state):
+    global SPAWN_CELL
+    c = (x,y)
+    enemy, ammo, medkit, spawn = state
+    if enemy is None: ENEMY_CELLS.pop(c, None)
+    else: ENEMY_CELLS[c] = enemy
+    if ammo: AMMO_CELLS.add(c)
+    else: AMMO_CELLS.discard(c)
+    if medkit: MEDKIT_CELLS.add(c)
+    else: MEDKIT_CELLS.discard(c)
+    if spawn: SPAWN_CELL = c
+    elif SPAWN_CELL == c: SPAWN_CELL = None
+
+def save_entities(path=ENT_SAVE_PATH, table=None):
+    if table is None: table = entity_table()
+    if path.endswith(ENT_BINARY_EXT): table.save(path)
+    else: table.save_text(path)
     print(f"Saved entities to {path}")
 
+def level_tiles():
+    """Whole-level tile array for bulk checks (the mapped file when streaming); None without numpy."""
+    if not raycast.HAVE_NUMPY: return None
+    if STREAM_WORLD is not None: return STREAM_WORLD.file.array(mapfile.LAYER_TILES)
+    return tile_array()
+
 def load_entities(path=ENT_SAVE_PATH):
+    global ENEMY_CELLS, AMMO_CELLS, MEDKIT_CELLS, SPAWN_CELL
     clear_entities()
     if not os.path.exists(path):
         print(f"No {path}; starting with no entities.")
         return
-    with open(path, "r") as f:
-        for line in f:
-            parts = line.strip().split()
-            if not parts: continue
-            if parts[0] == "spawn" and len(parts) == 3:
-                _, sx, sy = parts
-                if sx.isdigit() and sy.isdigit():
-                    x, y = int(sx), int(sy)
-                    if in_map(x,y) and BASE_MAP[y][x]==0:
-                        global SPAWN_CELL
-                        SPAWN_CELL = (x,y)
-            elif parts[0] == "enemy":
-                # new format: enemy type x y
-                # old format: enemy x y
-                if len(parts) == 4:
-                    _, etype, sx, sy = parts
-                elif len(parts) == 3:
-                    _, sx, sy = parts; etype = "grunt"
-                else:
-                    continue
-                if sx.isdigit() and sy.isdigit():
-                    x, y = int(sx), int(sy)
-                    if in_map(x,y) and BASE_MAP[y][x]==0:
-                        if etype not in ENEMY_TYPES: etype = "grunt"
-                        ENEMY_CELLS[(x,y)] = etype
-            elif parts[0] == "ammo" and len(parts) == 3:
-                _, sx, sy = parts
-                if sx.isdigit() and sy.isdigit():
-                    x, y = int(sx), int(sy)
-                    if in_map(x,y) and BASE_MAP[y][x]==0:
-                        AMMO_CELLS.add((x,y))
-            elif parts[0] == "medkit" and len(parts) == 3:
-                _, sx, sy = parts
-                if sx.isdigit() and sy.isdigit():
-                    x, y = int(sx), int(sy)
-                    if in_map(x,y) and BASE_MAP[y][x]==0:
-                        MEDKIT_CELLS.add((x,y))
+    table = EntityTable.load(path) if path.endswith(ENT_BINARY_EXT) else EntityTable.load_text(path, DEFAULT_ENEMY_TYPE)
+    tiles = level_tiles()
+    if tiles is None:
+        tiles = [[tile_at(x, y) for x in range(MAP_W)] for y in range(MAP_H)]
+    table = table.on_floor(tiles, MAP_W, MAP_H)
+    table.types[:] = [t if t in ENEMY_TYPES else DEFAULT_ENEMY_TYPE for t in table.types]
+    ENEMY_CELLS, AMMO_CELLS, MEDKIT_CELLS, SPAWN_CELL = table.to_cells()
 
 def filter_entities_within_bounds():
     """Drop any entities that moved out of bounds after a resize."""
@@ -320,8 +545,8 @@ def filter_entities_within_bounds():
     for pos in list(ENEMY_CELLS.keys()):
         if not in_map(pos[0], pos[1]):
             ENEMY_CELLS.pop(pos, None)
-    AMMO_CELLS.intersection_update({(x,y) for y in range(MAP_H) for x in range(MAP_W)})
-    MEDKIT_CELLS.intersection_update({(x,y) for y in range(MAP_H) for x in range(MAP_W)})
+    AMMO_CELLS.difference_update([c for c in AMMO_CELLS if not in_map(*c)])
+    MEDKIT_CELLS.difference_update([c for c in MEDKIT_CELLS if not in_map(*c)])
     if SPAWN_CELL and not in_map(*SPAWN_CELL):
         SPAWN_CELL = None
 
@@ -329,10 +554,14 @@ def filter_entities_within_bounds():
 # Player / game state
 # =========================
 def first_floor_spawn():
+    if STREAM_WORLD is not None:
+        cell = STREAM_WORLD.first_floor()
+        return (cell[0]+0.5, cell[1]+0.5) if cell else (1.5, 1.5)
+    data = BASE_MAP.data
     for y in range(1, MAP_H-1):
-        for x in range(1, MAP_W-1):
-            if BASE_MAP[y][x] == 0:
-                return (x+0.5, y+0.5)
+        x = data.find(0, y*MAP_W + 1, y*MAP_W + MAP_W-1)
+        if x >= 0:
+            return (x - y*MAP_W + 0.5, y+0.5)
     return (1.5, 1.5)
 
 def spawn_from_entities():
@@ -341,6 +570,14 @@ def spawn_from_entities():
 
 player_pos = pygame.Vector2(*spawn_from_entities())
 player_ang = 0.0
+# camera = player interpolated between the last two sim ticks; rendering reads these
+view_pos = pygame.Vector2(player_pos)
+view_ang = 0.0
+prev_pos = pygame.Vector2(player_pos)
+prev_ang = 0.0
+SIM_ACC = 0.0    # real time not yet simulated
+SIM_ALPHA = 1.0  # how far the rendered frame sits between the previous and current tick
+SIM_TICK = 0
 player_health = START_HEALTH
 player_ammo = START_AMMO
 time_since_shot = 999.0
@@ -351,15 +588,37 @@ PAUSED = False      # pause overlay flag
 EDITOR_MODE = False # start outside editor; menu chooses
 SHOW_MINIMAP_PLAY = True
 
-# Mouse look (will be enabled on play start)
-pygame.event.set_grab(False)
-pygame.mouse.set_visible(True)
+# Mouse look (enabled on play start)
 MOUSE_SENS = 0.0026
 
+def patrol_points_near(cx, cy):
+    """Up to 4 random open-floor cell centres around (cx, cy), or [] when there are fewer than 2."""
+    candidates = []
+    # sample a 7x7 block for walkable cells
+    for dy in range(-3,4):
+        for dx in range(-3,4):
+            mx, my = cx+dx, cy+dy
+            if in_map(mx,my) and tile_at(mx,my)==0:
+                candidates.append((mx+0.5,my+0.5))
+    random.shuffle(candidates)
+    return candidates[:4] if len(candidates)>=2 else []
+
 # Enemies / pickups at runtime
+class Pickup:
+    """Ammo/medkit on the floor (what the spatial index, sprites and minimap need, nothing more)."""
+    __slots__ = ("pos", "surf", "kind", "pickup_type", "alive")
+
+    def __init__(self, x, y, pickup_type):
+        self.pos = pygame.Vector2(x, y)
+        self.surf = sprite(pickup_type)
+        self.kind = "pickup"
+        self.pickup_type = pickup_type
+        self.alive = True
+
 class SpriteEnt:
     def __init__(self, x, y, surf, kind, enemy_type=None):
         self.pos = pygame.Vector2(x, y)
+        self.prev_pos = pygame.Vector2(x, y)  # position at the start of the current sim tick
         self.surf = surf
         self.kind = kind  # 'enemy' or 'pickup'
         self.enemy_type = enemy_type if (kind == "enemy" and enemy_type in ENEMY_TYPES) else (DEFAULT_ENEMY_TYPE if kind=="enemy" else None)
@@ -391,18 +650,7 @@ class SpriteEnt:
     def _init_patrol(self):
         if self.behavior != "patrol":
             return
-        # Create a simple square/loop of points near the spawn cell (within open floor)
-        cx, cy = int(self.pos.x), int(self.pos.y)
-        candidates = []
-        # sample a 5x5 ring for walkable cells
-        for dy in range(-3,4):
-            for dx in range(-3,4):
-                mx, my = cx+dx, cy+dy
-                if in_map(mx,my) and BASE_MAP[my][mx]==0:
-                    candidates.append((mx+0.5,my+0.5))
-        random.shuffle(candidates)
-        # pick up to 4 distinct points
-        self.patrol_points = candidates[:4] if len(candidates)>=2 else [self.pos.xy]
+        self.patrol_points = patrol_points_near(int(self.pos.x), int(self.pos.y)) or [self.pos.xy]
         self.patrol_index = 0
 
     def patrol_target(self):
@@ -415,28 +663,40 @@ class SpriteEnt:
             return
         self.patrol_index = (self.patrol_index + 1) % len(self.patrol_points)
 
-def to_center(x, y): return (x+0.5, y+0.5)
+    def draw_pos(self, alpha):
+        return self.prev_pos.lerp(self.pos, alpha)
 
-def spawn_enemies_from_cells():
-    spawned = []
-    for (x,y), etype in ENEMY_CELLS.items():
-        sprite = ENEMY_SPRITES.get(etype, SPRITE_ENEMY)
-        spawned.append(SpriteEnt(*to_center(x,y), sprite, "enemy", enemy_type=etype))
-    return spawned
+def to_center(x, y): return (x+0.5, y+0.5)
 
-def spawn_pickups_from_cells():
-    arr = []
-    for (x,y) in AMMO_CELLS:
-        s = SpriteEnt(*to_center(x,y), SPRITE_AMMO, "pickup"); s.pickup_type="ammo"; arr.append(s)
-    for (x,y) in MEDKIT_CELLS:
-        s = SpriteEnt(*to_center(x,y), SPRITE_MEDKIT, "pickup"); s.pickup_type="medkit"; arr.append(s)
-    return arr
+def enemy_type_row(name):
+    """(surf, enemy_type, hp, speed, detect, minimap_color, behavior) for an enemy type name."""
+    if name not in ENEMY_TYPES: name = DEFAULT_ENEMY_TYPE
+    _, hp, speed, detect, color, behavior = ENEMY_TYPES[name]
+    return sprite(name), name, hp, speed, detect, color, behavior
+
+def spawn_from_table(table):
+    """(enemies, pickups) for every placement, built in one pass over the table's columns.
+    Enemies go straight into an EnemyStore when ENEMY_SOA is on."""
+    global ENEMY_STORE
+    xs, ys, ets = table.select(KIND_ENEMY)
+    types = [enemy_type_row(name) for name in table.types]
+    if ENEMY_SOA and raycast.HAVE_NUMPY:
+        ENEMY_STORE = EnemyStore.from_placements(xs, ys, ets, types, level_tiles())
+        enemies = list(ENEMY_STORE.refs)
+    else:
+        ENEMY_STORE = None
+        enemies = [SpriteEnt(x+0.5, y+0.5, types[t][0], "enemy", enemy_type=types[t][1]) for x, y, t in zip(xs, ys, ets)]
+    pickups = []
+    for kind, ptype in ((KIND_AMMO, "ammo"), (KIND_MEDKIT, "medkit")):
+        xs, ys, _ = table.select(kind)
+        pickups += [Pickup(x+0.5, y+0.5, ptype) for x, y in zip(xs, ys)]
+    return enemies, pickups
 
 def place_free_cell():
     for _ in range(500):
         x = random.randint(1, MAP_W-2)
         y = random.randint(1, MAP_H-2)
-        if BASE_MAP[y][x]==0 and cell_has_entity(x,y) is None:
+        if tile_at(x,y)==0 and cell_has_entity(x,y) is None:
             return (x+0.5, y+0.5)
     return (1.5, 1.5)
 
@@ -444,7 +704,7 @@ def spawn_enemies_fallback(n):
     arr = []
     for _ in range(n):
         x,y = place_free_cell()
-        arr.append(SpriteEnt(x,y,SPRITE_ENEMY,"enemy"))
+        arr.append(SpriteEnt(x,y,sprite("enemy"),"enemy"))
     return arr
 
 def spawn_pickups_fallback(n):
@@ -452,26 +712,60 @@ def spawn_pickups_fallback(n):
     for _ in range(n):
         x,y = place_free_cell()
         if random.random()<0.5:
-            s = SpriteEnt(x,y,SPRITE_AMMO,"pickup"); s.pickup_type="ammo"
+            arr.append(Pickup(x, y, "ammo"))
         else:
-            s = SpriteEnt(x,y,SPRITE_MEDKIT,"pickup"); s.pickup_type="medkit"
-        arr.append(s)
+            arr.append(Pickup(x, y, "medkit"))
     return arr
 
 def reset_run_from_map():
     global player_pos, player_ang, player_health, player_ammo, time_since_shot, died, win, enemies, pickups
     player_pos = pygame.Vector2(*spawn_from_entities())
     player_ang = 0.0
+    prev_pos.update(player_pos); stream_update()
     player_health = START_HEALTH
     player_ammo = START_AMMO
     time_since_shot = 999.0
     died = False; win = False
-    enemies = spawn_enemies_from_cells()
-    pickups = spawn_pickups_from_cells()
-
-enemies = []
+    enemies, pickups = spawn_from_table(entity_table())
+    index_entities()
+    snap_camera()
+
+# Alive entities only; kept current as enemies move, die or pickups get collected
+ENEMY_INDEX = SpatialGrid(SPATIAL_CELL)
+PICKUP_INDEX = SpatialGrid(SPATIAL_CELL)
+ROAMERS = []  # enemies that move even when the player is out of range (wander/patrol)
+ENEMY_STORE = None  # EnemyStore when ENEMY_SOA is on; `enemies` then holds its EnemyRefs
+
+def index_entities():
+    global ROAMERS
+    ENEMY_INDEX.rebuild(e for e in enemies if e.alive)
+    PICKUP_INDEX.rebuild(p for p in pickups if p.alive)
+    ROAMERS = [e for e in enemies if e.behavior != "chaser"]
+
+def snapshot_positions():
+    """Remember where everything is before a tick so frames can interpolate from there."""
+    global prev_ang
+    prev_pos.update(player_pos); prev_ang = player_ang
+    if ENEMY_STORE is not None:
+        ENEMY_STORE.snapshot()
+    else:
+        for e in ENEMY_INDEX: e.prev_pos.update(e.pos)
+
+def snap_camera():
+    """Drop interpolation history (after a reset/teleport)."""
+    global SIM_ACC, SIM_ALPHA
+    SIM_ACC = 0.0; SIM_ALPHA = 1.0
+    snapshot_positions()
+    update_camera()
+
+def update_camera():
+    global view_ang
+    view_pos.update(prev_pos.lerp(player_pos, SIM_ALPHA))
+    turn = (player_ang - prev_ang + math.pi) % (2*math.pi) - math.pi
+    view_ang = (prev_ang + turn * SIM_ALPHA) % (2*math.pi)
+
+enemies = []   # filled by reset_run_from_map()
 pickups = []
-reset_run_from_map()
 
 # =========================
 # Movement / raycasting
@@ -486,111 +780,175 @@ def try_move(nx, ny):
                 return False
     return True
 
-def cast_and_draw(zbuf):
-    screen.fill((18, 18, 26), rect=pygame.Rect(0, 0, SCREEN_W, SCREEN_H // 2))
-    screen.fill((38, 38, 46), rect=pygame.Rect(0, SCREEN_H // 2, SCREEN_W, SCREEN_H // 2))
-    for x in range(SCREEN_W):
-        ray_angle = player_ang - HALF_FOV + (x + 0.5) * (FOV / SCREEN_W)
-        ray_dir_x = math.cos(ray_angle); ray_dir_y = math.sin(ray_angle)
-        map_x = int(player_pos.x); map_y = int(player_pos.y)
-        inv_dx = 1.0 / ray_dir_x if ray_dir_x != 0 else 1e30
-        inv_dy = 1.0 / ray_dir_y if ray_dir_y != 0 else 1e30
-        delta_x = abs(inv_dx); delta_y = abs(inv_dy)
-
-        if ray_dir_x < 0:
-            step_x = -1; side_x = (player_pos.x - map_x) * delta_x
-        else:
-            step_x = 1; side_x = (map_x + 1.0 - player_pos.x) * delta_x
-        if ray_dir_y < 0:
-            step_y = -1; side_y = (player_pos.y - map_y) * delta_y
-        else:
-            step_y = 1; side_y = (map_y + 1.0 - player_pos.y) * delta_y
-
-        hit = False; side = 0; tile = 0
-        while True:
-            if side_x < side_y:
-                side_x += delta_x; map_x += step_x; side = 0
-            else:
-                side_y += delta_y; map_y += step_y; side = 1
-            if not in_map(map_x, map_y): break
-            tile = BASE_MAP[map_y][map_x]
-            if tile != 0: hit = True; break
-
-        if not hit:
-            zbuf[x] = MAX_VIEW_DIST
-            continue
-
-        perp_dist = ((map_x - player_pos.x + (1 - step_x) * 0.5) * inv_dx) if side==0 else ((map_y - player_pos.y + (1 - step_y) * 0.5) * inv_dy)
-        perp_dist = max(perp_dist, 1e-4)
-        zbuf[x] = perp_dist
-        line_h = int(SCREEN_H / perp_dist)
-
-        tex = pick_wall_texture(map_x, map_y) if tile==1 else pick_door_texture(map_x, map_y)
-        wall_x = (player_pos.y + perp_dist * ray_dir_y) if side==0 else (player_pos.x + perp_dist * ray_dir_x)
-        wall_x -= math.floor(wall_x)
-        tex_x = int(wall_x * TEX_SIZE)
-        if side == 0 and ray_dir_x > 0: tex_x = TEX_SIZE - tex_x - 1
-        if side == 1 and ray_dir_y < 0: tex_x = TEX_SIZE - tex_x - 1
-        column = tex.subsurface(pygame.Rect(tex_x, 0, 1, TEX_SIZE))
-        column = pygame.transform.scale(column, (1, line_h))
-        draw_y = (SCREEN_H // 2) - (line_h // 2)
-        if side == 1:
-            screen.blit(column, (x, draw_y))
-            shade = pygame.Surface((1, line_h), pygame.SRCALPHA)
-            shade.fill((0, 0, 0, 60)); screen.blit(shade, (x, draw_y))
-        else:
-            screen.blit(column, (x, draw_y))
-
-def render_sprites(zbuf):
-    # gather
-    things = []
-    for e in enemies:
-        if e.alive: things.append(("enemy", e.pos, e.surf, e))
-    for p in pickups:
-        if p.alive: things.append(("pickup", p.pos, p.surf, p))
+def cast_and_draw(zbuf, target):
+    view_w, view_h = target.get_size()
+    target.fill((18, 18, 26), rect=pygame.Rect(0, 0, view_w, view_h // 2))
+    target.fill((38, 38, 46), rect=pygame.Rect(0, view_h // 2, view_w, view_h - view_h // 2))
+    use_np = VECTOR_RAYCAST and raycast.HAVE_NUMPY
+    ox, oy, tiles, materials = play_region()
+    grid = tiles.array() if use_np else tiles
+    hits = raycast.cast_rays(grid, view_pos.x - ox, view_pos.y - oy, view_ang, FOV, view_w,
+                             MAX_VIEW_DIST, TEX_SIZE, vectorized=use_np)
+    zbuf[:] = hits.dist
+    for x, perp_dist, map_x, map_y, side, tile, tex_x in hits.columns():
+        line_h = int(view_h / perp_dist)
+        tex, level = ATLAS.texture_for(materials[map_y][map_x], side == 1, line_h)
+        column = COLUMN_CACHE.column(tex, tex_x >> level, line_h)
+        line_h = column.get_height()
+        target.blit(column, (x, (view_h // 2) - (line_h // 2)))
+
+SPRITE_CACHE = SpriteScaleCache()
+SPRITES_DRAWN = 0   # per-frame counters shown under the FPS readout
+SPRITES_CULLED = 0
+
+def render_sprites(zbuf, target):
+    global SPRITES_DRAWN, SPRITES_CULLED
+    view_w, view_h = target.get_size()
+    min_size = max(4, 12 * view_h // SCREEN_H)
+    px, py = view_pos.x, view_pos.y
+    drawn = 0
+    # gather from the spatial index (distance computed once, reused as the sort key);
+    # the range spans the whole map, so only walls hide sprites, as before the index
+    reach = math.hypot(MAP_W, MAP_H)
+    things = [interpolated_sprite(e, px, py) for _, _, e in
+              ENEMY_INDEX.query_cone(px, py, view_ang, HALF_FOV + 0.6, reach)]
+    things += PICKUP_INDEX.query_cone(px, py, view_ang, HALF_FOV + 0.6, reach)
     # sort far -> near
-    things.sort(key=lambda t: (player_pos - t[1]).length(), reverse=True)
+    things.sort(key=itemgetter(0), reverse=True)
 
-    for kind, pos, surf, obj in things:
-        dx = pos.x - player_pos.x; dy = pos.y - player_pos.y
-        dist = math.hypot(dx, dy)
+    for dist, angle, obj in things:
         if dist < 1e-3: continue
-        angle = math.atan2(dy, dx) - player_ang
-        while angle < -math.pi: angle += 2*math.pi
-        while angle >  math.pi: angle -= 2*math.pi
-        if abs(angle) > HALF_FOV + 0.6:
-            continue
-        screen_x = int((0.5 + angle / FOV) * SCREEN_W)
-        size = max(12, int((SCREEN_H / dist) * 0.9))
-        sprite = pygame.transform.scale(surf, (size, size))
-        top = (SCREEN_H // 2) - size // 2
+        screen_x = int((0.5 + angle / FOV) * view_w)
+        size = SPRITE_CACHE.quantize(max(min_size, int((view_h / dist) * 0.9)))
+        top = (view_h // 2) - size // 2
         left = screen_x - size // 2
-
-        for sx in range(size):
-            x = left + sx
-            if x < 0 or x >= SCREEN_W: continue
-            if dist >= zbuf[x] + 0.01: continue
-            column = sprite.subsurface(pygame.Rect(sx, 0, 1, size))
-            # simple alpha pass; sprite surfaces are RGBA
-            screen.blit(column, (x, top))
+        spans = visible_spans(zbuf, left, size, dist, view_w)
+        if not spans: continue
+        sprite = SPRITE_CACHE.scaled(obj.surf, size)
+        # one blit per contiguous run of columns in front of the walls
+        for x0, x1 in spans:
+            target.blit(sprite, (x0, top), pygame.Rect(x0 - left, 0, x1 - x0, size))
+        drawn += 1
+    SPRITES_DRAWN, SPRITES_CULLED = drawn, len(ENEMY_INDEX) + len(PICKUP_INDEX) - drawn
+
+def interpolated_sprite(e, px, py):
+    """(dist, rel_angle, e) for a moving entity drawn at its between-ticks position."""
+    pos = e.draw_pos(SIM_ALPHA)
+    dx = pos.x - px; dy = pos.y - py
+    rel = (math.atan2(dy, dx) - view_ang + math.pi) % (2 * math.pi) - math.pi
+    return math.hypot(dx, dy), rel, e
+
+_strip_renderer = None
+
+def strip_renderer():
+    """Worker pool for parallel wall rendering, started on first use."""
+    global _strip_renderer
+    if _strip_renderer is None:
+        import strip_render
+        pixels, slots = strip_render.atlas_tables(ATLAS)
+        _strip_renderer = strip_render.StripRenderer(PARALLEL_RENDER_WORKERS, SCREEN_W, SCREEN_H, pixels, slots, TEX_SIZE)
+    if _strip_renderer.map_rev != MAP_REV:
+        # workers hold their own copy of the map; republish after edits
+        _strip_renderer.update_map(tile_array(), MATERIAL_MAP.array(), MAP_REV)
+    return _strip_renderer
+
+def cast_parallel(target):
+    """Walls from the worker pool; None (and the pool shut down for the rest of the run)
+    when a worker fails, so the caller draws inline instead."""
+    global _strip_renderer, PARALLEL_RENDER_WORKERS
+    import strip_render
+    view_w, view_h = target.get_size()
+    try:
+        fb, zbuf = strip_renderer().render(view_pos.x, view_pos.y, view_ang, FOV, view_w, view_h, MAX_VIEW_DIST)
+    except strip_render.StripRenderError as exc:
+        print(f"Parallel rendering stopped ({exc}); drawing walls inline")
+        if _strip_renderer is not None:
+            _strip_renderer.close(); _strip_renderer = None
+        PARALLEL_RENDER_WORKERS = 0
+        return None
+    pygame.surfarray.blit_array(target, fb)
+    return zbuf
+
+# 3D view framebuffer; smaller than the window while dynamic resolution is scaled down
+DYNRES = DynamicResolution(DYNRES_TARGET_FPS, DYNRES_MIN_SCALE, DYNRES_MAX_SCALE)
+_view_surf = None
+_zbuffer = []
+
+def draw_world():
+    """Walls + sprites at the current view scale, upscaled into the window."""
+    global _view_surf, _zbuffer
+    if screen is None: init_display()
+    view_w, view_h = DYNRES.view_size(SCREEN_W, SCREEN_H) if DYNRES_ENABLED else (SCREEN_W, SCREEN_H)
+    if (view_w, view_h) == (SCREEN_W, SCREEN_H):
+        target = screen
+    else:
+        if _view_surf is None or _view_surf.get_size() != (view_w, view_h):
+            _view_surf = pygame.Surface((view_w, view_h)).convert()
+        target = _view_surf
+    zbuf = None
+    if PARALLEL_RENDER_WORKERS > 0 and raycast.HAVE_NUMPY and STREAM_WORLD is None:
+        zbuf = cast_parallel(target)
+    if zbuf is None:
+        if len(_zbuffer) != view_w:
+            _zbuffer = raycast.np.full(view_w, MAX_VIEW_DIST) if raycast.HAVE_NUMPY else [MAX_VIEW_DIST]*view_w
+        cast_and_draw(_zbuffer, target)
+        zbuf = _zbuffer
+    render_sprites(zbuf, target)
+    if target is not screen:
+        pygame.transform.scale(target, (SCREEN_W, SCREEN_H), screen)
 
 def line_of_sight(a, b):
-    dx = b.x - a.x; dy = b.y - a.y
-    dist = math.hypot(dx, dy)
-    steps = int(dist * 8) + 1
-    for i in range(steps+1):
-        t = i/steps
-        x = a.x + dx*t; y = a.y + dy*t
-        mx, my = int(x), int(y)
-        if not in_map(mx, my) or is_blocking(mx, my):
-            return False
-    return True
+    """Exact cell traversal between the cells containing a and b (cached per cell pair)."""
+    return LOS_CACHE.visible(int(a.x), int(a.y), int(b.x), int(b.y))
+
+def chase_dir(e, to_p, dist):
+    """Heading for an enemy going after the player: along the flow field, or straight when off it."""
+    d = FLOW_FIELD.steer(e.pos.x, e.pos.y)
+    return pygame.Vector2(d) if d else to_p / dist
+
+def hold_roamer_chunks():
+    """Streamed worlds: keep the chunks under live roaming enemies within STREAM_ROAM_CHUNKS
+    of the player resident, so the ones off the play region keep wandering/patrolling.
+    Enemies farther out freeze until the player comes closer, which keeps the held chunks
+    to at most (2*STREAM_ROAM_CHUNKS + 1)**2 whatever the world size. Returns who may
+    move: a bool mask over ENEMY_STORE, or the set of awake ROAMERS."""
+    s = STREAM_WORLD.shift; r = STREAM_ROAM_CHUNKS
+    pcx = int(player_pos.x) >> s; pcy = int(player_pos.y) >> s
+    if ENEMY_STORE is not None:
+        np = raycast.np
+        st = ENEMY_STORE
+        cx = st.x.astype(np.int64) >> s; cy = st.y.astype(np.int64) >> s
+        awake = (np.abs(cx - pcx) <= r) & (np.abs(cy - pcy) <= r)
+        roam = awake & st.alive & (st.behavior != CHASER)
+        keys = np.unique(cy[roam] << 32 | cx[roam])
+        STREAM_WORLD.hold([(k & 0xFFFFFFFF, k >> 32) for k in keys.tolist()])
+        return awake
+    awake = {e for e in ROAMERS if e.alive and abs((int(e.pos.x) >> s) - pcx) <= r
+             and abs((int(e.pos.y) >> s) - pcy) <= r}
+    STREAM_WORLD.hold({(int(e.pos.x) >> s, int(e.pos.y) >> s) for e in awake})
+    return awake
 
 def update_enemies(dt):
     global player_health
+    FLOW_FIELD.update(int(player_pos.x), int(player_pos.y), MAP_REV)
+    awake = hold_roamer_chunks() if STREAM_WORLD is not None else None
+    if ENEMY_STORE is not None:
+        ox, oy, tiles, _ = play_region()
+        lookup = STREAM_WORLD.tiles_many if STREAM_WORLD is not None else None
+        hits, moved = ENEMY_STORE.update(dt, player_pos.x, player_pos.y, tiles.array(), LOS_CACHE.visible,
+                                         SPATIAL_CELL, FLOW_FIELD, (ox, oy), lookup, awake)
+        for e in moved: ENEMY_INDEX.move(e)
+        for _ in range(hits): player_hurt(ENEMY_TOUCH_DAMAGE)
+        return
+    # Chasers only act once the player is inside their detect range, so idle ones
+    # far away skip movement/detection; wanderers/patrollers keep moving regardless.
+    # Touch cooldowns run down for everyone.
     for e in enemies:
+        if e.alive and e.cooldown > 0.0: e.cooldown = max(0.0, e.cooldown - dt)
+    active = dict.fromkeys(ENEMY_INDEX.query_radius(player_pos.x, player_pos.y, ENEMY_MAX_DETECT))
+    active.update(dict.fromkeys(ROAMERS if awake is None else awake))
+    for e in active:
         if not e.alive: continue
-        e.cooldown = max(0.0, e.cooldown - dt)
         to_p = player_pos - e.pos
         dist = to_p.length()
         if dist < 0.001:
@@ -600,15 +958,19 @@ def update_enemies(dt):
         speed = e.base_speed
         moved = False
         if e.behavior == "chaser":
+            if not detected:
+                # path distance, not straight-line sight, decides whether a chaser comes round the walls
+                pd = FLOW_FIELD.path_dist(int(e.pos.x), int(e.pos.y))
+                detected = pd is not None and pd <= e.detect_range
             if detected:
-                dir = to_p.normalize()
+                dir = chase_dir(e, to_p, dist)
                 nx = e.pos.x + dir.x * speed * dt
                 ny = e.pos.y + dir.y * speed * dt
                 if not is_blocking(int(nx), int(e.pos.y)): e.pos.x = nx; moved=True
                 if not is_blocking(int(e.pos.x), int(ny)): e.pos.y = ny; moved=True
         elif e.behavior == "wander":
             if detected:
-                dir = to_p.normalize()
+                dir = chase_dir(e, to_p, dist)
             else:
                 e.wander_timer -= dt
                 if e.wander_timer <= 0:
@@ -626,7 +988,7 @@ def update_enemies(dt):
             dvec = tgt - e.pos
             dlen = dvec.length()
             if detected:
-                dir = to_p.normalize()
+                dir = chase_dir(e, to_p, dist)
             else:
                 if dlen < 0.2:
                     e.advance_patrol()
@@ -636,6 +998,7 @@ def update_enemies(dt):
             ny = e.pos.y + dir.y * speed * dt
             if not is_blocking(int(nx), int(e.pos.y)): e.pos.x = nx; moved=True
             if not is_blocking(int(e.pos.x), int(ny)): e.pos.y = ny; moved=True
+        if moved: ENEMY_INDEX.move(e)
         # Touch damage
         if dist < 0.6 and e.cooldown <= 0.0:
             player_hurt(ENEMY_TOUCH_DAMAGE)
@@ -643,14 +1006,14 @@ def update_enemies(dt):
 
 def try_pickups():
     global player_ammo, player_health
-    for p in pickups:
-        if not p.alive: continue
+    for p in PICKUP_INDEX.query_radius(player_pos.x, player_pos.y, 0.7):
         if (p.pos - player_pos).length() < 0.7:
             if p.pickup_type == "ammo":
                 player_ammo += AMMO_PICKUP_AMOUNT
             else:
                 player_health = min(100, player_health + MEDKIT_HEAL)
             p.alive = False
+            PICKUP_INDEX.remove(p)
 
 muzzle_alpha = 0.0
 def player_hurt(dmg):
@@ -664,69 +1027,91 @@ def hitscan_shot():
     player_ammo -= 1
     time_since_shot = 0.0
     muzzle_alpha = 1.0
-    best = None; bestDist = 1e9
-    for e in enemies:
-        if not e.alive: continue
-        to = e.pos - player_pos
-        dist = to.length()
-        if dist > WEAPON_RANGE: continue
-        ang = math.atan2(to.y, to.x) - player_ang
-        while ang < -math.pi: ang += 2*math.pi
-        while ang >  math.pi: ang -= 2*math.pi
-        if abs(ang) > math.radians(4.0): continue
-        if not line_of_sight(player_pos, e.pos): continue
-        if dist < bestDist: bestDist = dist; best = e
+    best = None
+    # candidates come back nearest-first, so the first one in sight is the target
+    for dist, ang, e in ENEMY_INDEX.query_ray(player_pos.x, player_pos.y, player_ang, WEAPON_RANGE, math.radians(4.0)):
+        if line_of_sight(player_pos, e.pos):
+            best = e; break
     if best:
         dmg = random.randint(*WEAPON_DAMAGE)
         best.hp -= dmg
-        if best.hp <= 0: best.alive = False
+        if best.hp <= 0:
+            best.alive = False
+            ENEMY_INDEX.remove(best)
+
+_minimap_layer = (None, None, None, None)  # (MAP_REV, cell px, source tiles, Surface)
+
+def minimap_layer(cell, tiles):
+    """Static tile layer at `cell` px per tile; rebuilt only after map edits or a new streamed region."""
+    global _minimap_layer
+    rev, c, src, surf = _minimap_layer
+    if rev == MAP_REV and c == cell and src is tiles:
+        return surf
+    colors = (MINIMAP_FLOOR, MINIMAP_WALL, MINIMAP_DOOR)
+    if raycast.HAVE_NUMPY:
+        # one pixel per tile straight from the tile array, then a nearest-neighbour upscale
+        np = raycast.np
+        palette = np.array(colors, dtype=np.uint8)
+        small = pygame.surfarray.make_surface(palette[np.minimum(tiles.array(), 2)].swapaxes(0, 1))
+    else:
+        small = pygame.Surface((tiles.width, tiles.height))
+        for y, row in enumerate(tiles):
+            for x, t in enumerate(row):
+                small.set_at((x, y), colors[min(t, 2)])
+    surf = pygame.transform.scale(small, (tiles.width * cell, tiles.height * cell)).convert()
+    _minimap_layer = (MAP_REV, cell, tiles, surf)
+    return surf
 
 def draw_minimap():
     max_dim = max(MAP_W, MAP_H)
-    cell = max(3, min(12, 220 // max_dim))
-    mm_w = MAP_W * cell; mm_h = MAP_H * cell
-    mm = pygame.Surface((mm_w, mm_h), pygame.SRCALPHA)
-    bg = pygame.Surface((mm_w, mm_h), pygame.SRCALPHA); bg.fill((0,0,0,MINIMAP_BG_ALPHA))
-    mm.blit(bg, (0, 0))
-    for y in range(MAP_H):
-        for x in range(MAP_W):
-            r = pygame.Rect(x * cell, y * cell, cell, cell)
-            t = BASE_MAP[y][x]
-            if t == 1: pygame.draw.rect(mm, MINIMAP_WALL, r)
-            elif t == 0: pygame.draw.rect(mm, MINIMAP_FLOOR, r)
-            else: pygame.draw.rect(mm, MINIMAP_DOOR, r)
-    # dynamic entities on minimap
-    # Draw remaining (uncollected) pickups from runtime list instead of static cell sets
-    for p in pickups:
-        if not p.alive: continue
-        x = p.pos.x; y = p.pos.y
+    cell = max(3, min(12, MINIMAP_MAX_PX // max_dim))
+    rx, ry, tiles, _ = play_region()
+    layer = minimap_layer(cell, tiles)
+    mm_w, mm_h = layer.get_size()
+    # maps bigger than MINIMAP_MAX_PX show a window that follows the player
+    win_w = min(mm_w, MINIMAP_MAX_PX); win_h = min(mm_h, MINIMAP_MAX_PX)
+    ox = int(clamp((view_pos.x - rx) * cell - win_w / 2, 0, mm_w - win_w))
+    oy = int(clamp((view_pos.y - ry) * cell - win_h / 2, 0, mm_h - win_h))
+    sx = sy = MINIMAP_MARGIN
+    screen.blit(layer, (sx, sy), pygame.Rect(ox, oy, win_w, win_h))
+    old_clip = screen.get_clip()
+    screen.set_clip(pygame.Rect(sx, sy, win_w, win_h))
+    ox += rx * cell; oy += ry * cell  # window offset in world pixels from here on
+    bx = sx - ox; by = sy - oy  # where the world origin lands on screen
+    wx0, wy0 = ox / cell, oy / cell
+    wx1, wy1 = (ox + win_w) / cell, (oy + win_h) / cell
+    # dynamic entities on minimap (alive ones inside the window, straight from the spatial index)
+    for p in PICKUP_INDEX.query_rect(wx0 - 1, wy0 - 1, wx1 + 1, wy1 + 1):
         col = (255,240,120) if p.pickup_type=="ammo" else (140,250,160)
-        pygame.draw.rect(mm, col, pygame.Rect(int(x*cell)-cell//4, int(y*cell)-cell//4, cell//2, cell//2))
-    # Draw enemies by their live positions & type color
-    for e in enemies:
-        if not e.alive: continue
+        pygame.draw.rect(screen, col, pygame.Rect(bx+int(p.pos.x*cell)-cell//4, by+int(p.pos.y*cell)-cell//4, cell//2, cell//2))
+    for e in ENEMY_INDEX.query_rect(wx0 - 1, wy0 - 1, wx1 + 1, wy1 + 1):
         col = getattr(e, 'minimap_color', (255,120,220))
-        pygame.draw.rect(mm, col, pygame.Rect(int(e.pos.x*cell)-cell//3, int(e.pos.y*cell)-cell//3, (2*cell)//3, (2*cell)//3))
+        pygame.draw.rect(screen, col, pygame.Rect(bx+int(e.pos.x*cell)-cell//3, by+int(e.pos.y*cell)-cell//3, (2*cell)//3, (2*cell)//3))
     # spawn marker remains static
     if SPAWN_CELL:
-        sx, sy = SPAWN_CELL
-        pygame.draw.rect(mm, (120,200,255), pygame.Rect(sx*cell+cell//4, sy*cell+cell//4, cell//2, cell//2), 2)
+        spx, spy = SPAWN_CELL
+        pygame.draw.rect(screen, (120,200,255), pygame.Rect(bx+spx*cell+cell//4, by+spy*cell+cell//4, cell//2, cell//2), 2)
 
-    px = player_pos.x * cell; py = player_pos.y * cell
-    pygame.draw.circle(mm, MINIMAP_PLAYER, (int(px), int(py)), max(2, cell // 3))
+    px = bx + view_pos.x * cell; py = by + view_pos.y * cell
+    pygame.draw.circle(screen, MINIMAP_PLAYER, (int(px), int(py)), max(2, cell // 3))
     dir_len = max(10, 3 * cell)
-    dx = math.cos(player_ang) * dir_len; dy = math.sin(player_ang) * dir_len
-    pygame.draw.line(mm, MINIMAP_PLAYER, (px, py), (px + dx, py + dy), 2)
-    left_ang = player_ang - HALF_FOV; right_ang = player_ang + HALF_FOV
+    dx = math.cos(view_ang) * dir_len; dy = math.sin(view_ang) * dir_len
+    pygame.draw.line(screen, MINIMAP_PLAYER, (px, py), (px + dx, py + dy), 2)
+    left_ang = view_ang - HALF_FOV; right_ang = view_ang + HALF_FOV
     fov_len = max(16, 4 * cell)
     lx, ly = px + math.cos(left_ang)*fov_len, py + math.sin(left_ang)*fov_len
     rx, ry = px + math.cos(right_ang)*fov_len, py + math.sin(right_ang)*fov_len
-    pygame.draw.line(mm, MINIMAP_FOV, (px, py), (lx, ly), 1)
-    pygame.draw.line(mm, MINIMAP_FOV, (px, py), (rx, ry), 1)
-    screen.blit(mm, (MINIMAP_MARGIN, MINIMAP_MARGIN))
+    pygame.draw.line(screen, MINIMAP_FOV, (px, py), (lx, ly), 1)
+    pygame.draw.line(screen, MINIMAP_FOV, (px, py), (rx, ry), 1)
+    screen.set_clip(old_clip)
 
-def get_inputs(dt):
-    global player_ang, player_pos
+# One tick's worth of player intent; scripted/headless runs build these directly
+SimInput = namedtuple("SimInput", "forward strafe turn sprint fire")
+NO_INPUT = SimInput(0.0, 0.0, 0.0, False, False)
+
+def read_inputs():
+    """Sample keyboard for this frame's ticks. Mouse look is applied right away (per frame)."""
+    global player_ang, prev_ang
     keys = pygame.key.get_pressed()
     forward = 0.0; strafe = 0.0; turn_kb = 0.0
     if keys[pygame.K_w]: forward += 1
@@ -737,10 +1122,17 @@ def get_inputs(dt):
     if keys[pygame.K_RIGHT]: turn_kb += 1
     if keys[pygame.K_ESCAPE]: pygame.event.post(pygame.event.Event(pygame.QUIT))
     mx, my = pygame.mouse.get_rel()
-    player_ang = (player_ang + mx * MOUSE_SENS) % (2*math.pi)
+    if mx:
+        player_ang = (player_ang + mx * MOUSE_SENS) % (2*math.pi)
+        prev_ang = (prev_ang + mx * MOUSE_SENS) % (2*math.pi)
+    return SimInput(forward, strafe, turn_kb, bool(keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]), False)
+
+def apply_inputs(inp, dt):
+    global player_ang, player_pos
+    forward, strafe, turn_kb = inp.forward, inp.strafe, inp.turn
     if turn_kb != 0.0:
         player_ang = (player_ang + turn_kb * TURN_SPEED * dt) % (2*math.pi)
-    speed = MOVE_SPEED * (SPRINT_MULT if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT] else 1.0)
+    speed = MOVE_SPEED * (SPRINT_MULT if inp.sprint else 1.0)
     sin_a = math.sin(player_ang); cos_a = math.cos(player_ang)
     dx = (cos_a * forward - sin_a * strafe) * speed * dt
     dy = (sin_a * forward + cos_a * strafe) * speed * dt
@@ -764,7 +1156,10 @@ def draw_panel(x, y, w, h, alpha=170):
 
 def draw_fps():
     fps = clock.get_fps()
-    txt = SMALL_FONT.render(f"{fps:5.1f} FPS", True, (200,200,210))
+    label = f"{fps:5.1f} FPS"
+    if DYNRES_ENABLED:
+        label += f"  res {int(round(DYNRES.scale * 100))}%"
+    txt = SMALL_FONT.render(label, True, (200,200,210))
     screen.blit(txt, (SCREEN_W - txt.get_width() - 8, 6))
 
 def draw_center_message(title, subtitle, color):
@@ -819,13 +1214,16 @@ def draw_pause_menu():
         s = SMALL_FONT.render(ln, True, (220,220,230))
         screen.blit(s, (x + 24, oy))
         oy += 30
+    for i, line in enumerate(("Wall " + COLUMN_CACHE.summary(), "LOS " + LOS_CACHE.summary())):
+        stats = SMALL_FONT.render(line, True, (160,160,170))
+        screen.blit(stats, (SCREEN_W//2 - stats.get_width()//2, y + h + 8 + i*16))
     draw_fps()
 
 # We override original simple HUD with enhanced UI helpers
 # (Locate old draw_hud definition later in file and consider everything after it until main() updated.)
 def draw_hud(show_minimap=True):  # override
     global muzzle_alpha
-    alive_enemies = sum(1 for e in enemies if e.alive)
+    alive_enemies = len(ENEMY_INDEX)
     total_enemies = len(enemies)
     if total_enemies > 0:
         info = f"HP {player_health:3d}  AMMO {player_ammo:3d}  ENEMIES {total_enemies - alive_enemies}/{total_enemies}"
@@ -833,10 +1231,10 @@ def draw_hud(show_minimap=True):  # override
         info = f"HP {player_health:3d}  AMMO {player_ammo:3d}"
     surf = HUD_FONT.render(info, True, (240, 240, 245))
     screen.blit(surf, (10, SCREEN_H - 30))
-    wp = pygame.transform.scale(HUD_PISTOL, (160, 160))
+    wp = pygame.transform.scale(sprite("pistol"), (160, 160))
     screen.blit(wp, (SCREEN_W//2 - 80, SCREEN_H - 160))
     if muzzle_alpha > 0:
-        mf = pygame.transform.scale(MUZZLE_FLASH, (120, 120)).copy()
+        mf = pygame.transform.scale(sprite("muzzle"), (120, 120)).copy()
         mf.set_alpha(int(220 * muzzle_alpha))
         screen.blit(mf, (SCREEN_W//2 - 60, SCREEN_H - 180))
     if died:
@@ -846,6 +1244,8 @@ def draw_hud(show_minimap=True):  # override
     else:
         draw_crosshair()
     draw_fps()
+    spr = SMALL_FONT.render(f"sprites {SPRITES_DRAWN} drawn / {SPRITES_CULLED} culled", True, (170,170,180))
+    screen.blit(spr, (SCREEN_W - spr.get_width() - 8, 22))
 
 # Helper to restart run (idempotent)
 def restart_run():
@@ -860,49 +1260,98 @@ cell_px = CELL_PX_DEFAULT
 
 def update_map_dimensions():
     global MAP_W, MAP_H
-    MAP_H = len(BASE_MAP); MAP_W = len(BASE_MAP[0])
+    if STREAM_WORLD is not None:
+        MAP_W, MAP_H = STREAM_WORLD.width, STREAM_WORLD.height
+    else:
+        MAP_H = len(BASE_MAP); MAP_W = len(BASE_MAP[0])
 
 def resize_to(new_w, new_h):
     global BASE_MAP, WALL_HEIGHTS_FT
     BASE_MAP[:] = resize_map(BASE_MAP, new_w, new_h)
-    update_map_dimensions()
-    WALL_HEIGHTS_FT[:] = [[(random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT) if t==1 else (DOOR_HEIGHT_FT if t==2 else 0.0))
-                           for t in row] for row in BASE_MAP]
+    update_map_dimensions(); map_changed(); rebuild_materials(); EDITOR_CHUNKS.clear()
+    WALL_HEIGHTS_FT[:] = random_wall_heights(BASE_MAP)
     filter_entities_within_bounds()
+    JOURNAL.clear()
+
+def load_level(path=MAP_SAVE_PATH):
+    """Replace tiles, heights and materials with the map at path (streamed when it's a big .mwm)."""
+    global STREAM_WORLD
+    if STREAM_WORLD is not None:
+        STREAM_WORLD.close(); STREAM_WORLD = None
+    if path.endswith(MAP_BINARY_EXT) and os.path.exists(path):
+        with mapfile.MapFile(path) as m:
+            streamed = m.width * m.height > STREAM_MIN_CELLS
+        if streamed:
+            STREAM_WORLD = ChunkedWorld(path, STREAM_REGION_CHUNKS, STREAM_CHUNK, STREAM_BUDGET_MB * 1024 * 1024,
+                                        TILE_CLAMP, default_material_block, clamp_materials)
+            for g in (BASE_MAP, MATERIAL_MAP, WALL_HEIGHTS_FT): g[:] = []
+            update_map_dimensions(); map_changed(); EDITOR_CHUNKS.clear()
+            print(f"Streaming {path} ({MAP_W}x{MAP_H}) in {STREAM_CHUNK}x{STREAM_CHUNK} chunks")
+            return
+    grid, heights, materials = load_map_layers(path)
+    if isinstance(grid, TileGrid): BASE_MAP.adopt(grid)
+    else: BASE_MAP[:] = grid
+    update_map_dimensions(); map_changed()
+    if materials: MATERIAL_MAP.adopt(materials)
+    else: rebuild_materials()
+    if heights: WALL_HEIGHTS_FT.adopt(heights)
+    else: WALL_HEIGHTS_FT[:] = random_wall_heights(BASE_MAP)
+    EDITOR_CHUNKS.clear()
+
+def can_edit():
+    """Streamed worlds are play-only; the editor needs the whole map resident."""
+    if STREAM_WORLD is not None:
+        print("Streamed worlds can't be edited in-game; convert a smaller map to edit")
+        return False
+    return True
+
+EDITOR_TILE_COLORS = ((32, 34, 40), (80, 86, 100), (160, 130, 40))
+EDITOR_PAN_STEP = 4  # cells per arrow-key press
+editor_pan_x = 0; editor_pan_y = 0  # pixels the grid is shifted from centred
+
+def editor_origin():
+    gw, gh = MAP_W*cell_px, MAP_H*cell_px
+    return (SCREEN_W - gw)//2 + editor_pan_x, (SCREEN_H - gh)//2 + editor_pan_y
+
+def editor_render_chunk(x0, y0, w, h, cell):
+    """Tiles, entity icons and grid lines for one w x h block of the editor grid."""
+    s = pygame.Surface((w*cell, h*cell)).convert()
+    if raycast.HAVE_NUMPY:
+        np = raycast.np
+        palette = np.array(EDITOR_TILE_COLORS, dtype=np.uint8)
+        small = pygame.surfarray.make_surface(palette[np.minimum(tile_array()[y0:y0+h, x0:x0+w], 2)].swapaxes(0, 1))
+        pygame.transform.scale(small, (w*cell, h*cell), s)
+    else:
+        rows = [BASE_MAP[y][x0:x0+w] for y in range(y0, y0+h)]
+        for y, row in enumerate(rows):
+            for x, t in enumerate(row):
+                s.fill(EDITOR_TILE_COLORS[min(t, 2)], pygame.Rect(x*cell, y*cell, cell, cell))
+    size = max(6, cell - 4)
+    pad = (cell - size)//2
+    for y in range(y0, y0+h):
+        for x in range(x0, x0+w):
+            kind = cell_has_entity(x, y)
+            if kind is None: continue
+            if kind == "enemy": surf = sprite(ENEMY_CELLS[(x,y)])
+            elif kind == "spawn": surf = sprite("pistol")
+            else: surf = sprite(kind)
+            s.blit(EDITOR_ICONS.get(surf, size), ((x-x0)*cell + pad, (y-y0)*cell + pad))
+    for y in range(h):
+        pygame.draw.line(s, GRID_COLOR, (0, y*cell), (w*cell, y*cell), 1)
+    for x in range(w):
+        pygame.draw.line(s, GRID_COLOR, (x*cell, 0), (x*cell, h*cell), 1)
+    return s
+
+EDITOR_ICONS = IconCache()
+EDITOR_CHUNKS = ChunkCache(editor_render_chunk)  # mark() cells on edits, clear() on whole-map changes
 
 def editor_draw():
+    if screen is None: init_display()
     screen.fill(EDITOR_BG)
     gw, gh = MAP_W*cell_px, MAP_H*cell_px
-    origin_x = (SCREEN_W - gw)//2
-    origin_y = (SCREEN_H - gh)//2
-    # tiles
-    for y in range(MAP_H):
-        for x in range(MAP_W):
-            t = BASE_MAP[y][x]
-            r = pygame.Rect(origin_x + x*cell_px, origin_y + y*cell_px, cell_px, cell_px)
-            if t == 0: col = (32, 34, 40)
-            elif t == 1: col = (80, 86, 100)
-            else: col = (160, 130, 40)
-            pygame.draw.rect(screen, col, r)
-    # entities
-    def blit_icon(surf, cx, cy):
-        size = max(6, cell_px - 4)
-        icon = pygame.transform.smoothscale(surf, (size, size))
-        screen.blit(icon, (origin_x + cx*cell_px + (cell_px-size)//2, origin_y + cy*cell_px + (cell_px-size)//2))
-    for (x,y), etype in ENEMY_CELLS.items():
-        icon = ENEMY_SPRITES.get(etype, SPRITE_ENEMY)
-        blit_icon(icon, x, y)
-    for (x,y) in AMMO_CELLS:   blit_icon(SPRITE_AMMO, x, y)
-    for (x,y) in MEDKIT_CELLS: blit_icon(SPRITE_MEDKIT, x, y)
-    if SPAWN_CELL:
-        blit_icon(HUD_PISTOL, SPAWN_CELL[0], SPAWN_CELL[1])
-    # grid
-    for y in range(MAP_H+1):
-        ypix = origin_y + y*cell_px
-        pygame.draw.line(screen, GRID_COLOR, (origin_x, ypix), (origin_x+gw, ypix), 1)
-    for x in range(MAP_W+1):
-        xpix = origin_x + x*cell_px
-        pygame.draw.line(screen, GRID_COLOR, (xpix, origin_y), (xpix, origin_y+gh), 1)
+    origin_x, origin_y = editor_origin()
+    # tiles, entities and grid come from cached chunks; only the ones on screen are drawn
+    EDITOR_CHUNKS.draw(screen, origin_x, origin_y, MAP_W, MAP_H, cell_px)
     pygame.draw.rect(screen, GRID_BOLD, (origin_x, origin_y, gw, gh), 2)
     # cursor
     mx, my = pygame.mouse.get_pos()
@@ -910,14 +1359,13 @@ def editor_draw():
     cy = clamp((my - origin_y)//cell_px, 0, MAP_H-1)
     r = pygame.Rect(origin_x + cx*cell_px, origin_y + cy*cell_px, cell_px, cell_px)
     pygame.draw.rect(screen, CURSOR_COLOR, r, 2)
-    legend = f"[ESC] Menu  [P] Play  Brush 0/1/2 tiles  3=Enemy[{CURRENT_ENEMY_TYPE}] (G/S/B) 4=Ammo 5=Medkit 6=Spawn   LMB place   RMB eyedrop   Del remove   Ctrl+S/Ctrl+L save/load   N new   Ctrl +/- resize   Wheel zoom"
+    legend = f"[ESC] Menu  [P] Play  Brush 0/1/2 tiles  3=Enemy[{CURRENT_ENEMY_TYPE}] (G/S/B) 4=Ammo 5=Medkit 6=Spawn   LMB place   RMB eyedrop   Del remove   Ctrl+S/Ctrl+L save/load   N new   Ctrl +/- resize   Wheel zoom   Arrows/MMB pan"
     txt = SMALL_FONT.render(legend, True, (230,230,235))
     screen.blit(txt, (10, SCREEN_H-24))
 
 def editor_cell_at_mouse():
     gw, gh = MAP_W*cell_px, MAP_H*cell_px
-    origin_x = (SCREEN_W - gw)//2
-    origin_y = (SCREEN_H - gh)//2
+    origin_x, origin_y = editor_origin()
     mx, my = pygame.mouse.get_pos()
     if not (origin_x <= mx < origin_x+gw and origin_y <= my < origin_y+gh):
         return None
@@ -927,14 +1375,89 @@ def editor_cell_at_mouse():
 def editor_paint_tile(x, y):
     if (x==0 or y==0 or x==MAP_W-1 or y==MAP_H-1) and BRUSH==0:
         return
-    BASE_MAP[y][x] = BRUSH
-    if BASE_MAP[y][x] != 0:
+    if BASE_MAP[y][x] != BRUSH:
+        JOURNAL.tile(y*MAP_W + x)
+        BASE_MAP[y][x] = BRUSH
+        MATERIAL_MAP[y][x] = default_material(BRUSH, x, y)
+        map_changed()
+        EDITOR_CHUNKS.mark(x, y)
+    if BASE_MAP[y][x] != 0 and cell_has_entity(x, y):
+        JOURNAL.entity(x, y)
         remove_entity_at(x, y)
+        EDITOR_CHUNKS.mark(x, y)
 
 def editor_place_entity(x, y):
     kind = {3:"enemy", 4:"ammo", 5:"medkit", 6:"spawn"}.get(BRUSH, None)
     if not kind: return
+    if kind == "spawn" and SPAWN_CELL:
+        JOURNAL.entity(*SPAWN_CELL)
+        EDITOR_CHUNKS.mark(*SPAWN_CELL)  # the old marker disappears
+    JOURNAL.entity(x, y)
     place_entity_at(x, y, kind)
+    EDITOR_CHUNKS.mark(x, y)
+
+def editor_remove_entity(x, y):
+    JOURNAL.entity(x, y)
+    remove_entity_at(x, y)
+    JOURNAL.end()
+    EDITOR_CHUNKS.mark(x, y)
+
+# Undo journal: one command per stroke (mouse down..up) or delete. Whole-level
+# changes (new, resize, load) clear it.
+JOURNAL = Journal(lambda i: (BASE_MAP.data[i], MATERIAL_MAP.data[i]), cell_entities)  # capped at editor_journal.EDITOR_UNDO_MB
+
+def editor_apply(cmd, undo):
+    """Write one journal command's old (undo) or new (redo) side back into the level."""
+    tiles, mats = (cmd.old_tiles, cmd.old_mats) if undo else (cmd.new_tiles, cmd.new_mats)
+    data = BASE_MAP.data; mdata = MATERIAL_MAP.data
+    runs = cmd.runs; k = 0
+    for r in range(0, len(runs), 2):
+        s, n = runs[r], runs[r+1]
+        data[s:s+n] = tiles[k:k+n]; mdata[s:s+n] = mats[k:k+n]
+        k += n
+    for i in cmd.cells():
+        EDITOR_CHUNKS.mark(i % MAP_W, i // MAP_W)
+    if tiles: map_changed()
+    for x, y, old, new in (reversed(cmd.entities) if undo else cmd.entities):
+        set_cell_entities(x, y, old if undo else new)
+        EDITOR_CHUNKS.mark(x, y)
+
+def editor_undo(redo=False):
+    cmd = JOURNAL.redo() if redo else JOURNAL.undo()
+    if cmd: editor_apply(cmd, not redo)
+
+def level_snapshot(map_path, ent_path):
+    """Copies of everything a save writes, so the writer thread never reads live state,
+    plus the journal rev they were taken at."""
+    return (map_path, ent_path, TileGrid.from_buffer(MAP_W, MAP_H, BASE_MAP.data),
+            TileGrid.from_buffer(MAP_W, MAP_H, WALL_HEIGHTS_FT.data, "f"),
+            TileGrid.from_buffer(MAP_W, MAP_H, MATERIAL_MAP.data), entity_table(), JOURNAL.rev)
+
+def write_snapshot(snap):
+    map_path, ent_path, grid, heights, materials, table, _ = snap
+    save_map(grid, map_path, heights, materials)
+    save_entities(ent_path, table)
+
+def write_level_save(snap):
+    """Ctrl+S: the level only counts as saved once the write has succeeded."""
+    write_snapshot(snap)
+    JOURNAL.mark_saved(snap[-1])
+
+EDITOR_SAVER = BackgroundSaver(write_level_save)  # Ctrl+S
+AUTOSAVER = BackgroundSaver(write_snapshot)
+autosave_rev = 0; autosave_at = 0.0
+
+def editor_autosave_tick(now):
+    """Queue a background autosave every AUTOSAVE_SECONDS while there are unsaved edits."""
+    global autosave_rev, autosave_at
+    if not JOURNAL.dirty or JOURNAL.rev == autosave_rev or AUTOSAVER.busy or now - autosave_at < AUTOSAVE_SECONDS:
+        return
+    autosave_rev = JOURNAL.rev; autosave_at = now
+    AUTOSAVER.submit(level_snapshot(AUTOSAVE_MAP_PATH, AUTOSAVE_ENT_PATH))
+
+def quit_game():
+    EDITOR_SAVER.wait(); AUTOSAVER.wait()  # let an in-flight save land
+    pygame.quit(); sys.exit()
 
 def editor_pick_under_cursor(x, y):
     ent = cell_has_entity(x, y)
@@ -950,6 +1473,7 @@ def editor_pick_under_cursor(x, y):
 def editor_handle_event(e):
     # declare globals once at top to avoid 'used prior to global declaration' SyntaxError
     global BRUSH, BASE_MAP, MAP_W, MAP_H, cell_px, EDITOR_MODE, CURRENT_ENEMY_TYPE, WALL_HEIGHTS_FT
+    global editor_pan_x, editor_pan_y
     if e.type == pygame.KEYDOWN:
         if e.key in (pygame.K_p, pygame.K_e):
             # enter play (from editor)
@@ -960,27 +1484,44 @@ def editor_handle_event(e):
             BRUSH = int(e.unicode) if e.unicode.isdigit() else BRUSH
         elif e.key == pygame.K_DELETE or e.key == pygame.K_BACKSPACE:
             c = editor_cell_at_mouse()
-            if c: remove_entity_at(*c)
+            if c: editor_remove_entity(*c)
         elif e.key == pygame.K_s and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-            save_map(BASE_MAP, MAP_SAVE_PATH); save_entities(ENT_SAVE_PATH)
+            EDITOR_SAVER.submit(level_snapshot(MAP_SAVE_PATH, ENT_SAVE_PATH))
         elif e.key == pygame.K_l and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-            BASE_MAP[:] = load_map(MAP_SAVE_PATH); update_map_dimensions(); load_entities(ENT_SAVE_PATH)
-            global WALL_HEIGHTS_FT
-            WALL_HEIGHTS_FT[:] = [[(random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT) if t==1 else (DOOR_HEIGHT_FT if t==2 else 0.0)) for t in row] for row in BASE_MAP]
-            filter_entities_within_bounds()
+            EDITOR_SAVER.wait()
+            load_level(map_load_path()); load_entities(ENT_SAVE_PATH)
+            filter_entities_within_bounds(); JOURNAL.clear()
+            if not can_edit():  # loaded a streamed world: nothing resident to edit, play it instead
+                EDITOR_MODE = False
+                pygame.event.set_grab(True); pygame.mouse.set_visible(False)
+                restart_run()
+        elif e.key == pygame.K_z and (pygame.key.get_mods() & pygame.KMOD_CTRL):
+            editor_undo(redo=bool(pygame.key.get_mods() & pygame.KMOD_SHIFT))
+        elif e.key == pygame.K_y and (pygame.key.get_mods() & pygame.KMOD_CTRL):
+            editor_undo(redo=True)
         elif e.key in (pygame.K_g, pygame.K_s, pygame.K_b):
             if BRUSH == 3:
                 if e.key == pygame.K_g: CURRENT_ENEMY_TYPE = "grunt"
                 elif e.key == pygame.K_s: CURRENT_ENEMY_TYPE = "scout"
                 elif e.key == pygame.K_b: CURRENT_ENEMY_TYPE = "brute"
         elif e.key == pygame.K_n:
-            BASE_MAP[:] = make_blank_map(MAP_W, MAP_H); clear_entities()
+            BASE_MAP[:] = make_blank_map(MAP_W, MAP_H); map_changed(); rebuild_materials(); clear_entities()
+            EDITOR_CHUNKS.clear(); JOURNAL.clear()
         elif (e.key in (pygame.K_EQUALS, pygame.K_KP_PLUS)) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-            new_w = clamp(MAP_W + 2, 5, 255); new_h = clamp(MAP_H + 2, 5, 255); resize_to(new_w, new_h)
+            new_w = clamp(MAP_W + 2, 5, MAP_MAX_DIM); new_h = clamp(MAP_H + 2, 5, MAP_MAX_DIM); resize_to(new_w, new_h)
         elif (e.key in (pygame.K_MINUS, pygame.K_KP_MINUS)) and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-            new_w = clamp(MAP_W - 2, 5, 255); new_h = clamp(MAP_H - 2, 5, 255); resize_to(new_w, new_h)
+            new_w = clamp(MAP_W - 2, 5, MAP_MAX_DIM); new_h = clamp(MAP_H - 2, 5, MAP_MAX_DIM); resize_to(new_w, new_h)
+        elif e.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            step = EDITOR_PAN_STEP * cell_px
+            if e.key == pygame.K_LEFT: editor_pan_x += step
+            elif e.key == pygame.K_RIGHT: editor_pan_x -= step
+            elif e.key == pygame.K_UP: editor_pan_y += step
+            else: editor_pan_y -= step
+        elif e.key == pygame.K_HOME:
+            editor_pan_x = editor_pan_y = 0
     elif e.type == pygame.MOUSEBUTTONDOWN:
         c = editor_cell_at_mouse()
+        if e.button == 1: JOURNAL.end()  # a stroke whose button-up we missed
         if e.button == 1 and c:
             x,y = c
             if BRUSH in (0,1,2): editor_paint_tile(x,y)
@@ -991,25 +1532,83 @@ def editor_handle_event(e):
             cell_px = clamp(cell_px + 2, EDITOR_MIN_CELL, EDITOR_MAX_CELL)
         elif e.button == 5:
             cell_px = clamp(cell_px - 2, EDITOR_MIN_CELL, EDITOR_MAX_CELL)
+    elif e.type == pygame.MOUSEBUTTONUP and e.button == 1:
+        JOURNAL.end()
+    elif e.type == pygame.MOUSEMOTION and pygame.mouse.get_pressed()[1]:
+        editor_pan_x += e.rel[0]; editor_pan_y += e.rel[1]
     elif e.type == pygame.MOUSEMOTION and pygame.mouse.get_pressed()[0]:
         c = editor_cell_at_mouse()
         if c and BRUSH in (0,1,2): editor_paint_tile(*c)
 
+def profiler_key(key):
+    """F3/F4/F5 work in every mode (menu, play, editor)."""
+    if key == pygame.K_F3:
+        on = PROFILER.toggle(globals(), PROFILE_SCOPES)
+        print("Profiler:", "ON" if on else "OFF")
+    elif key == pygame.K_F4:
+        print(f"Profile frames written to {PROFILER.dump_csv()}")
+    elif key == pygame.K_F5:
+        path = PROFILER.capture(PROFILE_CAPTURE_FRAMES)
+        if path: print(f"cProfile capturing {PROFILE_CAPTURE_FRAMES} frames -> {path}")
+
 def all_enemies_down():
-    return len(enemies) > 0 and all(not e.alive for e in enemies)
+    return len(enemies) > 0 and len(ENEMY_INDEX) == 0
+
+# =========================
+# Fixed-timestep simulation
+# =========================
+def sim_tick(inp):
+    """Advance the game by exactly SIM_DT."""
+    global time_since_shot, win, SIM_TICK
+    snapshot_positions()
+    SIM_TICK += 1
+    time_since_shot += SIM_DT
+    apply_inputs(inp, SIM_DT)
+    stream_update()
+    if inp.fire: hitscan_shot()
+    update_enemies(SIM_DT)
+    try_pickups()
+    if all_enemies_down(): win = True
+
+def advance_sim(frame_dt, inp):
+    """Run the ticks owed for frame_dt of real time (or SIM_TICKS_PER_FRAME); returns the count."""
+    global SIM_ACC, SIM_ALPHA
+    if SIM_TICKS_PER_FRAME > 0:
+        steps = SIM_TICKS_PER_FRAME
+    else:
+        SIM_ACC = min(SIM_ACC + frame_dt, SIM_DT * SIM_MAX_STEPS)
+        steps = int(SIM_ACC / SIM_DT)
+        SIM_ACC -= steps * SIM_DT
+    done = 0
+    while done < steps and not died and not win:
+        sim_tick(inp); done += 1
+    SIM_ALPHA = 1.0 if SIM_TICKS_PER_FRAME > 0 else SIM_ACC / SIM_DT
+    return done
+
+def run_headless(ticks, inputs=None):
+    """Simulate `ticks` fixed steps with no rendering. inputs(tick) -> SimInput (default: idle)."""
+    for i in range(ticks):
+        if died or win: return i
+        sim_tick(inputs(i) if inputs else NO_INPUT)
+    return ticks
 
 # Override main loop with new UI state handling
 def main():
     global time_since_shot, muzzle_alpha, EDITOR_MODE, SHOW_MINIMAP_PLAY, died, win, START_MENU, PAUSED
-    zbuffer = [MAX_VIEW_DIST]*SCREEN_W
+    init_display()
     while True:
         dt = clock.tick(60)/1000.0
-        time_since_shot += dt
+        PROFILER.begin_frame()
+        if DYNRES_ENABLED and not START_MENU and not EDITOR_MODE:
+            DYNRES.frame(clock.get_rawtime())  # work time of the frame just shown, excluding the tick delay
         muzzle_alpha = max(0.0, muzzle_alpha - 6.0*dt)
 
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
+                quit_game()
+            if e.type == pygame.KEYDOWN and e.key in (pygame.K_F3, pygame.K_F4, pygame.K_F5):
+                profiler_key(e.key)
+                continue
 
             # START MENU EVENTS
             if START_MENU:
@@ -1017,11 +1616,11 @@ def main():
                     if e.key == pygame.K_1:
                         START_MENU = False; EDITOR_MODE = False; PAUSED = False
                         restart_run(); pygame.event.set_grab(True); pygame.mouse.set_visible(False)
-                    elif e.key == pygame.K_2:
+                    elif e.key == pygame.K_2 and can_edit():
                         START_MENU = False; EDITOR_MODE = True; PAUSED = False
                         pygame.event.set_grab(False); pygame.mouse.set_visible(True)
                     elif e.key == pygame.K_ESCAPE:
-                        pygame.quit(); sys.exit()
+                        quit_game()
                 continue
 
             # EDITOR EVENTS
@@ -1039,20 +1638,20 @@ def main():
                         PAUSED = False; pygame.event.set_grab(True); pygame.mouse.set_visible(False)
                     elif e.key == pygame.K_t:  # restart
                         restart_run(); PAUSED = False
-                    elif e.key == pygame.K_e:  # editor
+                    elif e.key == pygame.K_e and can_edit():  # editor
                         EDITOR_MODE = True; PAUSED = False
                         pygame.event.set_grab(False); pygame.mouse.set_visible(True)
                     elif e.key == pygame.K_m:  # main menu
                         START_MENU = True; PAUSED = False
                         pygame.event.set_grab(False); pygame.mouse.set_visible(True)
                     elif e.key == pygame.K_ESCAPE:
-                        pygame.quit(); sys.exit()
+                        quit_game()
                 else:
                     if e.key == pygame.K_p:
                         PAUSED = True; pygame.event.set_grab(False); pygame.mouse.set_visible(True)
                     elif e.key == pygame.K_m:
                         SHOW_MINIMAP_PLAY = not SHOW_MINIMAP_PLAY
-                    elif e.key == pygame.K_e:
+                    elif e.key == pygame.K_e and can_edit():
                         EDITOR_MODE = True; pygame.event.set_grab(False); pygame.mouse.set_visible(True)
                     elif e.key == pygame.K_r and (died or win):
                         restart_run()
@@ -1070,36 +1669,43 @@ def main():
             draw_start_menu()
         elif EDITOR_MODE:
             editor_draw()
-            cap = f"EDITOR — Tiles: 0/1/2  Entities: 3 Enemy[{CURRENT_ENEMY_TYPE}] (G/S/B) 4 Ammo 5 Medkit 6 Spawn | LMB place  RMB eyedrop  Del remove | S/L save/load  N new  Ctrl +/- resize  Wheel zoom  P Play  ESC Menu"
+            editor_autosave_tick(pygame.time.get_ticks() / 1000.0)
+            cap = f"EDITOR — Tiles: 0/1/2  Entities: 3 Enemy[{CURRENT_ENEMY_TYPE}] (G/S/B) 4 Ammo 5 Medkit 6 Spawn | LMB place  RMB eyedrop  Del remove | Ctrl+Z/Y undo/redo  S/L save/load  N new  Ctrl +/- resize  Wheel zoom  P Play  ESC Menu"
             t = HUD_FONT.render(cap, True, (245, 245, 250))
             screen.blit(t, (10, 10))
         else:
             if not PAUSED:
                 if not died and not win:
-                    get_inputs(dt)
-                    update_enemies(dt)
-                    try_pickups()
-                    if all_enemies_down(): win = True
-                cast_and_draw(zbuffer)
-                render_sprites(zbuffer)
+                    advance_sim(dt, read_inputs())
+                update_camera()
+                draw_world()
                 if SHOW_MINIMAP_PLAY: draw_minimap()
                 draw_hud(SHOW_MINIMAP_PLAY)
                 hint = SMALL_FONT.render("[P] Pause  [E] Editor  [M] Minimap  [LMB/Space] Shoot  [R] Restart (dead/win)", True, (220,220,230))
                 screen.blit(hint, (10, 10))
             else:
-                cast_and_draw(zbuffer)
-                render_sprites(zbuffer)
+                draw_world()
                 if SHOW_MINIMAP_PLAY: draw_minimap()
                 draw_hud(SHOW_MINIMAP_PLAY)
                 draw_pause_menu()
 
+        PROFILER.draw(screen, SMALL_FONT, SCREEN_W - PROFILER.frames.maxlen - 14, 44)
         pygame.display.flip()
+        PROFILER.end_frame()
+        if "first_frame" not in STARTUP_MS:
+            report_startup()
+
+def report_startup():
+    STARTUP_MS["first_frame"] = (time.perf_counter() - IMPORT_STARTED) * 1000
+    print("Startup: import {import:.0f} ms, display + textures {display:.0f} ms, first frame at {first_frame:.0f} ms"
+          .format(**STARTUP_MS))
+
+STARTUP_MS["import"] = (time.perf_counter() - IMPORT_STARTED) * 1000
 
 if __name__ == "__main__":
     # try load existing stuff if present
-    if os.path.exists(MAP_SAVE_PATH):
-        BASE_MAP[:] = load_map(MAP_SAVE_PATH)
-        MAP_H = len(BASE_MAP); MAP_W = len(BASE_MAP[0])
+    if os.path.exists(map_load_path()):
+        load_level(map_load_path())
     if os.path.exists(ENT_SAVE_PATH):
         load_entities(ENT_SAVE_PATH)
     main()
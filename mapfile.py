@@ -0,0 +1,191 @@
+"""Binary level format (.mwm): a small header, a layer table and raw layer data.
+
+Layout (little-endian):
+
+    header   4s magic "MWMP", u16 version, u16 layer count, u32 width, u32 height, u32 flags
+    table    per layer: 4s name, u8 typecode ('B' uint8 / 'f' float32), 3x pad, u64 offset, u64 nbytes
+    data     each layer is width*height values in row-major order, starting on a 64-byte boundary
+
+Standard layers are TILE (uint8 tile ids), HGHT (float32 wall heights in
+feet), MATL (uint8 material ids) and LITE (uint8 light levels); readers skip
+layers they don't know. MapFile memory-maps the file, so layers come back as
+zero-copy views without parsing. Convert from/to the ASCII maps with:
+
+    python mapfile.py convert map2.txt map2.mwm
+    python mapfile.py convert map2.mwm map2.txt
+    python mapfile.py info map2.mwm
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+MAGIC = b"MWMP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+LAYER = struct.Struct("<4sB3xQQ")
+ALIGN = 64
+
+LAYER_TILES = b"TILE"
+LAYER_HEIGHTS = b"HGHT"
+LAYER_MATERIALS = b"MATL"
+LAYER_LIGHTS = b"LITE"
+TYPECODES = {"B": 1, "f": 4}  # typecode -> item size
+NP_DTYPES = {"B": "<u1", "f": "<f4"}
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_map(path, width, height, layers):
+    """Write {name: (typecode, data)} where data is any buffer (bytes, array,
+    ndarray) holding width*height values. Written to a temp file and renamed
+    into place, so readers never see a half-written map."""
+    table = []
+    offset = _align(HEADER.size + LAYER.size * len(layers))
+    blobs = []
+    for name, (code, data) in layers.items():
+        if code not in TYPECODES:
+            raise ValueError(f"layer {name!r}: unsupported typecode {code!r}")
+        blob = memoryview(data).cast("B")
+        if blob.nbytes != width * height * TYPECODES[code]:
+            raise ValueError(f"layer {name!r}: expected {width * height} values")
+        table.append(LAYER.pack(name, ord(code), offset, blob.nbytes))
+        blobs.append((offset, blob))
+        offset = _align(offset + blob.nbytes)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(layers), width, height, 0))
+        f.write(b"".join(table))
+        for off, blob in blobs:
+            f.write(b"\0" * (off - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+class MapFile:
+    """Read-only memory-mapped .mwm file. Keep it open while views are in use."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._f.close()
+            raise ValueError(f"{path}: not a map file")
+        if self._mm.size() < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a map file")
+        magic, self.version, count, self.width, self.height, self.flags = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a map file")
+        if self.version > VERSION:
+            self.close()
+            raise ValueError(f"{path}: format version {self.version} is newer than {VERSION}")
+        self.layers = {}  # name -> (typecode, offset, nbytes)
+        for i in range(count):
+            name, code, off, n = LAYER.unpack_from(self._mm, HEADER.size + i * LAYER.size)
+            if off + n > self._mm.size():
+                self.close()
+                raise ValueError(f"{path}: layer {name!r} runs past the end of the file")
+            if chr(code) in TYPECODES and n != self.width * self.height * TYPECODES[chr(code)]:
+                self.close()
+                raise ValueError(f"{path}: layer {name!r} is {n} bytes, expected {self.width}x{self.height} values")
+            self.layers[name] = (chr(code), off, n)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def has(self, name):
+        return name in self.layers
+
+    def layer(self, name):
+        """Flat zero-copy memoryview of a layer (format 'B' or 'f')."""
+        code, off, n = self.layers[name]
+        return memoryview(self._mm)[off:off + n].cast(code)
+
+    def array(self, name):
+        """Zero-copy read-only (height, width) ndarray view of a layer (needs numpy)."""
+        code, off, n = self.layers[name]
+        return np.frombuffer(self._mm, dtype=NP_DTYPES[code], count=self.width * self.height,
+                             offset=off).reshape(self.height, self.width)
+
+    def rows(self, name):
+        """Layer copied out as a list of row lists."""
+        view = self.layer(name)
+        w = self.width
+        return [view[y * w:(y + 1) * w].tolist() for y in range(self.height)]
+
+
+def grid_layer(grid, typecode="B"):
+    """Flatten a list-of-rows grid into an array() suitable for write_map."""
+    out = array(typecode)
+    for row in grid:
+        out.extend(row)
+    return out
+
+
+# =========================
+# ASCII maps (one digit per tile)
+# =========================
+def read_ascii(path):
+    """(width, height, bytearray of tiles) from a digit-per-tile map; non-digits are walls
+    and short rows are padded with wall."""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(bytes(int(ch) if ch.isdigit() else 1 for ch in line))
+    w = max(len(r) for r in rows)
+    tiles = bytearray()
+    for r in rows:
+        tiles += r + b"\x01" * (w - len(r))
+    return w, len(rows), tiles
+
+
+def write_ascii(path, width, height, tiles):
+    with open(path, "w") as f:
+        for y in range(height):
+            f.write("".join(str(min(v, 9)) for v in tiles[y * width:(y + 1) * width]) + "\n")
+
+
+def convert(src, dst):
+    if src.endswith(".mwm"):
+        with MapFile(src) as m:
+            write_ascii(dst, m.width, m.height, m.layer(LAYER_TILES))
+    else:
+        w, h, tiles = read_ascii(src)
+        write_map(dst, w, h, {LAYER_TILES: ("B", tiles)})
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) == 3 and args[0] == "convert":
+        convert(args[1], args[2])
+        print(f"{args[1]} -> {args[2]}")
+    elif len(args) == 2 and args[0] == "info":
+        with MapFile(args[1]) as m:
+            print(f"{args[1]}: v{m.version} {m.width}x{m.height}")
+            for name, (code, off, n) in m.layers.items():
+                print(f"  {name.decode(errors='replace')} {code} @{off} {n} bytes")
+    else:
+        print(__doc__)
@@ -1,7 +1,16 @@
 import math
 import sys
 import random
+import time
+from array import array
+IMPORT_STARTED = time.perf_counter()  # startup is reported after the first frame
 import pygame
+import raycast
+import maze_gen
+from tilegrid import TileGrid
+from column_cache import ColumnCache
+from atlas import TextureAtlas
+from asset_cache import AssetCache
 
 # ---------- Config ----------
 SCREEN_W, SCREEN_H = 800, 600
@@ -12,6 +21,9 @@ MOVE_SPEED = 3.0       # units / sec
 TURN_SPEED = 2.2       # rad / sec
 DEADZONE = 0.12
 TEX_SIZE = 64 
+VECTOR_RAYCAST = True  # cast all columns at once with NumPy when available
+COLUMN_CACHE_MB = 32   # memory ceiling for prescaled wall columns
+ASSET_CACHE_DIR = ".asset_cache"  # baked textures (asset_cache.py); rebuilt when sources change
 
 # Maze config (use odd dimensions for pretty mazes)
 # These are runtime-adjustable now; use the controls to change them.
@@ -19,6 +31,7 @@ MAZE_W = 32  # columns
 MAZE_H = 32  # rows
 DOOR_FRACTION = 0.0015  # ~1.5% of cells become "doors" (2); set 0 to disable
 RNG_SEED = random.randint(0, 27000000000)        # set to an int for reproducible mazes
+MAZE_GENERATOR = "backtracker"  # maze_gen.GENERATORS: backtracker / eller / sidewinder; cycle: G
 
 # Minimap config
 MINIMAP_MARGIN = 10
@@ -47,108 +60,115 @@ ENABLE_MORPH = True          # toggle: R  (R for "randomization")
 ENABLE_RAND_HEIGHTS = False  # toggle: H  (random wall height scaling)
 
 # ---------- Maze Generation ----------
-# 1=wall, 0=floor, 2=door
-def generate_maze_grid(w, h, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    w = max(5, w | 1)
-    h = max(5, h | 1)
-    grid = [[1 for _ in range(w)] for _ in range(h)]
-    start_x, start_y = 1, 1
-    grid[start_y][start_x] = 0
-    stack = [(start_x, start_y)]
-
-    def neighbors(x, y):
-        dirs = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-        random.shuffle(dirs)
-        for dx, dy in dirs:
-            nx, ny = x + dx, y + dy
-            if 1 <= nx < w - 1 and 1 <= ny < h - 1 and grid[ny][nx] == 1:
-                yield (nx, ny, dx, dy)
-
-    while stack:
-        x, y = stack[-1]
-        for nx, ny, dx, dy in neighbors(x, y):
-            grid[y + dy // 2][x + dx // 2] = 0
-            grid[ny][nx] = 0
-            stack.append((nx, ny))
-            break
-        else:
-            stack.pop()
-    return grid
+# 1=wall, 0=floor, 2=door. Grids are flat TileGrids (grid[y][x] still works).
+np = raycast.np
 
 def sprinkle_doors(world, fraction=0.01):
-    h = len(world); w = len(world[0])
-    candidates = []
-    for y in range(1, h - 1):
-        for x in range(1, w - 1):
-            if world[y][x] != 1: continue
-            ns = (world[y - 1][x] == 0 and world[y + 1][x] == 0)
-            ew = (world[y][x - 1] == 0 and world[y][x + 1] == 0)
-            if ns or ew:
-                candidates.append((x, y))
-    random.shuffle(candidates)
-    count = int(w * h * fraction)
-    for i in range(min(count, len(candidates))):
-        x, y = candidates[i]
-        world[y][x] = 2
+    """Turn a random `fraction` of the cells that are walls between two floors into doors."""
+    w, h = world.width, world.height
+    if np is not None:
+        a = world.array()
+        inner = a[1:-1, 1:-1]
+        ns = (a[:-2, 1:-1] == 0) & (a[2:, 1:-1] == 0)
+        ew = (a[1:-1, :-2] == 0) & (a[1:-1, 2:] == 0)
+        cy, cx = np.divmod(np.flatnonzero((inner == 1) & (ns | ew)), w - 2)
+        candidates = (cy + 1) * w + cx + 1
+    else:
+        d = world.data
+        candidates = [i for y in range(1, h - 1) for i in range(y * w + 1, y * w + w - 1)
+                      if d[i] == 1 and ((d[i - w] == 0 and d[i + w] == 0) or (d[i - 1] == 0 and d[i + 1] == 0))]
+    count = min(int(w * h * fraction), len(candidates))
+    for k in random.sample(range(len(candidates)), count):
+        world.data[int(candidates[k])] = 2
+
+# Door face table: the one side of each door that shows the door texture (the others show
+# wall), chosen from BASE_MAP once per level instead of per ray. 0 = not a door / no face.
+FACE_NONE, FACE_N, FACE_S, FACE_W, FACE_E = range(5)
+FACE_DIRS = ((0, -1, FACE_N), (0, 1, FACE_S), (-1, 0, FACE_W), (1, 0, FACE_E))
+
+def door_face(base, x, y):
+    """Canonical face of the door at (x, y): prefer a floor side whose corridor continues
+    into floor, else pick among the floor sides by tile parity."""
+    w, h = base.width, base.height
+    floor_dirs = [(dx, dy, f) for dx, dy, f in FACE_DIRS
+                  if 0 <= x + dx < w and 0 <= y + dy < h and base[y + dy][x + dx] == 0]
+    for dx, dy, f in floor_dirs:
+        bx, by = x + 2 * dx, y + 2 * dy
+        if 0 <= bx < w and 0 <= by < h and base[by][bx] == 0:
+            return f
+    if floor_dirs:
+        return floor_dirs[((x + y) & 1) % len(floor_dirs)][2]
+    return FACE_NONE
+
+def build_door_faces(base):
+    """Per-cell FACE_* byte for every door in base (TileGrid parallel to it)."""
+    faces = TileGrid(base.width, base.height)
+    w = base.width
+    if np is not None:
+        doors = np.flatnonzero(base.array() == 2).tolist()
+    else:
+        doors = [i for i, t in enumerate(base.data) if t == 2]
+    for i in doors:
+        y, x = divmod(i, w)
+        faces.data[i] = door_face(base, x, y)
+    return faces
 
 def pick_spawn(world):
-    h = len(world); w = len(world[0])
-    open_cells = [(x, y) for y in range(1, h - 1) for x in range(1, w - 1) if world[y][x] == 0]
-    if not open_cells:
+    w, h = world.width, world.height
+    if np is not None:
+        open_cells = np.flatnonzero(world.array()[1:-1, 1:-1] == 0)  # interior, row-major
+    else:
+        d = world.data
+        open_cells = [(y - 1) * (w - 2) + x - 1 for y in range(1, h - 1) for x in range(1, w - 1) if d[y * w + x] == 0]
+    if not len(open_cells):
         cx, cy = w // 2, h // 2
         world[cy][cx] = 0
         return (cx + 0.5, cy + 0.5)
-    x, y = random.choice(open_cells)
-    return (x + 0.5, y + 0.5)
-
-def regenerate_map(w, h, seed=None):
-    """Generate WORLD_MAP, BASE_MAP, MAP_W, MAP_H and WALL_HEIGHTS_FT for new dimensions.
-    Returns tuple (WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT).
+    y, x = divmod(int(open_cells[random.randrange(len(open_cells))]), w - 2)
+    return (x + 1.5, y + 1.5)
+
+def random_wall_heights(base):
+    """Random height per wall, DOOR_HEIGHT_FT on doors, 0 on floors (float32 TileGrid)."""
+    heights = TileGrid(base.width, base.height, "f")
+    if np is not None:
+        t = base.array(); out = heights.array()
+        walls = t == 1
+        rng = np.random.default_rng(random.getrandbits(64))
+        out[walls] = rng.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT, int(np.count_nonzero(walls)))
+        out[t == 2] = DOOR_HEIGHT_FT
+        return heights
+    uniform = random.uniform
+    heights.data[:] = array("f", [uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT) if t == 1 else
+                                  DOOR_HEIGHT_FT if t == 2 else 0.0 for t in base.data])
+    return heights
+
+def regenerate_map(w, h, seed=None, generator=None):
+    """Generate WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT and DOOR_FACES for new
+    dimensions with the named maze_gen generator (MAZE_GENERATOR by default).
+    Returns tuple (WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT, DOOR_FACES).
     """
-    world = generate_maze_grid(w, h, seed=seed)
+    if seed is not None:
+        random.seed(seed)
+    map_w, map_h, tiles = maze_gen.generate(generator or MAZE_GENERATOR, w, h, random)
+    world = TileGrid.from_buffer(map_w, map_h, tiles)
     if DOOR_FRACTION > 0:
         sprinkle_doors(world, DOOR_FRACTION)
-    map_w, map_h = len(world[0]), len(world)
-    base = [row[:] for row in world]
-    heights = [[0.0 for _ in range(map_w)] for _ in range(map_h)]
-    for yy in range(map_h):
-        for xx in range(map_w):
-            t = base[yy][xx]
-            if t == 1:
-                heights[yy][xx] = random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT)
-            elif t == 2:
-                heights[yy][xx] = DOOR_HEIGHT_FT
-            else:
-                heights[yy][xx] = 0.0
-    return world, base, map_w, map_h, heights
+    base = TileGrid.from_buffer(map_w, map_h, world.data)
+    return world, base, map_w, map_h, random_wall_heights(base), build_door_faces(base)
 
 
-WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT = regenerate_map(MAZE_W, MAZE_H, seed=RNG_SEED)
-
-# Per-tile wall/door heights (in feet) for base walls/doors
-WALL_HEIGHTS_FT = [[0.0 for _ in range(MAP_W)] for _ in range(MAP_H)]
-for y in range(MAP_H):
-    for x in range(MAP_W):
-        t = BASE_MAP[y][x]
-        if t == 1:  # wall
-            WALL_HEIGHTS_FT[y][x] = random.uniform(WALL_MIN_HEIGHT_FT, WALL_MAX_HEIGHT_FT)
-        elif t == 2:  # door
-            WALL_HEIGHTS_FT[y][x] = DOOR_HEIGHT_FT
-        else:
-            WALL_HEIGHTS_FT[y][x] = 0.0  # floor
+# The maze is generated by new_level() (main() calls it when none exists yet)
+WORLD_MAP = BASE_MAP = WALL_HEIGHTS_FT = MATERIAL_MAP = DOOR_FACES = None
+MAP_W = MAP_H = 0
 
 # ---------- Init ----------
-pygame.init()
-pygame.joystick.init()
-
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-pygame.display.set_caption("First Person 3D Renderer (No-Strafe) + Minimap + Distant Morphing")
-clock = pygame.time.Clock()
-
-# HUD font
-HUD_FONT = pygame.font.SysFont(None, 18)
+# Nothing here touches the display: init_display() opens the window, loads the
+# textures and looks for a joystick, so the maze/morph code imports headless.
+screen = None
+clock = None
+HUD_FONT = None
+joy = None
+STARTUP_MS = {}  # import / display init / first frame, milliseconds since IMPORT_STARTED
 
 # Secret/debug mode state (disabled by default). Use a hidden key sequence to toggle.
 DEBUG_MODE = False
@@ -162,37 +182,73 @@ _secret_idx = 0
 
 # Textures
 def load_scaled(path):
-    surf = pygame.image.load(path).convert()
-    return pygame.transform.scale(surf, (TEX_SIZE, TEX_SIZE))
-
-stone = load_scaled("cobblestone.png")
-brick = load_scaled("brick.jpg")
-wood = load_scaled("wood.jpeg")
-door_red = load_scaled("red.png")
-door_blue = load_scaled("blue.png")
-
-def pick_wall_texture(mx, my):
-    s = (mx + my) % 3
-    if s == 0: return stone
-    elif s == 1: return brick
-    else: return wood
-
-def pick_door_texture(mx, my):
-    return door_red if ((mx ^ my) & 1) == 0 else door_blue
-
-# Player (spawn on a floor tile, centered)
-spawn_x, spawn_y = pick_spawn(BASE_MAP)
-player_pos = pygame.Vector2(spawn_x, spawn_y)
+    return pygame.transform.scale(pygame.image.load(path), (TEX_SIZE, TEX_SIZE))
+
+COLUMN_CACHE = ColumnCache(COLUMN_CACHE_MB * 1024 * 1024)
+
+# Wall/door textures packed into one atlas (mips + pre-shaded y-side copies); material ids
+# are fixed so material maps don't wait for the textures
+ATLAS = TextureAtlas(TEX_SIZE)
+ASSETS = AssetCache(ASSET_CACHE_DIR)
+MATERIAL_TEXTURES = (("stone", "cobblestone.png"), ("brick", "brick.jpg"), ("wood", "wood.jpeg"),
+                     ("door_red", "red.png"), ("door_blue", "blue.png"))
+MAT_STONE, MAT_BRICK, MAT_WOOD, MAT_DOOR_RED, MAT_DOOR_BLUE = range(len(MATERIAL_TEXTURES))
+WALL_MATERIALS = (MAT_STONE, MAT_BRICK, MAT_WOOD)
+
+def init_display():
+    """Open the window, load the textures and pick up a joystick (once); returns the screen."""
+    global screen, clock, HUD_FONT, joy
+    if screen is not None:
+        return screen
+    t0 = time.perf_counter()
+    pygame.init()
+    pygame.joystick.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("First Person 3D Renderer (No-Strafe) + Minimap + Distant Morphing")
+    clock = pygame.time.Clock()
+    HUD_FONT = pygame.font.SysFont(None, 18)
+    ASSETS.atlas(ATLAS, [(name, path, lambda path=path: load_scaled(path)) for name, path in MATERIAL_TEXTURES])
+    if pygame.joystick.get_count() > 0:
+        joy = pygame.joystick.Joystick(0)
+        joy.init()
+        print("Joystick detected:", joy.get_name())
+    else:
+        print("No joystick detected. Using keyboard controls.")
+    STARTUP_MS["display"] = (time.perf_counter() - t0) * 1000
+    return screen
+
+def wall_material(mx, my):
+    return WALL_MATERIALS[(mx + my) % 3]
+
+def door_material(mx, my):
+    return MAT_DOOR_RED if ((mx ^ my) & 1) == 0 else MAT_DOOR_BLUE
+
+def build_material_map(world):
+    """Material id per tile, stored alongside BASE_MAP. Floors get a wall
+    material too so tiles that morph into walls are already textured."""
+    w, h = world.width, world.height
+    if np is not None:
+        t = world.array()
+        x = np.arange(w)[None, :]; y = np.arange(h)[:, None]
+        walls = np.asarray(WALL_MATERIALS, dtype=np.uint8)[(x + y) % 3]
+        doors = np.where(((x ^ y) & 1) == 0, MAT_DOOR_RED, MAT_DOOR_BLUE).astype(np.uint8)
+        return TileGrid.from_buffer(w, h, np.where(t == 2, doors, walls).astype(np.uint8).tobytes())
+    return TileGrid.from_rows([[door_material(x, y) if t == 2 else wall_material(x, y) for x, t in enumerate(row)]
+                               for y, row in enumerate(world)])
+
+# Player (spawned on a floor tile, centred, by new_level())
+player_pos = pygame.Vector2(1.5, 1.5)
 player_ang = 0.0
 
-# Joystick (optional)
-joy = None
-if pygame.joystick.get_count() > 0:
-    joy = pygame.joystick.Joystick(0)
-    joy.init()
-    print("Joystick detected:", joy.get_name())
-else:
-    print("No joystick detected. Using keyboard controls.")
+def new_level(w, h, seed=None):
+    """Generate a w x h maze (seeded by RNG_SEED unless given) with its heights and materials
+    and drop the player into it."""
+    global WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT, MATERIAL_MAP, DOOR_FACES, player_pos
+    global MORPH_TILES, VIEW_TILES
+    WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT, DOOR_FACES = regenerate_map(w, h, seed=RNG_SEED if seed is None else seed)
+    MATERIAL_MAP = build_material_map(BASE_MAP)
+    player_pos = pygame.Vector2(*pick_spawn(BASE_MAP))
+    MORPH_TILES = VIEW_TILES = None
 
 # ---------- Helpers ----------
 def in_map(mx, my):
@@ -224,22 +280,91 @@ def _perturb_tile(base_t, mx, my, phase_idx):
             return 0
     return base_t
 
+# Morph state: MORPH_TILES is BASE_MAP with this phase's flips, rebuilt only when phase_idx
+# changes; VIEW_TILES is MORPH_TILES with the safe bubble around the viewer restored to
+# BASE_MAP, re-overlaid when the viewer moves. Raycaster, collision and minimap read VIEW_TILES.
+MORPH_TILES = VIEW_TILES = None
+MORPH_PHASE = None
+_VIEW_KEY = None  # (phase_idx, px, py) VIEW_TILES was overlaid for
+_BUBBLE = None    # (x0, y0, x1, y1) of VIEW_TILES currently showing BASE_MAP
+
+def _flip_mask(phase_idx):
+    """Cells where _hash01(x, y, phase_idx) < FLIP_PROB, as a (h, w) bool array."""
+    hx = np.arange(MAP_W, dtype=np.uint32) * np.uint32(73856093)  # uint32 wraps like the & 0xFFFFFFFF
+    hy = np.arange(MAP_H, dtype=np.uint32) * np.uint32(19349663)
+    h = hy[:, None] ^ hx[None, :] ^ np.uint32((phase_idx * 83492791) & 0xFFFFFFFF)
+    h ^= h << np.uint32(13)
+    h ^= h >> np.uint32(17)
+    h ^= h << np.uint32(5)
+    return h / 4294967295.0 < FLIP_PROB
+
+def morph_tiles(phase_idx):
+    """BASE_MAP with phase_idx's wall<->floor flips (doors never morph), no safe bubble."""
+    global MORPH_TILES, MORPH_PHASE, VIEW_TILES, _VIEW_KEY, _BUBBLE
+    if MORPH_TILES is not None and MORPH_PHASE == phase_idx:
+        return MORPH_TILES
+    if np is not None:
+        base = BASE_MAP.array()
+        if MORPH_TILES is None:
+            MORPH_TILES = TileGrid(MAP_W, MAP_H)
+        np.bitwise_xor(base, _flip_mask(phase_idx) & (base != 2), out=MORPH_TILES.array())
+    else:
+        MORPH_TILES = TileGrid.from_rows([[_perturb_tile(t, x, y, phase_idx) for x, t in enumerate(row)]
+                                          for y, row in enumerate(BASE_MAP)])
+    MORPH_PHASE = phase_idx
+    VIEW_TILES = TileGrid.from_buffer(MAP_W, MAP_H, MORPH_TILES.data)
+    _VIEW_KEY = _BUBBLE = None
+    return MORPH_TILES
+
+def _update_view(px, py, phase_idx):
+    global _VIEW_KEY, _BUBBLE
+    morph_tiles(phase_idx)
+    if _VIEW_KEY == (phase_idx, px, py):
+        return
+    _VIEW_KEY = (phase_idx, px, py)
+    if _BUBBLE is not None:  # put the previous bubble's cells back to their morphed state
+        x0, y0, x1, y1 = _BUBBLE
+        for y in range(y0, y1):
+            VIEW_TILES[y][x0:x1] = MORPH_TILES[y][x0:x1]
+    r = SHUFFLE_SAFE_RADIUS
+    x0 = max(0, math.floor(px - r - 0.5)); x1 = min(MAP_W, math.floor(px + r - 0.5) + 1)
+    y0 = max(0, math.floor(py - r - 0.5)); y1 = min(MAP_H, math.floor(py + r - 0.5) + 1)
+    _BUBBLE = (x0, y0, x1, y1)
+    if x0 >= x1 or y0 >= y1:
+        return
+    if np is not None:
+        dx = np.arange(x0, x1) + 0.5 - px; dy = np.arange(y0, y1) + 0.5 - py
+        inside = dx[None, :] ** 2 + dy[:, None] ** 2 < r * r
+        view = VIEW_TILES.array()[y0:y1, x0:x1]
+        view[inside] = BASE_MAP.array()[y0:y1, x0:x1][inside]
+        return
+    for y in range(y0, y1):
+        dy = y + 0.5 - py
+        row, base = VIEW_TILES[y], BASE_MAP[y]
+        for x in range(x0, x1):
+            dx = x + 0.5 - px
+            if dx * dx + dy * dy < r * r:
+                row[x] = base[x]
+
 def tile_at(mx, my, px, py, phase_idx):
-    """Return the current (possibly morphed) tile value at map coords."""
+    """Return the current (possibly morphed) tile value at map coords, as seen from (px, py)."""
     if not in_map(mx, my): return 1  # treat out of bounds as solid
-    base_t = BASE_MAP[my][mx]
 
     # If morphing is disabled, lock to base reality.
     if not ENABLE_MORPH:
-        return base_t
+        return BASE_MAP[my][mx]
+
+    _update_view(px, py, phase_idx)
+    return VIEW_TILES[my][mx]
 
-    # keep a safe bubble stable
-    dx = (mx + 0.5) - px
-    dy = (my + 0.5) - py
-    if math.hypot(dx, dy) < SHUFFLE_SAFE_RADIUS:
-        return base_t
 
-    return _perturb_tile(base_t, mx, my, phase_idx)
+def view_grid(px, py, phase_idx):
+    """Tiles as seen this frame (morph applied) for the raycaster and minimap."""
+    grid = BASE_MAP
+    if ENABLE_MORPH:
+        _update_view(px, py, phase_idx)
+        grid = VIEW_TILES
+    return grid.array() if np is not None else grid
 
 
 def dynamic_wall_height_ft(mx, my, t, phase_idx):
@@ -274,71 +399,15 @@ def try_move(nx, ny, phase_idx):
     return True
 
 # ---------- Raycasting (DDA) ----------
-def cast_and_draw(phase_idx):
+def cast_and_draw(phase_idx, grid):
     # sky/floor
     screen.fill((20, 20, 28), rect=pygame.Rect(0, 0, SCREEN_W, SCREEN_H // 2))       # ceiling
     screen.fill((38, 38, 46), rect=pygame.Rect(0, SCREEN_H // 2, SCREEN_W, SCREEN_H // 2))  # floor
 
-    for x in range(SCREEN_W):
-        ray_angle = player_ang - HALF_FOV + (x + 0.5) * (FOV / SCREEN_W)
-        ray_dir_x = math.cos(ray_angle)
-        ray_dir_y = math.sin(ray_angle)
-
-        map_x = int(player_pos.x)
-        map_y = int(player_pos.y)
-
-        inv_dx = 1.0 / ray_dir_x if ray_dir_x != 0 else 1e30
-        inv_dy = 1.0 / ray_dir_y if ray_dir_y != 0 else 1e30
-        delta_dist_x = abs(inv_dx)
-        delta_dist_y = abs(inv_dy)
-
-        if ray_dir_x < 0:
-            step_x = -1
-            side_dist_x = (player_pos.x - map_x) * delta_dist_x
-        else:
-            step_x = 1
-            side_dist_x = (map_x + 1.0 - player_pos.x) * delta_dist_x
-
-        if ray_dir_y < 0:
-            step_y = -1
-            side_dist_y = (player_pos.y - map_y) * delta_dist_y
-        else:
-            step_y = 1
-            side_dist_y = (map_y + 1.0 - player_pos.y) * delta_dist_y
-
-        hit = False
-        side = 0
-        tile = 0
-
-        while True:
-            # advance DDA
-            if side_dist_x < side_dist_y:
-                side_dist_x += delta_dist_x
-                map_x += step_x
-                side = 0
-            else:
-                side_dist_y += delta_dist_y
-                map_y += step_y
-                side = 1
-
-            if not in_map(map_x, map_y):
-                break
-
-            tile = tile_at(map_x, map_y, player_pos.x, player_pos.y, phase_idx)
-            if tile != 0:
-                hit = True
-                break
-
-        if not hit:
-            continue
-
-        if side == 0:
-            perp_dist = (map_x - player_pos.x + (1 - step_x) * 0.5) * inv_dx
-        else:
-            perp_dist = (map_y - player_pos.y + (1 - step_y) * 0.5) * inv_dy
-        if perp_dist <= 0.0001:
-            perp_dist = 0.0001
-
+    use_np = VECTOR_RAYCAST and raycast.HAVE_NUMPY
+    hits = raycast.cast_rays(grid, player_pos.x, player_pos.y, player_ang, FOV, SCREEN_W,
+                             float("inf"), TEX_SIZE, vectorized=use_np)
+    for x, perp_dist, map_x, map_y, side, tile, tex_x in hits.columns():
         base_line_h = SCREEN_H / perp_dist
 
         # dynamic height based on current (possibly morphed) tile
@@ -351,89 +420,31 @@ def cast_and_draw(phase_idx):
 
         # textures
         if tile == 1:
-            tex = pick_wall_texture(map_x, map_y)
+            mat = MATERIAL_MAP[map_y][map_x]
         else:
-            # For doors (tile == 2) choose a single canonical face that opens
-            # onto a floor cell so the door texture won't be covered by another wall.
-            # We look at neighboring BASE_MAP tiles to find the two floor sides
-            # (doors are only sprinkled where there's a floor pair), prefer the
-            # side that continues into floor (corridor), and fall back
-            # deterministically if needed.
-            show_door_texture = False
-            # gather candidate directions where adjacent cell is floor
-            floor_dirs = []
-            # north
-            if in_map(map_x, map_y - 1) and BASE_MAP[map_y - 1][map_x] == 0:
-                floor_dirs.append((0, -1))
-            # south
-            if in_map(map_x, map_y + 1) and BASE_MAP[map_y + 1][map_x] == 0:
-                floor_dirs.append((0, 1))
-            # west
-            if in_map(map_x - 1, map_y) and BASE_MAP[map_y][map_x - 1] == 0:
-                floor_dirs.append((-1, 0))
-            # east
-            if in_map(map_x + 1, map_y) and BASE_MAP[map_y][map_x + 1] == 0:
-                floor_dirs.append((1, 0))
-
-            desired_face_dir = None
-            # Prefer a direction where the neighbor continues into floor (corridor)
-            for dx, dy in floor_dirs:
-                nx, ny = map_x + dx, map_y + dy
-                bx, by = nx + dx, ny + dy
-                if in_map(bx, by) and BASE_MAP[by][bx] == 0:
-                    desired_face_dir = (dx, dy)
-                    break
-
-            # If none continue, pick a deterministic choice from floor_dirs
-            if desired_face_dir is None and floor_dirs:
-                # pick based on tile parity for determinism
-                idx = ((map_x + map_y) & 1) % len(floor_dirs)
-                desired_face_dir = floor_dirs[idx]
-
-            # Now determine which face was hit by the ray
-            if desired_face_dir is not None:
-                if side == 0:
-                    # hit a vertical grid line -> face is east/west
-                    face_dir = (1, 0) if ray_dir_x > 0 else (-1, 0)
-                else:
-                    # hit a horizontal grid line -> face is north/south
-                    face_dir = (0, 1) if ray_dir_y > 0 else (0, -1)
-
-                if face_dir == desired_face_dir:
-                    show_door_texture = True
-
-            if show_door_texture:
-                tex = pick_door_texture(map_x, map_y)
+            # Doors show their texture only on the canonical face from DOOR_FACES
+            # (the side opening onto the corridor); other faces look like wall.
+            if side == 0:  # hit a vertical grid line -> face is east/west
+                face = FACE_E if hits.dir_x[x] > 0 else FACE_W
+            else:          # hit a horizontal grid line -> face is north/south
+                face = FACE_S if hits.dir_y[x] > 0 else FACE_N
+            if DOOR_FACES[map_y][map_x] == face:
+                mat = MATERIAL_MAP[map_y][map_x]
             else:
-                tex = pick_wall_texture(map_x, map_y)
-
-        if side == 0:
-            wall_x = player_pos.y + perp_dist * ray_dir_y
-        else:
-            wall_x = player_pos.x + perp_dist * ray_dir_x
-        wall_x -= math.floor(wall_x)
+                mat = wall_material(map_x, map_y)
 
-        tex_x = int(wall_x * TEX_SIZE)
-        if side == 0 and ray_dir_x > 0:
-            tex_x = TEX_SIZE - tex_x - 1
-        if side == 1 and ray_dir_y < 0:
-            tex_x = TEX_SIZE - tex_x - 1
-
-        column = tex.subsurface(pygame.Rect(tex_x, 0, 1, TEX_SIZE))
-        column = pygame.transform.scale(column, (1, line_h))
+        # y-side faces sample the atlas' pre-darkened copy; distant walls use a smaller mip
+        tex, level = ATLAS.texture_for(mat, side == 1, line_h)
+        column = COLUMN_CACHE.column(tex, tex_x >> level, line_h)
+        line_h = column.get_height()
 
         draw_y = (SCREEN_H // 2) - (line_h // 2)
-
-        if side == 1:
-            screen.blit(column, (x, draw_y))
-            shade = pygame.Surface((1, line_h), pygame.SRCALPHA)
-            shade.fill((0, 0, 0, 60))
-            screen.blit(shade, (x, draw_y))
-        else:
-            screen.blit(column, (x, draw_y))
+        screen.blit(column, (x, draw_y))
 
 # ---------- Minimap ----------
-def draw_minimap(phase_idx):
+MINIMAP_PALETTE = np.array((MINIMAP_FLOOR, MINIMAP_WALL, MINIMAP_DOOR), dtype=np.uint8) if np is not None else None
+
+def draw_minimap(grid):
     # Choose cell size to keep the map compact
     max_dim = max(MAP_W, MAP_H)
     cell = max(3, min(12, 220 // max_dim))  # auto-scale nicely
@@ -446,17 +457,22 @@ def draw_minimap(phase_idx):
     bg.fill((0, 0, 0, MINIMAP_BG_ALPHA))
     mm.blit(bg, (0, 0))
 
-    # tiles (dynamic)
-    for y in range(MAP_H):
-        for x in range(MAP_W):
-            r = pygame.Rect(x * cell, y * cell, cell, cell)
-            t = tile_at(x, y, player_pos.x, player_pos.y, phase_idx)
-            if t == 1:
-                pygame.draw.rect(mm, MINIMAP_WALL, r)
-            elif t == 0:
-                pygame.draw.rect(mm, MINIMAP_FLOOR, r)
-            else:  # door
-                pygame.draw.rect(mm, MINIMAP_DOOR, r)
+    # tiles (dynamic): one pixel per tile through a palette, scaled up to cell size
+    if np is not None:
+        colors = MINIMAP_PALETTE[np.minimum(np.asarray(grid), 2)]
+        tiles = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        mm.blit(pygame.transform.scale(tiles, (mm_w, mm_h)), (0, 0))
+    else:
+        for y in range(MAP_H):
+            for x in range(MAP_W):
+                r = pygame.Rect(x * cell, y * cell, cell, cell)
+                t = grid[y][x]
+                if t == 1:
+                    pygame.draw.rect(mm, MINIMAP_WALL, r)
+                elif t == 0:
+                    pygame.draw.rect(mm, MINIMAP_FLOOR, r)
+                else:  # door
+                    pygame.draw.rect(mm, MINIMAP_DOOR, r)
 
     # player
     px = player_pos.x * cell
@@ -522,7 +538,7 @@ def draw_hud():
         f"[R] Distant Morphing: {'ON' if ENABLE_MORPH else 'OFF'}   " \
         f"[H] Random Heights: {'ON' if ENABLE_RAND_HEIGHTS else 'OFF'}"
     # extra info: map size and FOV
-    info2 = f"Map: {MAP_W}x{MAP_H}  (use '['/']' to -/+ size)   FOV: {int(math.degrees(FOV))}°  ('-'/'=' to -/+)"
+    info2 = f"Map: {MAP_W}x{MAP_H}  (use '['/']' to -/+ size, [G] {MAZE_GENERATOR})   FOV: {int(math.degrees(FOV))}°  ('-'/'=' to -/+)"
     surf = HUD_FONT.render(info, True, (230, 230, 235))
     screen.blit(surf, (10, SCREEN_H - 38))
     surf2 = HUD_FONT.render(info2, True, (200, 200, 205))
@@ -535,7 +551,11 @@ def draw_hud():
 
 def main():
     global phase_timer, SHOW_MINIMAP, ENABLE_MORPH, ENABLE_RAND_HEIGHTS, FOV, HALF_FOV
-    global WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT, MAZE_W, MAZE_H, player_pos
+    global WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT, MAZE_W, MAZE_H, player_pos, MATERIAL_MAP
+    global MAZE_GENERATOR
+    init_display()
+    if BASE_MAP is None:
+        new_level(MAZE_W, MAZE_H)
     running = True
     while running:
         dt = clock.tick(60) / 1000.0
@@ -574,6 +594,7 @@ def main():
                     elif e.key == pygame.K_p:
                         # print some debug info
                         print(f"Player: ({player_pos.x:.2f}, {player_pos.y:.2f}) ang={player_ang:.2f}")
+                        print("Column cache:", COLUMN_CACHE.summary())
                     # fall through to regular key handlers below
                 if e.key == pygame.K_m:
                     SHOW_MINIMAP = not SHOW_MINIMAP
@@ -584,23 +605,24 @@ def main():
                 elif e.key == pygame.K_h:
                     ENABLE_RAND_HEIGHTS = not ENABLE_RAND_HEIGHTS
                     print("Random Heights:", "ON" if ENABLE_RAND_HEIGHTS else "OFF")
+                elif e.key == pygame.K_g:  # next maze generator, same size and seed
+                    names = list(maze_gen.GENERATORS)
+                    MAZE_GENERATOR = names[(names.index(MAZE_GENERATOR) + 1) % len(names)]
+                    new_level(MAZE_W, MAZE_H)
+                    print("Maze generator:", MAZE_GENERATOR)
                 elif e.key == pygame.K_LEFTBRACKET:  # '[' decrease map size
                     # decrease both dims by 2 (keep odd)
                     new_w = max(5, MAZE_W - 2)
                     new_h = max(5, MAZE_H - 2)
                     if new_w != MAZE_W or new_h != MAZE_H:
                         MAZE_W, MAZE_H = new_w, new_h
-                        WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT = regenerate_map(MAZE_W, MAZE_H, seed=RNG_SEED)
-                        spawn_x, spawn_y = pick_spawn(BASE_MAP)
-                        player_pos = pygame.Vector2(spawn_x, spawn_y)
+                        new_level(MAZE_W, MAZE_H)
                         print(f"Map resized to {MAP_W}x{MAP_H}")
                 elif e.key == pygame.K_RIGHTBRACKET:  # ']' increase map size
                     new_w = MAZE_W + 2
                     new_h = MAZE_H + 2
                     MAZE_W, MAZE_H = new_w, new_h
-                    WORLD_MAP, BASE_MAP, MAP_W, MAP_H, WALL_HEIGHTS_FT = regenerate_map(MAZE_W, MAZE_H, seed=RNG_SEED)
-                    spawn_x, spawn_y = pick_spawn(BASE_MAP)
-                    player_pos = pygame.Vector2(spawn_x, spawn_y)
+                    new_level(MAZE_W, MAZE_H)
                     print(f"Map resized to {MAP_W}x{MAP_H}")
                 elif e.key == pygame.K_MINUS or e.key == pygame.K_KP_MINUS:
                     # decrease FOV by 5 degrees, clamp to 20 deg
@@ -616,14 +638,24 @@ def main():
                     print(f"FOV set to {new_deg}°")
 
         get_inputs(dt, phase_idx)
-        cast_and_draw(phase_idx)
+        grid = view_grid(player_pos.x, player_pos.y, phase_idx)
+        cast_and_draw(phase_idx, grid)
         if SHOW_MINIMAP:
-            draw_minimap(phase_idx)
+            draw_minimap(grid)
         draw_hud()
         pygame.display.flip()
+        if "first_frame" not in STARTUP_MS:
+            report_startup()
 
     pygame.quit()
     sys.exit()
 
+def report_startup():
+    STARTUP_MS["first_frame"] = (time.perf_counter() - IMPORT_STARTED) * 1000
+    print("Startup: import {import:.0f} ms, display + textures {display:.0f} ms, first frame at {first_frame:.0f} ms"
+          .format(**STARTUP_MS))
+
+STARTUP_MS["import"] = (time.perf_counter() - IMPORT_STARTED) * 1000
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,242 @@
+"""Perfect-maze generators for maze.py, selectable by name.
+
+Every generator takes the requested size and an RNG with the `random` module's
+API (the module itself or a random.Random) and returns (width, height, tiles):
+a flat row-major bytearray of 1 = wall / 0 = floor where cells sit on odd
+coordinates, sizes rounded up to odd and at least 5. Seeding that RNG (maze.py
+seeds `random` from RNG_SEED) makes every generator reproducible. sidewinder
+takes its randomness from it in bulk (getrandbits), so its NumPy and
+pure-Python paths build the same maze for the same seed.
+
+    backtracker  recursive backtracker (the original algorithm) on a flat buffer;
+                 same mazes as before for the same seed
+    eller        Eller's algorithm, one row at a time: only the current row's set
+                 labels are kept, so working memory is O(width) (eller_rows streams)
+    sidewinder   sidewinder, vectorized over the whole grid with NumPy (pure-Python
+                 fallback, same output); fastest, with a long open corridor along the top
+
+    python maze_gen.py [--sizes 101,501,2001] [--seed 1]   # time + peak memory per generator
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+DEFAULT_GENERATOR = "backtracker"
+
+
+def maze_dims(w, h):
+    return max(5, w | 1), max(5, h | 1)
+
+
+def backtracker(w, h, rng=random):
+    w, h = maze_dims(w, h)
+    grid = bytearray(b"\x01") * (w * h)
+    start = w + 1
+    grid[start] = 0
+    stack = [start]
+    shuffle = rng.shuffle
+    while stack:
+        i = stack[-1]
+        y, x = divmod(i, w)
+        dirs = [(2, 0), (-2, 0), (0, 2), (0, -2)]  # fresh list each step, shuffled like the original
+        shuffle(dirs)
+        for dx, dy in dirs:
+            nx = x + dx; ny = y + dy
+            if 1 <= nx < w - 1 and 1 <= ny < h - 1 and grid[ny * w + nx] == 1:
+                j = ny * w + nx
+                grid[i + (dy // 2) * w + dx // 2] = 0
+                grid[j] = 0
+                stack.append(j)
+                break
+        else:
+            stack.pop()
+    return w, h, grid
+
+
+def eller_rows(w, h, rng=random):
+    """Yield the maze's rows (bytes) top to bottom, holding only one row of set labels."""
+    w, h = maze_dims(w, h)
+    cw, ch = (w - 1) // 2, (h - 1) // 2
+    rand = rng.random
+    wall = b"\x01" * w
+    yield wall
+    sets = list(range(cw))
+    members = {c: [c] for c in range(cw)}
+    next_id = cw
+    for r in range(ch):
+        last = r == ch - 1
+        row = bytearray(wall)
+        row[1:w - 1:2] = bytes(cw)
+        for c in range(cw - 1):
+            a, b = sets[c], sets[c + 1]
+            if a != b and (last or rand() < 0.5):
+                row[2 * c + 2] = 0
+                ma, mb = members[a], members[b]
+                if len(ma) < len(mb):
+                    a, b, ma, mb = b, a, mb, ma
+                for m in mb:
+                    sets[m] = a
+                ma.extend(mb)
+                del members[b]
+        yield bytes(row)
+        below = bytearray(wall)
+        if last:
+            yield bytes(below)
+            break
+        new_sets = [-1] * cw
+        new_members = {}
+        for sid, cols in members.items():
+            down = [c for c in cols if rand() < 0.5]
+            if not down:
+                down = [cols[int(rand() * len(cols))]]
+            for c in down:
+                below[2 * c + 1] = 0
+                new_sets[c] = sid
+            new_members[sid] = down
+        for c in range(cw):
+            if new_sets[c] < 0:
+                new_sets[c] = next_id
+                new_members[next_id] = [c]
+                next_id += 1
+        sets, members = new_sets, new_members
+        yield bytes(below)
+
+
+def eller(w, h, rng=random):
+    w, h = maze_dims(w, h)
+    grid = bytearray()
+    for row in eller_rows(w, h, rng):
+        grid += row
+    return w, h, grid
+
+
+def _random_bytes(rng, nbytes):
+    return rng.getrandbits(8 * nbytes).to_bytes(nbytes, "little") if nbytes else b""
+
+
+def sidewinder(w, h, rng=random):
+    # Draws: one bit per cell of rows 1..ch-1 (row-major, bit i = byte i >> 3, bit i & 7)
+    # says whether the run ends there, then one u32 per run picks the cell that opens
+    # north as start + (u32 * run length) >> 32. Both paths consume exactly these.
+    w, h = maze_dims(w, h)
+    cw, ch = (w - 1) // 2, (h - 1) // 2
+    if np is None:
+        return _sidewinder_python(w, h, cw, ch, rng)
+    grid = np.ones((h, w), dtype=np.uint8)
+    grid[1:h - 1:2, 1:w - 1:2] = 0
+    grid[1, 1:w - 1] = 0  # top row: one corridor
+    if ch > 1:
+        n = (ch - 1) * cw
+        bits = np.frombuffer(_random_bytes(rng, (n + 7) // 8), dtype=np.uint8)
+        close = np.unpackbits(bits, bitorder="little")[:n].reshape(ch - 1, cw).view(bool)  # end the run here?
+        close[:, -1] = True
+        east = np.ones((ch - 1, cw - 1), dtype=np.uint8)
+        east[~close[:, :-1]] = 0
+        grid[3:h - 1:2, 2:w - 1:2] = east
+        start = np.empty_like(close)
+        start[:, 0] = True
+        start[:, 1:] = close[:, :-1]
+        starts = np.flatnonzero(start)
+        ends = np.flatnonzero(close)
+        u = np.frombuffer(_random_bytes(rng, 4 * starts.size), dtype="<u4").astype(np.uint64)
+        pick = starts + ((u * (ends - starts + 1).astype(np.uint64)) >> np.uint64(32)).astype(np.int64)
+        r, c = np.divmod(pick, cw)
+        grid[2 * r + 2, 2 * c + 1] = 0  # north out of one cell per run
+    return w, h, bytearray(grid)
+
+
+def _sidewinder_python(w, h, cw, ch, rng):
+    grid = bytearray(b"\x01") * (w * h)
+    grid[w + 1:2 * w - 1] = bytes(w - 2)
+    if ch < 2:
+        return w, h, grid
+    n = (ch - 1) * cw
+    bits = _random_bytes(rng, (n + 7) // 8)
+    close = [(bits[i >> 3] >> (i & 7)) & 1 for i in range(n)]
+    close[cw - 1::cw] = [1] * (ch - 1)  # every row's last run ends at the east wall
+    picks = _random_bytes(rng, 4 * sum(close))
+    k = 0
+    for r in range(1, ch):
+        y = 2 * r + 1
+        run = 0
+        for c in range(cw):
+            grid[y * w + 2 * c + 1] = 0
+            if close[(r - 1) * cw + c]:
+                u = int.from_bytes(picks[4 * k:4 * k + 4], "little"); k += 1
+                x = c - run + ((u * (run + 1)) >> 32)
+                grid[(y - 1) * w + 2 * x + 1] = 0
+                run = 0
+            else:
+                grid[y * w + 2 * c + 2] = 0
+                run += 1
+    return w, h, grid
+
+
+GENERATORS = {"backtracker": backtracker, "eller": eller, "sidewinder": sidewinder}
+
+
+def generate(name, w, h, rng=random):
+    """(width, height, tiles bytearray) from the generator called `name`."""
+    try:
+        gen = GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"unknown maze generator {name!r} (have {', '.join(GENERATORS)})")
+    return gen(w, h, rng)
+
+
+def reference_backtracker(w, h, rng=random):
+    """The original list-of-lists generator from maze.py, kept as the benchmark baseline."""
+    w, h = maze_dims(w, h)
+    grid = [[1 for _ in range(w)] for _ in range(h)]
+    grid[1][1] = 0
+    stack = [(1, 1)]
+
+    def neighbors(x, y):
+        dirs = [(2, 0), (-2, 0), (0, 2), (0, -2)]
+        rng.shuffle(dirs)
+        for dx, dy in dirs:
+            nx, ny = x + dx, y + dy
+            if 1 <= nx < w - 1 and 1 <= ny < h - 1 and grid[ny][nx] == 1:
+                yield (nx, ny, dx, dy)
+
+    while stack:
+        x, y = stack[-1]
+        for nx, ny, dx, dy in neighbors(x, y):
+            grid[y + dy // 2][x + dx // 2] = 0
+            grid[ny][nx] = 0
+            stack.append((nx, ny))
+            break
+        else:
+            stack.pop()
+    return grid
+
+
+def bench(sizes, seed=1):
+    gens = dict(reference=reference_backtracker, **GENERATORS)
+    for gen in gens.values():
+        gen(5, 5, random.Random(seed))  # warm-up (NumPy first-call overhead)
+    for size in sizes:
+        for name, gen in gens.items():
+            t = time.perf_counter()
+            gen(size, size, random.Random(seed))
+            ms = (time.perf_counter() - t) * 1000
+            tracemalloc.start()
+            gen(size, size, random.Random(seed))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>6} {name:<12} {ms:9.1f} ms  peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    def opt(name, default):
+        return args[args.index(name) + 1] if name in args else default
+
+    bench([int(s) for s in opt("--sizes", "101,501,2001").split(",")], int(opt("--seed", 1)))
@@ -0,0 +1,192 @@
+"""Hot-path profiler: named timing scopes, a ring buffer of recent frames, an overlay.
+
+Scopes are installed by swapping a module's functions for timed wrappers
+(enable) and swapping the originals back (disable), so a disabled profiler
+costs nothing beyond the begin_frame/end_frame checks. Recent frames can be
+written to CSV, and capture(n) runs cProfile over the next n frames.
+"""
+import cProfile
+import csv
+import functools
+import pstats
+import time
+from collections import deque
+
+import pygame
+
+PROFILE_FRAMES = 300     # frames kept in the ring buffer (also the graph width in pixels)
+GRAPH_H = 90
+GRAPH_MS = 33.3          # frame time at the top of the graph
+BUDGET_MS = 1000.0 / 60
+STATS_EVERY = 15         # frames between percentile refreshes
+SCOPE_COLORS = ((90, 170, 255), (255, 140, 80), (120, 220, 120), (230, 200, 60),
+                (220, 90, 200), (90, 220, 220), (200, 200, 200), (255, 90, 90))
+OTHER_COLOR = (70, 70, 80)
+
+
+class Profiler:
+    def __init__(self, frames=PROFILE_FRAMES):
+        self.enabled = False
+        self.frames = deque(maxlen=frames)  # (total_ms, {scope: ms})
+        self.scopes = []
+        self._current = {}
+        self._start = None
+        self._originals = []
+        self._graph = None
+        self._stats = {}
+        self._since_stats = 0
+        self._cprofile = None
+        self._cprofile_left = 0
+        self._cprofile_path = None
+
+    # ---- scopes ----
+    def _wrap(self, name, fn):
+        cur = self._current
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                cur[name] = cur.get(name, 0.0) + (clock() - t0) * 1000.0
+        return timed
+
+    def enable(self, namespace, names):
+        """Time every function `names` in `namespace` (a module's globals()) per frame."""
+        if self.enabled:
+            return
+        self.scopes = [n for n in names if callable(namespace.get(n))]
+        for name in self.scopes:
+            self._originals.append((namespace, name, namespace[name]))
+            namespace[name] = self._wrap(name, namespace[name])
+        self.frames.clear()
+        self._graph = None
+        self._stats = {}
+        self.enabled = True
+
+    def disable(self):
+        for namespace, name, fn in self._originals:
+            namespace[name] = fn
+        self._originals = []
+        self.enabled = False
+        self._start = None
+
+    def toggle(self, namespace, names):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable(namespace, names)
+        return self.enabled
+
+    # ---- frames ----
+    def begin_frame(self):
+        if self.enabled:
+            self._current.clear()
+            self._start = time.perf_counter()
+
+    def end_frame(self):
+        if self._cprofile is not None:
+            self._cprofile_left -= 1
+            if self._cprofile_left <= 0:
+                self._finish_capture()
+        if not self.enabled or self._start is None:
+            return
+        total = (time.perf_counter() - self._start) * 1000.0
+        times = dict(self._current)
+        self.frames.append((total, times))
+        self._plot(total, times)
+        self._since_stats += 1
+
+    def percentiles(self):
+        """{scope: (p50, p95, p99)} over the buffered frames in which the scope ran, plus 'frame'."""
+        out = {}
+        for name in self.scopes + ["frame"]:
+            vals = sorted(total if name == "frame" else t[name]
+                          for total, t in self.frames if name == "frame" or name in t)
+            if vals:
+                n = len(vals)
+                out[name] = tuple(vals[min(n - 1, int(q * n))] for q in (0.50, 0.95, 0.99))
+        return out
+
+    # ---- output ----
+    def dump_csv(self, path=None):
+        path = path or time.strftime("profile_%Y%m%d_%H%M%S.csv")
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["frame", "total_ms"] + self.scopes)
+            for i, (total, times) in enumerate(self.frames):
+                w.writerow([i, f"{total:.4f}"] + [f"{times.get(s, 0.0):.4f}" for s in self.scopes])
+        return path
+
+    def capture(self, frames, path=None):
+        """cProfile the next `frames` frames; stats go to `path` and the top entries are printed."""
+        if self._cprofile is not None:
+            return None
+        self._cprofile_path = path or time.strftime("profile_%Y%m%d_%H%M%S.prof")
+        self._cprofile_left = frames
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+        return self._cprofile_path
+
+    def _finish_capture(self):
+        prof = self._cprofile
+        self._cprofile = None
+        prof.disable()
+        prof.dump_stats(self._cprofile_path)
+        print(f"cProfile stats written to {self._cprofile_path}")
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(15)
+
+    @property
+    def capturing(self):
+        return self._cprofile is not None
+
+    # ---- overlay ----
+    def _plot(self, total, times):
+        """Scroll the stacked graph one pixel left and draw this frame's column."""
+        w = self.frames.maxlen
+        if self._graph is None:
+            self._graph = pygame.Surface((w, GRAPH_H))
+            self._graph.fill((0, 0, 0))
+        g = self._graph
+        g.scroll(-1, 0)
+        g.fill((0, 0, 0), pygame.Rect(w - 1, 0, 1, GRAPH_H))
+        scale = GRAPH_H / GRAPH_MS
+        y = GRAPH_H
+        for i, name in enumerate(self.scopes):
+            ms = times.get(name)
+            if ms:
+                h = ms * scale
+                g.fill(SCOPE_COLORS[i % len(SCOPE_COLORS)], pygame.Rect(w - 1, int(y - h), 1, max(1, int(h))))
+                y -= h
+        rest = (total - sum(times.values())) * scale
+        if rest > 0:
+            g.fill(OTHER_COLOR, pygame.Rect(w - 1, int(y - rest), 1, max(1, int(rest))))
+
+    def draw(self, surface, font, x, y):
+        if not self.enabled or self._graph is None:
+            return
+        if self._since_stats >= STATS_EVERY or not self._stats:
+            self._stats = self.percentiles()
+            self._since_stats = 0
+        w = self.frames.maxlen
+        rows = len(self.scopes) + 2
+        panel = pygame.Surface((w + 12, GRAPH_H + 16 + rows * 14), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        surface.blit(panel, (x - 6, y - 6))
+        surface.blit(self._graph, (x, y))
+        budget_y = y + GRAPH_H - int(BUDGET_MS * GRAPH_H / GRAPH_MS)
+        pygame.draw.line(surface, (255, 255, 255), (x, budget_y), (x + w - 1, budget_y), 1)
+        ty = y + GRAPH_H + 4
+        cols = (0, 130, 185, 240)  # proportional font: place each column explicitly
+        for cx, txt in zip(cols, ("scope (ms)", "p50", "p95", "p99")):
+            surface.blit(font.render(txt, True, (220, 220, 230)), (x + cx, ty))
+        ty += 14
+        for i, name in enumerate(self.scopes + ["frame"]):
+            p = self._stats.get(name)
+            col = SCOPE_COLORS[i % len(SCOPE_COLORS)] if name != "frame" else (240, 240, 245)
+            cells = (name,) + (tuple(f"{v:.2f}" for v in p) if p else ("-", "-", "-"))
+            for cx, txt in zip(cols, cells):
+                surface.blit(font.render(txt, True, col), (x + cx, ty))
+            ty += 14
@@ -0,0 +1,184 @@
+"""Shared DDA ray engine for game.py and maze.py.
+
+Casts every screen column at once and returns per-column hit data; drawing is
+left to the caller. Uses NumPy when it is installed and falls back to a plain
+Python DDA otherwise (same results, just slower).
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAVE_NUMPY = np is not None
+FAR_DIST = 1e30
+
+
+class RayHits:
+    """Per-column results of one cast. Every field has one entry per column.
+
+    dist   - distance along the ray to the wall (max_dist when nothing was hit)
+    map_x, map_y - hit cell
+    side   - 0 = hit an x-side (vertical grid line), 1 = y-side
+    tile   - tile value at the hit cell (0 on a miss)
+    hit    - True when the ray hit something inside the map
+    wall_x - 0..1 position along the wall face
+    tex_x  - texture column for tex_size, already mirrored per face
+    dir_x, dir_y - ray direction
+    Fields are NumPy arrays on the vectorized path and lists otherwise.
+    """
+    __slots__ = ("dist", "map_x", "map_y", "side", "tile", "hit", "wall_x", "tex_x", "dir_x", "dir_y")
+
+    def __init__(self, dist, map_x, map_y, side, tile, hit, wall_x, tex_x, dir_x, dir_y):
+        self.dist = dist; self.map_x = map_x; self.map_y = map_y
+        self.side = side; self.tile = tile; self.hit = hit
+        self.wall_x = wall_x; self.tex_x = tex_x
+        self.dir_x = dir_x; self.dir_y = dir_y
+
+    def __len__(self):
+        return len(self.dist)
+
+    def columns(self):
+        """Rows of (x, dist, map_x, map_y, side, tile, tex_x) for the columns that hit."""
+        cols = (self.dist, self.map_x, self.map_y, self.side, self.tile, self.tex_x)
+        if HAVE_NUMPY and isinstance(self.hit, np.ndarray):
+            xs = np.nonzero(self.hit)[0]
+            return zip(xs.tolist(), *(c[xs].tolist() for c in cols))
+        return ((x, *row) for x, row in enumerate(zip(*cols)) if self.hit[x])
+
+
+def ray_angles(ang, fov, cols):
+    """Column-centre ray angles, matching the original per-column formula."""
+    step = fov / cols
+    start = ang - fov * 0.5
+    if HAVE_NUMPY:
+        return start + (np.arange(cols, dtype=np.float64) + 0.5) * step
+    return [start + (x + 0.5) * step for x in range(cols)]
+
+
+def as_tile_array(grid):
+    """2D uint8 array for the vectorized path (no copy if it already is one)."""
+    if isinstance(grid, np.ndarray):
+        return grid
+    return np.asarray(grid, dtype=np.uint8)
+
+
+def cast_rays(grid, px, py, ang, fov, cols, max_dist, tex_size, vectorized=True):
+    """Cast `cols` rays across `fov` centred on `ang` from (px, py).
+
+    grid is a list of rows or a 2D array of tiles (0 = empty). Rays stop at
+    the first non-zero tile or when they leave the map.
+    """
+    return cast_angles(grid, px, py, ray_angles(ang, fov, cols), max_dist, tex_size, vectorized)
+
+
+def cast_angles(grid, px, py, angles, max_dist, tex_size, vectorized=True):
+    """Like cast_rays for an explicit sequence of ray angles (e.g. one screen strip)."""
+    if vectorized and HAVE_NUMPY:
+        return _cast_numpy(as_tile_array(grid), px, py, np.asarray(angles, dtype=np.float64), max_dist, tex_size)
+    return _cast_python(grid, px, py, angles, max_dist, tex_size)
+
+
+def _cast_python(grid, px, py, angles, max_dist, tex_size):
+    map_h = len(grid); map_w = len(grid[0]) if map_h else 0
+    n = len(angles)
+    dist = [max_dist] * n; map_xs = [0] * n; map_ys = [0] * n
+    sides = [0] * n; tiles = [0] * n; hits = [False] * n
+    wall_xs = [0.0] * n; tex_xs = [0] * n
+    dir_xs = [0.0] * n; dir_ys = [0.0] * n
+    px0 = int(px); py0 = int(py)
+    for x, a in enumerate(angles):
+        ray_dir_x = math.cos(a); ray_dir_y = math.sin(a)
+        dir_xs[x] = ray_dir_x; dir_ys[x] = ray_dir_y
+        map_x = px0; map_y = py0
+        inv_dx = 1.0 / ray_dir_x if ray_dir_x != 0 else FAR_DIST
+        inv_dy = 1.0 / ray_dir_y if ray_dir_y != 0 else FAR_DIST
+        delta_x = abs(inv_dx); delta_y = abs(inv_dy)
+        if ray_dir_x < 0:
+            step_x = -1; side_x = (px - map_x) * delta_x
+        else:
+            step_x = 1; side_x = (map_x + 1.0 - px) * delta_x
+        if ray_dir_y < 0:
+            step_y = -1; side_y = (py - map_y) * delta_y
+        else:
+            step_y = 1; side_y = (map_y + 1.0 - py) * delta_y
+
+        side = 0; tile = 0
+        while True:
+            if side_x < side_y:
+                side_x += delta_x; map_x += step_x; side = 0
+            else:
+                side_y += delta_y; map_y += step_y; side = 1
+            if not (0 <= map_x < map_w and 0 <= map_y < map_h):
+                tile = 0; break
+            tile = grid[map_y][map_x]
+            if tile != 0: break
+        if tile == 0:
+            continue
+
+        if side == 0:
+            perp = max((map_x - px + (1 - step_x) * 0.5) * inv_dx, 1e-4)
+            wall_x = py + perp * ray_dir_y
+        else:
+            perp = max((map_y - py + (1 - step_y) * 0.5) * inv_dy, 1e-4)
+            wall_x = px + perp * ray_dir_x
+        wall_x -= math.floor(wall_x)
+        tex_x = int(wall_x * tex_size)
+        if (side == 0 and ray_dir_x > 0) or (side == 1 and ray_dir_y < 0):
+            tex_x = tex_size - tex_x - 1
+        dist[x] = perp; map_xs[x] = map_x; map_ys[x] = map_y
+        sides[x] = side; tiles[x] = tile; hits[x] = True
+        wall_xs[x] = wall_x; tex_xs[x] = tex_x
+    return RayHits(dist, map_xs, map_ys, sides, tiles, hits, wall_xs, tex_xs, dir_xs, dir_ys)
+
+
+def _cast_numpy(grid, px, py, angles, max_dist, tex_size):
+    map_h, map_w = grid.shape
+    n = angles.shape[0]
+    dir_x = np.cos(angles); dir_y = np.sin(angles)
+    with np.errstate(divide="ignore"):
+        inv_dx = np.where(dir_x != 0, 1.0 / dir_x, FAR_DIST)
+        inv_dy = np.where(dir_y != 0, 1.0 / dir_y, FAR_DIST)
+    delta_x = np.abs(inv_dx); delta_y = np.abs(inv_dy)
+    px0 = int(px); py0 = int(py)
+    step_x = np.where(dir_x < 0, -1, 1)
+    step_y = np.where(dir_y < 0, -1, 1)
+    side_x = np.where(dir_x < 0, (px - px0) * delta_x, (px0 + 1.0 - px) * delta_x)
+    side_y = np.where(dir_y < 0, (py - py0) * delta_y, (py0 + 1.0 - py) * delta_y)
+
+    map_x = np.full(n, px0, dtype=np.int64)
+    map_y = np.full(n, py0, dtype=np.int64)
+    side = np.zeros(n, dtype=np.int8)
+    tile = np.zeros(n, dtype=np.uint8)
+
+    # Step every still-active ray one cell per iteration; a ray retires when it
+    # hits a tile or leaves the map, so the loop runs for the longest ray only.
+    active = np.arange(n)
+    while active.size:
+        sx = side_x[active] < side_y[active]
+        ax = active[sx]; ay = active[~sx]
+        side_x[ax] += delta_x[ax]; map_x[ax] += step_x[ax]; side[ax] = 0
+        side_y[ay] += delta_y[ay]; map_y[ay] += step_y[ay]; side[ay] = 1
+        mx = map_x[active]; my = map_y[active]
+        inside = (mx >= 0) & (mx < map_w) & (my >= 0) & (my < map_h)
+        active = active[inside]
+        t = grid[my[inside], mx[inside]]
+        done = t != 0
+        tile[active[done]] = t[done]
+        active = active[~done]
+
+    hit = tile != 0
+    on_x = side == 0
+    # missed rays carry huge inv_d values; their results are discarded below
+    with np.errstate(over="ignore", invalid="ignore"):
+        perp = np.maximum(np.where(on_x,
+                                   (map_x - px + (1 - step_x) * 0.5) * inv_dx,
+                                   (map_y - py + (1 - step_y) * 0.5) * inv_dy), 1e-4)
+        wall_x = np.where(on_x, py + perp * dir_y, px + perp * dir_x)
+        wall_x = np.where(hit, wall_x - np.floor(wall_x), 0.0)
+    tex_x = (wall_x * tex_size).astype(np.int64)
+    flip = (on_x & (dir_x > 0)) | (~on_x & (dir_y < 0))
+    tex_x = np.where(flip, tex_size - tex_x - 1, tex_x)
+    dist = np.where(hit, perp, max_dist)
+    return RayHits(dist, map_x, map_y, side, tile, hit, wall_x, tex_x, dir_x, dir_y)
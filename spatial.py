@@ -0,0 +1,118 @@
+"""Uniform-grid spatial index for runtime entities (anything with a `.pos` Vector2).
+
+Entities are bucketed by cell; call move() after an entity changes position
+so it is re-bucketed when it crosses a cell boundary. Queries only visit the
+buckets overlapping the query area, or every occupied bucket when that is
+the smaller set (sparse maps with a huge radius).
+"""
+import math
+
+TWO_PI = 2 * math.pi
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=4.0):
+        self.cell_size = cell_size
+        self._inv = 1.0 / cell_size
+        self._buckets = {}  # (cx, cy) -> {obj: None} (insertion-ordered set)
+        self._where = {}    # obj -> (cx, cy)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, obj):
+        return obj in self._where
+
+    def __iter__(self):
+        return iter(self._where)
+
+    def _key(self, x, y):
+        return (math.floor(x * self._inv), math.floor(y * self._inv))
+
+    def insert(self, obj):
+        key = self._key(obj.pos.x, obj.pos.y)
+        self._where[obj] = key
+        self._buckets.setdefault(key, {})[obj] = None
+
+    def remove(self, obj):
+        key = self._where.pop(obj, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        del bucket[obj]
+        if not bucket:
+            del self._buckets[key]
+
+    def move(self, obj):
+        """Re-bucket obj after its position changed (cheap when it stays in its cell)."""
+        old = self._where.get(obj)
+        key = self._key(obj.pos.x, obj.pos.y)
+        if old == key:
+            return
+        if old is not None:
+            bucket = self._buckets[old]
+            del bucket[obj]
+            if not bucket:
+                del self._buckets[old]
+        self._where[obj] = key
+        self._buckets.setdefault(key, {})[obj] = None
+
+    def clear(self):
+        self._buckets.clear()
+        self._where.clear()
+
+    def rebuild(self, objs):
+        self.clear()
+        for obj in objs:
+            self.insert(obj)
+
+    def _candidates(self, x0, y0, x1, y1):
+        """Objects in buckets overlapping the world-space box (x0, y0)-(x1, y1)."""
+        cx0, cy0 = self._key(x0, y0)
+        cx1, cy1 = self._key(x1, y1)
+        buckets = self._buckets
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(buckets):
+            for (cx, cy), bucket in buckets.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield from bucket
+            return
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query_rect(self, x0, y0, x1, y1):
+        return [o for o in self._candidates(x0, y0, x1, y1)
+                if x0 <= o.pos.x <= x1 and y0 <= o.pos.y <= y1]
+
+    def query_radius(self, x, y, r):
+        """Objects within distance r of (x, y)."""
+        r2 = r * r
+        out = []
+        for o in self._candidates(x - r, y - r, x + r, y + r):
+            dx = o.pos.x - x; dy = o.pos.y - y
+            if dx * dx + dy * dy <= r2:
+                out.append(o)
+        return out
+
+    def query_cone(self, x, y, ang, half_angle, max_dist):
+        """[(dist, rel_angle, obj)] for objects within max_dist whose bearing is
+        within half_angle of ang. rel_angle is wrapped to -pi..pi."""
+        out = []
+        r2 = max_dist * max_dist
+        for o in self._candidates(x - max_dist, y - max_dist, x + max_dist, y + max_dist):
+            dx = o.pos.x - x; dy = o.pos.y - y
+            d2 = dx * dx + dy * dy
+            if d2 > r2:
+                continue
+            rel = (math.atan2(dy, dx) - ang + math.pi) % TWO_PI - math.pi
+            if abs(rel) <= half_angle:
+                out.append((math.sqrt(d2), rel, o))
+        return out
+
+    def query_ray(self, x, y, ang, max_dist, half_angle):
+        """Cone query sorted nearest-first, for hitscan-style "first thing along the ray"."""
+        hits = self.query_cone(x, y, ang, half_angle, max_dist)
+        hits.sort(key=lambda h: h[0])
+        return hits
@@ -0,0 +1,78 @@
+"""Billboard sprite helpers: size-quantized scale cache and z-buffer span tests.
+
+Sprites are pre-scaled to quantized sizes (same steps as the wall column
+cache) and kept in a bounded LRU, and the per-column depth test is turned into
+contiguous visible spans so each sprite costs one blit per span.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from column_cache import quantize_height
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+SPRITE_CACHE_BYTES = 16 * 1024 * 1024
+DEPTH_EPS = 0.01  # sprite must be this much nearer than the wall to show
+
+
+class SpriteScaleCache:
+    def __init__(self, max_bytes=SPRITE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._sprites = OrderedDict()  # (surf, size) -> (scaled, nbytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def quantize(size):
+        return quantize_height(size)
+
+    def scaled(self, surf, size):
+        """`surf` scaled to size x size; size should already be quantized."""
+        key = (surf, size)
+        entry = self._sprites.get(key)
+        if entry is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        img = pygame.transform.scale(surf, (size, size))
+        nbytes = size * size * img.get_bytesize()
+        self._sprites[key] = (img, nbytes)
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes and len(self._sprites) > 1:
+            _, (_, old) = self._sprites.popitem(last=False)
+            self.bytes -= old
+        return img
+
+    def clear(self):
+        self._sprites.clear()
+        self.bytes = 0
+
+
+def visible_spans(zbuf, left, size, dist, view_w):
+    """[(x0, x1), ...] screen column ranges of a sprite spanning left..left+size
+    that are nearer than the walls in zbuf."""
+    x0 = max(0, left); x1 = min(view_w, left + size)
+    if x0 >= x1:
+        return []
+    if np is not None and isinstance(zbuf, np.ndarray):
+        vis = dist < zbuf[x0:x1] + DEPTH_EPS
+        if vis.all():
+            return [(x0, x1)]
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], vis, [False])).view(np.int8)))
+        return [(x0 + int(a), x0 + int(b)) for a, b in zip(edges[::2], edges[1::2])]
+    spans = []
+    start = None
+    for x in range(x0, x1):
+        if dist < zbuf[x] + DEPTH_EPS:
+            if start is None: start = x
+        elif start is not None:
+            spans.append((start, x)); start = None
+    if start is not None:
+        spans.append((start, x1))
+    return spans
@@ -0,0 +1,229 @@
+"""Chunked streaming world for .mwm maps too large to keep resident.
+
+The map file stays memory-mapped (mapfile.MapFile) and is read in
+STREAM_CHUNK x STREAM_CHUNK tile chunks on demand. Chunks are kept in an LRU
+under a byte budget; the ones forming the current play region are pinned.
+Each update() re-centres the region on the player's chunk, stitching the
+surrounding chunks into one contiguous TileGrid so the raycaster, minimap and
+enemy store see a seamless grid across chunk borders, and prefetches the
+next ring of chunks in the direction of travel.
+
+Cell lookups outside the region (collision, line of sight, far enemies) go
+through tile() / tiles_many(), which load whatever chunk they land in. hold()
+pins extra chunks on top of the region (the ones under roaming enemies near
+the player), so enemies off the region keep moving without thrashing the LRU;
+the caller keeps that set bounded, since held chunks are never evicted.
+"""
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+import mapfile
+from tilegrid import TileGrid
+
+STREAM_CHUNK = 64           # tiles per chunk side (power of two)
+STREAM_BUDGET_MB = 32       # resident chunk ceiling; region chunks are never evicted
+STREAM_PREFETCH = 4         # chunks loaded ahead of the player per update
+
+
+class ChunkedWorld:
+    def __init__(self, path, region_chunks=1, chunk=STREAM_CHUNK, budget_bytes=STREAM_BUDGET_MB * 1024 * 1024,
+                 tile_table=None, material_fn=None, material_fix=None):
+        """region_chunks: chunks kept either side of the player's chunk in the play region.
+        tile_table: optional bytes.translate table applied to tiles as they load.
+        material_fn(tiles, x0, y0, w, h): materials (bytes) for a w x h block of tiles whose
+        corner is world cell (x0, y0), used when the file has no MATL layer.
+        material_fix(mats, tiles, x0, y0, w, h): optional in-place repair of a MATL chunk
+        (e.g. ids with no texture)."""
+        if chunk & (chunk - 1):
+            raise ValueError("chunk size must be a power of two")
+        self.file = mapfile.MapFile(path)
+        self.width, self.height = self.file.width, self.file.height
+        self._tiles = self.file.layer(mapfile.LAYER_TILES)
+        self._mats = self.file.layer(mapfile.LAYER_MATERIALS) if self.file.has(mapfile.LAYER_MATERIALS) else None
+        self.chunk = chunk
+        self.shift = chunk.bit_length() - 1
+        self.region_chunks = region_chunks
+        self.budget = budget_bytes
+        self.tile_table = tile_table
+        self.material_fn = material_fn
+        self.material_fix = material_fix
+        self.chunks = OrderedDict()  # (cx, cy) -> (tiles, materials, w, h)
+        self.pinned = set()  # chunks of the play region
+        self.held = set()    # extra chunks kept by hold()
+        self.bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.region = None  # (x0, y0, tiles TileGrid, materials TileGrid)
+        self._center = None
+
+    def close(self):
+        self.chunks.clear()
+        self.region = None
+        self._tiles = self._mats = None
+        self.file.close()
+
+    # ---- chunks ----
+    def _load(self, key):
+        cx, cy = key
+        n = self.chunk
+        x0 = cx * n; y0 = cy * n
+        w = min(n, self.width - x0); h = min(n, self.height - y0)
+        W = self.width
+        tiles = bytearray(w * h)
+        for r in range(h):
+            s = (y0 + r) * W + x0
+            tiles[r * w:(r + 1) * w] = self._tiles[s:s + w]
+        if self.tile_table is not None:
+            tiles = tiles.translate(self.tile_table)
+        if self._mats is not None:
+            mats = bytearray(w * h)
+            for r in range(h):
+                s = (y0 + r) * W + x0
+                mats[r * w:(r + 1) * w] = self._mats[s:s + w]
+            if self.material_fix is not None:
+                self.material_fix(mats, tiles, x0, y0, w, h)
+        elif self.material_fn is not None:
+            mats = bytearray(self.material_fn(tiles, x0, y0, w, h))
+        else:
+            mats = bytearray(w * h)
+        entry = (tiles, mats, w, h)
+        self.chunks[key] = entry
+        self.bytes += 2 * w * h
+        self.loads += 1
+        return entry
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        entry = self.chunks.get(key)
+        if entry is None:
+            entry = self._load(key)
+            self._evict()
+        else:
+            self.chunks.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        chunks = self.chunks
+        keep = self.pinned | self.held
+        while self.bytes > self.budget and len(chunks) > len(keep):
+            for key in chunks:
+                if key not in keep:
+                    break
+            else:
+                return
+            tiles = chunks.pop(key)[0]
+            self.bytes -= 2 * len(tiles)
+            self.evictions += 1
+
+    def in_bounds(self, cx, cy):
+        n = self.chunk
+        return 0 <= cx and 0 <= cy and cx * n < self.width and cy * n < self.height
+
+    # ---- cells ----
+    def tile(self, x, y):
+        """Tile id at (x, y) in world cells (caller checks bounds)."""
+        s = self.shift
+        entry = self.chunks.get((x >> s, y >> s))
+        if entry is None:
+            entry = self.get_chunk(x >> s, y >> s)
+        m = self.chunk - 1
+        return entry[0][(y & m) * entry[2] + (x & m)]
+
+    def tiles_many(self, xs, ys):
+        """Tile ids at world cells xs, ys (int arrays, needs numpy); out of bounds reads as wall."""
+        out = np.ones(len(xs), dtype=np.uint8)
+        idx = np.flatnonzero((xs >= 0) & (ys >= 0) & (xs < self.width) & (ys < self.height))
+        if not idx.size:
+            return out
+        s = self.shift; m = self.chunk - 1
+        x = xs[idx]; y = ys[idx]
+        keys = (y >> s) * ((self.width >> s) + 1) + (x >> s)
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        for group in np.split(order, bounds):
+            gx = x[group]; gy = y[group]
+            tiles, _, w, h = self.get_chunk(int(gx[0]) >> s, int(gy[0]) >> s)
+            out[idx[group]] = np.frombuffer(tiles, dtype=np.uint8).reshape(h, w)[gy & m, gx & m]
+        return out
+
+    def hold(self, keys):
+        """Keep the chunks at keys ((cx, cy) pairs) resident, beside the play region, until
+        the next hold(); loads the ones not in memory yet."""
+        self.held = {k for k in keys if self.in_bounds(*k)}
+        for key in self.held:
+            if key not in self.chunks:
+                self._load(key)
+        self._evict()
+
+    def first_floor(self):
+        """First interior floor cell in row-major order, scanned straight from the file."""
+        W = self.width
+        src = self._tiles
+        for y in range(1, self.height - 1):
+            x = bytes(src[y * W + 1:y * W + W - 1]).find(0)
+            if x >= 0:
+                return x + 1, y
+        return None
+
+    # ---- region ----
+    def update(self, px, py, vx=0.0, vy=0.0):
+        """Re-centre the play region on the chunk holding (px, py) and prefetch ahead along
+        (vx, vy). Returns True when the region was rebuilt."""
+        cx = int(px) >> self.shift; cy = int(py) >> self.shift
+        rebuilt = False
+        if (cx, cy) != self._center or self.region is None:
+            self._build_region(cx, cy)
+            rebuilt = True
+        if vx or vy:
+            self._prefetch(cx, cy, vx, vy)
+        return rebuilt
+
+    def _build_region(self, cx, cy):
+        R = self.region_chunks
+        n = self.chunk
+        keys = [(x, y) for y in range(cy - R, cy + R + 1) for x in range(cx - R, cx + R + 1) if self.in_bounds(x, y)]
+        self.pinned = set(keys)
+        x0 = min(k[0] for k in keys) * n; y0 = min(k[1] for k in keys) * n
+        x1 = min(self.width, (max(k[0] for k in keys) + 1) * n)
+        y1 = min(self.height, (max(k[1] for k in keys) + 1) * n)
+        rw = x1 - x0; rh = y1 - y0
+        tiles = bytearray(rw * rh); mats = bytearray(rw * rh)
+        for key in keys:
+            t, m, w, h = self.get_chunk(*key)
+            ox = key[0] * n - x0; oy = key[1] * n - y0
+            for r in range(h):
+                d = (oy + r) * rw + ox
+                tiles[d:d + w] = t[r * w:(r + 1) * w]
+                mats[d:d + w] = m[r * w:(r + 1) * w]
+        self._evict()
+        self.region = (x0, y0, TileGrid.from_buffer(rw, rh, tiles), TileGrid.from_buffer(rw, rh, mats))
+        self._center = (cx, cy)
+
+    def _prefetch(self, cx, cy, vx, vy):
+        """Load the ring of chunks just past the region edge the player is heading for."""
+        R = self.region_chunks + 1
+        ahead = []
+        if abs(vx) >= abs(vy) * 0.5:
+            sx = R if vx > 0 else -R
+            ahead += [(cx + sx, cy + dy) for dy in range(-R, R + 1)]
+        if abs(vy) >= abs(vx) * 0.5:
+            sy = R if vy > 0 else -R
+            ahead += [(cx + dx, cy + sy) for dx in range(-R, R + 1)]
+        budget = STREAM_PREFETCH
+        for key in ahead:
+            if budget <= 0:
+                break
+            if key not in self.chunks and self.in_bounds(*key):
+                self._load(key)
+                self.prefetched += 1
+                budget -= 1
+        self._evict()
+
+    def stats(self):
+        return {"resident": len(self.chunks), "held": len(self.held), "bytes": self.bytes, "loads": self.loads,
+                "evictions": self.evictions, "prefetched": self.prefetched}
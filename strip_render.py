@@ -0,0 +1,283 @@
+"""Parallel wall renderer: worker processes draw vertical strips into shared memory.
+
+The view is split into one strip per worker. Every worker casts its strip's
+rays and writes textured columns straight into a shared framebuffer and
+z-buffer (multiprocessing.shared_memory), so the main process only has to
+upload the finished buffer. Workers keep their own read-only copy of the tile
+and material grids, refreshed through update_map() whenever the map changes.
+
+Requires NumPy. Benchmark against game.cast_and_draw, the single-process
+renderer the pool has to beat, and see how throughput scales with worker count:
+
+    python strip_render.py --bench [--map map2.txt] [--frames 120]
+"""
+import atexit
+import math
+import os
+import queue
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import raycast
+
+np = raycast.np
+
+CEIL_COLOR = (18, 18, 26)
+FLOOR_COLOR = (38, 38, 46)
+STRIP_TIMEOUT = 2.0  # seconds to wait for the workers before giving up on a frame
+STRIP_COLUMN_CACHE = 8192  # prescaled columns kept per worker (~view_h * 3 bytes each)
+
+
+class StripRenderError(RuntimeError):
+    """A worker died, raised or stopped answering; the pool is unusable."""
+
+
+def atlas_tables(atlas):
+    """(pixels, slots) for a TextureAtlas: pixels is (W, H, 3) uint8 and
+    slots[material, shaded, level] holds the slot's (x, y) in pixels."""
+    import pygame
+    pixels = pygame.surfarray.array3d(atlas.surface)
+    slots = np.zeros((len(atlas.names), 2, atlas.levels, 2), dtype=np.int32)
+    for mat in range(len(atlas.names)):
+        for shaded in (0, 1):
+            for level in range(atlas.levels):
+                r = atlas.slot_rect(mat, shaded, level)
+                slots[mat, shaded, level] = (r.x, r.y)
+    return pixels, slots
+
+
+def render_strip(fb, zbuf, grid, materials, pixels, slots, tex_size,
+                 px, py, ang, fov, view_w, view_h, x0, x1, max_dist, cache):
+    """Cast and draw view columns x0..x1 into fb[x, y] (a (W, H, 3) array).
+
+    Like game.cast_and_draw, every wall column is one slice copy of a prescaled
+    texture column; cache ({} owned by the caller, one per atlas) keeps them."""
+    angles = raycast.ray_angles(ang, fov, view_w)[x0:x1]
+    hits = raycast.cast_angles(grid, px, py, angles, max_dist, tex_size)
+    zbuf[x0:x1] = hits.dist
+    out = fb[x0:x1, :view_h]
+    half = view_h // 2
+    out[:, :half] = CEIL_COLOR
+    out[:, half:] = FLOOR_COLOR
+    cols = np.nonzero(hits.hit)[0]
+    if not cols.size:
+        return
+
+    line_h = np.maximum((view_h / hits.dist[cols]).astype(np.int64), 1)
+    # same rule as TextureAtlas.mip_level: smallest mip still >= the column height
+    levels = slots.shape[2]
+    level = np.clip(np.floor(np.log2(tex_size / line_h)), 0, levels - 1).astype(np.int64)
+    mat = materials[hits.map_y[cols], hits.map_x[cols]]
+    slot = slots[mat, hits.side[cols], level]
+    u = slot[:, 0] + (hits.tex_x[cols] >> level)
+    for x, h, lv, ux, vy in zip(cols.tolist(), line_h.tolist(), level.tolist(), u.tolist(), slot[:, 1].tolist()):
+        key = (ux, vy, h, view_h)  # atlas position identifies material, shade, mip and texel column
+        col = cache.get(key)
+        if col is None:
+            if len(cache) >= STRIP_COLUMN_CACHE:
+                cache.clear()
+            y0, rows = _column_rows(h, tex_size >> lv, view_h)
+            col = cache[key] = (y0, pixels[ux, vy + rows])
+        y0, px_col = col
+        out[x, y0:y0 + len(px_col)] = px_col
+
+
+def _column_rows(line_h, size, view_h):
+    """(first screen row, texel row per visible screen row) for a line_h-tall column."""
+    top = view_h // 2 - line_h // 2
+    y0 = max(0, top); y1 = min(view_h, top + line_h)
+    return y0, np.minimum((np.arange(y0 - top, y1 - top) * size) // line_h, size - 1)
+
+
+def _worker_main(cmd_q, done_q, fb_name, zb_name, max_w, max_h, pixels, slots, tex_size):
+    # workers share the parent's resource tracker, so attaching here never unlinks the blocks
+    fb_shm = shared_memory.SharedMemory(name=fb_name)
+    zb_shm = shared_memory.SharedMemory(name=zb_name)
+    fb = np.ndarray((max_w, max_h, 3), dtype=np.uint8, buffer=fb_shm.buf)
+    zbuf = np.ndarray((max_w,), dtype=np.float64, buffer=zb_shm.buf)
+    grid = materials = None
+    cache = {}
+    while True:
+        msg = cmd_q.get()
+        kind = msg[0]
+        if kind == "stop":
+            break
+        try:
+            if kind == "frame":
+                _, frame_id, px, py, ang, fov, view_w, view_h, x0, x1, max_dist = msg
+                if grid is not None:
+                    render_strip(fb, zbuf, grid, materials, pixels, slots, tex_size,
+                                 px, py, ang, fov, view_w, view_h, x0, x1, max_dist, cache)
+                done_q.put(("frame", frame_id))
+            elif kind == "map":
+                _, name, w, h, rev = msg
+                shm = shared_memory.SharedMemory(name=name)
+                both = np.ndarray((2, h, w), dtype=np.uint8, buffer=shm.buf)
+                grid = both[0].copy(); materials = both[1].copy()
+                del both
+                shm.close()
+                done_q.put(("map", rev))
+        except Exception as exc:  # report instead of dying silently; the parent shuts the pool down
+            done_q.put(("error", f"{kind}: {exc!r}"))
+    del fb, zbuf
+    fb_shm.close(); zb_shm.close()
+
+
+class StripRenderer:
+    """Pool of strip workers sharing one framebuffer of up to max_w x max_h."""
+
+    def __init__(self, workers, max_w, max_h, pixels, slots, tex_size):
+        if np is None:
+            raise RuntimeError("parallel rendering needs numpy")
+        self.workers = max(1, workers)
+        self.max_w = max_w; self.max_h = max_h
+        self.tex_size = tex_size
+        self.map_rev = None
+        self._frame_id = 0
+        self._fb_shm = shared_memory.SharedMemory(create=True, size=max_w * max_h * 3)
+        self._zb_shm = shared_memory.SharedMemory(create=True, size=max_w * 8)
+        self.fb = np.ndarray((max_w, max_h, 3), dtype=np.uint8, buffer=self._fb_shm.buf)
+        self.zbuf = np.ndarray((max_w,), dtype=np.float64, buffer=self._zb_shm.buf)
+        # fork keeps worker startup cheap and avoids re-importing the game module
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        self._done = ctx.Queue()
+        self._cmds = []
+        self._procs = []
+        for _ in range(self.workers):
+            q = ctx.Queue()
+            p = ctx.Process(target=_worker_main, daemon=True,
+                            args=(q, self._done, self._fb_shm.name, self._zb_shm.name,
+                                  max_w, max_h, pixels, slots, tex_size))
+            p.start()
+            self._cmds.append(q); self._procs.append(p)
+        atexit.register(self.close)
+
+    def update_map(self, tiles, materials, rev):
+        """Publish a new map to every worker (tiles/materials: (h, w) uint8 arrays)."""
+        h, w = tiles.shape
+        shm = shared_memory.SharedMemory(create=True, size=2 * w * h)
+        both = np.ndarray((2, h, w), dtype=np.uint8, buffer=shm.buf)
+        both[0] = tiles; both[1] = materials
+        del both
+        try:
+            for q in self._cmds:
+                q.put(("map", shm.name, w, h, rev))
+            self._wait("map", rev)
+        finally:
+            shm.close(); shm.unlink()
+        self.map_rev = rev
+
+    def render(self, px, py, ang, fov, view_w, view_h, max_dist):
+        """Render one frame; returns (fb view (view_w, view_h, 3), zbuf view)."""
+        view_w = min(view_w, self.max_w); view_h = min(view_h, self.max_h)
+        self._frame_id += 1
+        bounds = [view_w * i // self.workers for i in range(self.workers + 1)]
+        for q, x0, x1 in zip(self._cmds, bounds, bounds[1:]):
+            q.put(("frame", self._frame_id, px, py, ang, fov, view_w, view_h, x0, x1, max_dist))
+        self._wait("frame", self._frame_id)
+        return self.fb[:view_w, :view_h], self.zbuf[:view_w]
+
+    def _wait(self, kind, tag, timeout=STRIP_TIMEOUT):
+        """Collect every worker's (kind, tag) reply; StripRenderError when a worker reports
+        an error, exits or nothing arrives within timeout."""
+        pending = self.workers
+        deadline = time.monotonic() + timeout
+        while pending:
+            try:
+                k, t = self._done.get(timeout=0.1)
+            except queue.Empty:
+                dead = [p.pid for p in self._procs if not p.is_alive()]
+                if dead:
+                    raise StripRenderError(f"strip worker(s) {dead} exited")
+                if time.monotonic() > deadline:
+                    raise StripRenderError(f"no {kind} reply from {pending} worker(s) in {timeout:.1f}s")
+                continue
+            if k == "error":
+                raise StripRenderError(f"strip worker failed on {t}")
+            if k == kind and t == tag:
+                pending -= 1
+
+    def close(self):
+        if not self._procs:
+            return
+        for q in self._cmds:
+            q.put(("stop",))
+        for p in self._procs:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        del self.fb, self.zbuf
+        for shm in (self._fb_shm, self._zb_shm):
+            shm.close(); shm.unlink()
+
+
+# =========================
+# Benchmark
+# =========================
+def bench(map_path="map2.txt", frames=120, width=960, height=600, counts=None):
+    """ms/frame for game.cast_and_draw (the baseline), this module's kernel in-process
+    and the worker pool (including the blit_array upload), on a game.py map."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import game
+    game.init_display()
+    game.load_level(map_path); game.reset_run_from_map()
+    target = pygame.Surface((width, height)).convert()
+    tiles = game.tile_array(); materials = game.MATERIAL_MAP.array()
+    pixels, slots = atlas_tables(game.ATLAS)
+    px, py = game.view_pos.x, game.view_pos.y
+    fov, tex_size, max_dist = game.FOV, game.TEX_SIZE, game.MAX_VIEW_DIST
+    cpus = os.cpu_count() or 1
+    counts = counts or sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)) | {1})
+
+    def timed(draw):
+        draw(0)  # warm-up (caches, first-call overhead)
+        t0 = time.perf_counter()
+        for i in range(frames):
+            draw(i)
+        return (time.perf_counter() - t0) * 1000 / frames
+
+    zbuf = np.zeros(width)
+
+    def inline(i):
+        game.view_ang = i * 0.05
+        game.cast_and_draw(zbuf, target)
+    base_ms = timed(inline)
+
+    fb = np.zeros((width, height, 3), dtype=np.uint8); cache = {}
+
+    def kernel(i):
+        render_strip(fb, zbuf, tiles, materials, pixels, slots, tex_size,
+                     px, py, i * 0.05, fov, width, height, 0, width, max_dist, cache)
+        pygame.surfarray.blit_array(target, fb)
+    rows = [("cast_and_draw", base_ms), ("kernel", timed(kernel))]
+    for n in counts:
+        r = StripRenderer(n, width, height, pixels, slots, tex_size)
+        try:
+            r.update_map(tiles, materials, 0)
+
+            def pool(i):
+                out, _ = r.render(px, py, i * 0.05, fov, width, height, max_dist)
+                pygame.surfarray.blit_array(target, out)
+            rows.append((f"{n} worker{'s' if n > 1 else ''}", timed(pool)))
+        finally:
+            r.close()
+    print(f"map {map_path} {tiles.shape[1]}x{tiles.shape[0]}  view {width}x{height}  frames {frames}")
+    print(f"{'':>14} {'ms/frame':>10} {'fps':>8} {'vs inline':>10}")
+    for name, ms in rows:
+        print(f"{name:>14} {ms:10.2f} {1000 / ms:8.1f} {base_ms / ms:10.2f}")
+
+
+if __name__ == "__main__":
+    if np is None:
+        sys.exit("strip_render needs numpy")
+    args = sys.argv[1:]
+    if "--bench" in args:
+        def opt(name, default):
+            return type(default)(args[args.index(name) + 1]) if name in args else default
+        bench(opt("--map", "map2.txt"), opt("--frames", 120), opt("--width", 960), opt("--height", 600))
+    else:
+        print(__doc__)
@@ -0,0 +1,124 @@
+"""Behaviour tests for editor_journal.py (run with `python -m pytest -q`)."""
+import threading
+
+from editor_journal import BackgroundSaver, Journal, encode_runs
+
+
+class Level:
+    """Minimal editor model: flat tiles/materials and {(x, y): entity} placements."""
+
+    def __init__(self, n=64, max_bytes=1 << 20):
+        self.tiles = bytearray(n); self.mats = bytearray(n); self.ents = {}
+        self.journal = Journal(lambda i: (self.tiles[i], self.mats[i]), lambda x, y: self.ents.get((x, y)), max_bytes)
+
+    def paint(self, cells, tile, mat=0):
+        for i in cells:
+            self.journal.tile(i)
+            self.tiles[i] = tile; self.mats[i] = mat
+        return self.journal.end()
+
+    def apply(self, cmd, new):
+        """What game.editor_undo does with a command."""
+        for i, t, m in zip(cmd.cells(), cmd.new_tiles if new else cmd.old_tiles, cmd.new_mats if new else cmd.old_mats):
+            self.tiles[i] = t; self.mats[i] = m
+        for x, y, before, after in cmd.entities:
+            state = after if new else before
+            if state is None: self.ents.pop((x, y), None)
+            else: self.ents[(x, y)] = state
+
+
+def test_encode_runs():
+    assert list(encode_runs([])) == []
+    assert list(encode_runs([5])) == [5, 1]
+    assert list(encode_runs([0, 1, 2, 7, 9, 10])) == [0, 3, 7, 1, 9, 2]
+
+
+def test_command_keeps_changed_cells_in_run_order():
+    lv = Level()
+    lv.tiles[4] = 1; lv.mats[4] = 2
+    cmd = lv.paint([12, 10, 11, 4, 30], 1, 2)
+    assert list(cmd.runs) == [10, 3, 30, 1]  # cell 4 already held this wall
+    assert list(cmd.cells()) == [10, 11, 12, 30]
+    assert cmd.old_tiles == bytes(4) and cmd.new_tiles == b"\x01" * 4 and cmd.new_mats == b"\x02" * 4
+    assert lv.paint([4], 1, 2) is None and lv.journal.end() is None
+
+
+def test_undo_redo_order():
+    lv = Level()
+    states = [bytes(lv.tiles)]
+    for t, cells in ((1, range(0, 8)), (2, range(4, 12)), (3, [20])):
+        lv.paint(cells, t)
+        states.append(bytes(lv.tiles))
+    j = lv.journal
+    for want in reversed(states[:-1]):
+        lv.apply(j.undo(), new=False)
+        assert bytes(lv.tiles) == want
+    assert j.undo() is None
+    for want in states[1:]:
+        lv.apply(j.redo(), new=True)
+        assert bytes(lv.tiles) == want
+    assert j.redo() is None
+    lv.apply(j.undo(), new=False); lv.apply(j.undo(), new=False)
+    lv.paint([40], 5)  # a new edit drops the redo branch
+    assert j.redo() is None and len(j.done) == 2
+
+
+def test_entity_changes():
+    lv = Level()
+    j = lv.journal
+    j.entity(1, 1); lv.ents[(1, 1)] = "grunt"
+    j.entity(2, 2)  # touched but unchanged: not recorded
+    cmd = j.end()
+    assert cmd.entities == [(1, 1, None, "grunt")] and list(cmd.runs) == []
+    lv.apply(j.undo(), new=False)
+    assert lv.ents == {}
+    lv.apply(j.redo(), new=True)
+    assert lv.ents == {(1, 1): "grunt"}
+
+
+def test_trims_oldest_to_memory_cap():
+    lv = Level(n=4096, max_bytes=2000)
+    j = lv.journal
+    for k in range(40):
+        lv.paint(range(k * 64, k * 64 + 64, 2), 1 + k % 2)  # 32 single-cell runs each
+    assert j.bytes <= j.max_bytes and 1 <= len(j.done) < 40
+    assert j.bytes == sum(c.nbytes for c in j.done)
+    assert list(j.done[-1].runs)[0] == 39 * 64  # newest kept
+    big = lv.paint(range(0, 4096, 2), 7)  # larger than the cap on its own
+    assert list(j.done) == [big]
+
+
+def test_dirty_tracking():
+    lv = Level()
+    j = lv.journal
+    assert not j.dirty
+    lv.paint([1], 1)
+    assert j.dirty
+    j.mark_saved()
+    assert not j.dirty
+    lv.paint([2], 1)
+    j.mark_saved(j.rev - 1)  # a save that finished after a newer edit
+    assert j.dirty
+    j.mark_saved(0)  # an older save landing late never goes backwards
+    assert j.dirty and j.saved_rev == j.rev - 1
+    j.mark_saved()
+    lv.apply(j.undo(), new=False)
+    assert j.dirty
+    j.clear()
+    assert not j.dirty and not j.done and not j.undone and j.bytes == 0
+
+
+def test_background_saver_coalesces():
+    release = threading.Event()
+    saved = []
+
+    def save(snap):
+        release.wait(5)
+        saved.append(snap)
+
+    s = BackgroundSaver(save)
+    s.submit(1)
+    s.submit(2); s.submit(3)  # queued while 1 is writing: only the latest is kept
+    release.set()
+    assert s.wait(5)
+    assert saved == [1, 3] and s.saves == 2
@@ -0,0 +1,83 @@
+"""Behaviour tests for entity_table.py (run with `python -m pytest -q`)."""
+import struct
+
+import pytest
+
+import entity_table
+from entity_table import KIND_AMMO, KIND_ENEMY, KIND_MEDKIT, KIND_SPAWN, EntityTable
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if entity_table.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(entity_table, "np", None)
+    return request.param
+
+
+def sample():
+    return EntityTable.from_cells({(3, 1): "grunt", (1, 2): "brute", (2, 2): "grunt"},
+                                  {(4, 1)}, {(1, 1), (9, 9)}, spawn=(2, 1))
+
+
+def rows(t):
+    return sorted(zip(t.kind, (t.types[e] if k == KIND_ENEMY else None for k, e in zip(t.kind, t.etype)), t.x, t.y))
+
+
+def test_binary_round_trip(tmp_path, backend):
+    t = sample()
+    t.save(str(tmp_path / "e.mwe"))
+    back = EntityTable.load(str(tmp_path / "e.mwe"))
+    assert back.types == t.types
+    assert (list(back.kind), list(back.etype), list(back.x), list(back.y)) == \
+           (list(t.kind), list(t.etype), list(t.x), list(t.y))
+    assert back.to_cells() == t.to_cells()
+
+
+def test_binary_rejects_bad_files(tmp_path):
+    path = tmp_path / "e.mwe"
+    sample().save(str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 4, entity_table.VERSION + 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="newer"):
+        EntityTable.load(str(path))
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError, match="not an entity file"):
+        EntityTable.load(str(path))
+    sample().save(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="rows"):
+        EntityTable.load(str(path))
+
+
+def test_text_round_trip(tmp_path, backend):
+    t = sample()
+    t.save_text(str(tmp_path / "e.txt"))
+    lines = (tmp_path / "e.txt").read_text().splitlines()
+    assert lines[0] == "spawn 2 1" and "enemy brute 1 2" in lines
+    back = EntityTable.load_text(str(tmp_path / "e.txt"))
+    assert rows(back) == rows(t)
+    assert back.to_cells() == t.to_cells()
+
+
+def test_text_defaults_and_junk(tmp_path):
+    (tmp_path / "e.txt").write_text("enemy 1 1\nammo 2 x\nbogus 1 1\n\nmedkit 3 3\nspawn 1\n")
+    t = EntityTable.load_text(str(tmp_path / "e.txt"), default_type="scout")
+    assert rows(t) == [(KIND_ENEMY, "scout", 1, 1), (KIND_MEDKIT, None, 3, 3)]
+
+
+def test_on_floor_filters_walls_and_out_of_bounds(backend):
+    tiles = [[1, 1, 1, 1, 1],
+             [1, 0, 0, 0, 1],
+             [1, 0, 1, 0, 1]]
+    if backend == "numpy":
+        tiles = entity_table.np.array(tiles, dtype=entity_table.np.uint8)
+    kept = sample().on_floor(tiles, 5, 3)
+    assert kept.types == sample().types
+    assert rows(kept) == [(KIND_ENEMY, "brute", 1, 2), (KIND_ENEMY, "grunt", 3, 1),
+                          (KIND_MEDKIT, None, 1, 1), (KIND_SPAWN, None, 2, 1)]
+    assert (4, 1) not in kept.to_cells()[1] and rows(kept.take([])) == []
+    assert kept.select(KIND_AMMO) == ([], [], [])
@@ -0,0 +1,73 @@
+"""Behaviour tests for mapfile.py (run with `python -m pytest -q`)."""
+import struct
+from array import array
+
+import pytest
+
+import mapfile
+
+
+def write_sample(path, w=5, h=3):
+    tiles = bytes(range(w * h))
+    heights = array("f", (i * 0.5 for i in range(w * h)))
+    mapfile.write_map(str(path), w, h, {mapfile.LAYER_TILES: ("B", tiles), mapfile.LAYER_HEIGHTS: ("f", heights)})
+    return tiles, heights
+
+
+def test_header_and_layers_round_trip(tmp_path):
+    path = tmp_path / "m.mwm"
+    tiles, heights = write_sample(path)
+    with mapfile.MapFile(str(path)) as m:
+        assert (m.version, m.width, m.height) == (mapfile.VERSION, 5, 3)
+        assert m.has(mapfile.LAYER_TILES) and m.has(mapfile.LAYER_HEIGHTS) and not m.has(mapfile.LAYER_LIGHTS)
+        assert bytes(m.layer(mapfile.LAYER_TILES)) == tiles
+        assert m.layer(mapfile.LAYER_HEIGHTS).tolist() == heights.tolist()
+        assert m.rows(mapfile.LAYER_TILES)[2] == list(tiles[10:15])
+        for _, off, _ in m.layers.values():
+            assert off % mapfile.ALIGN == 0
+    assert not (tmp_path / "m.mwm.tmp").exists()
+
+
+def test_layer_size_checked_on_write(tmp_path):
+    with pytest.raises(ValueError):
+        mapfile.write_map(str(tmp_path / "m.mwm"), 4, 4, {mapfile.LAYER_TILES: ("B", bytes(15))})
+    with pytest.raises(ValueError):
+        mapfile.write_map(str(tmp_path / "m.mwm"), 4, 4, {mapfile.LAYER_TILES: ("i", bytes(64))})
+
+
+def test_newer_version_rejected(tmp_path):
+    path = tmp_path / "m.mwm"
+    write_sample(path)
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 4, mapfile.VERSION + 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="newer"):
+        mapfile.MapFile(str(path))
+
+
+def test_layer_size_checked_on_read(tmp_path):
+    path = tmp_path / "m.mwm"
+    write_sample(path)
+    data = bytearray(path.read_bytes())
+    name, code, off, n = mapfile.LAYER.unpack_from(data, mapfile.HEADER.size)
+    mapfile.LAYER.pack_into(data, mapfile.HEADER.size, name, code, off, n - 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="expected 5x3"):
+        mapfile.MapFile(str(path))
+
+
+@pytest.mark.parametrize("data", [b"", b"MWMP", b"XXXX" + bytes(16)])
+def test_not_a_map_file(tmp_path, data):
+    path = tmp_path / "bad.mwm"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="not a map file"):
+        mapfile.MapFile(str(path))
+
+
+def test_ascii_convert_round_trip(tmp_path):
+    src = tmp_path / "m.txt"
+    src.write_text("11111\n10201\n1x0\n")
+    assert mapfile.read_ascii(str(src)) == (5, 3, bytearray(b"\x01\x01\x01\x01\x01\x01\x00\x02\x00\x01\x01\x01\x00\x01\x01"))
+    mapfile.convert(str(src), str(tmp_path / "m.mwm"))
+    mapfile.convert(str(tmp_path / "m.mwm"), str(tmp_path / "back.txt"))
+    assert (tmp_path / "back.txt").read_text() == "11111\n10201\n11011\n"
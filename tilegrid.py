@@ -0,0 +1,136 @@
+"""Flat row-major grid: one contiguous buffer instead of a list of row lists.
+
+Tiles/materials live in a bytearray (one byte per cell) and heights in a
+float32 array('f'), indexed as data[y * stride + x]. grid[y] returns a cached
+memoryview of row y, so existing grid[y][x] reads and writes keep working,
+and array() hands the raycaster, collision and minimap a zero-copy NumPy view
+of the same memory.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+NP_DTYPES = {"B": np.uint8, "f": np.float32} if np is not None else {}
+
+
+def _alloc(typecode, n):
+    if typecode == "B":
+        return bytearray(n)
+    return array(typecode, bytes(n * array(typecode).itemsize))
+
+
+class TileGrid:
+    def __init__(self, width, height, typecode="B", fill=0):
+        self.typecode = typecode
+        self._set_data(width, height, _alloc(typecode, width * height))
+        if fill:
+            self.fill(fill)
+
+    @classmethod
+    def from_rows(cls, rows, typecode="B"):
+        """Copy a list of equal-length rows (or another TileGrid)."""
+        g = cls(0, 0, typecode)
+        g[:] = rows
+        return g
+
+    @classmethod
+    def from_buffer(cls, width, height, buf, typecode="B"):
+        """Copy width*height values out of any buffer of the same item type."""
+        g = cls(0, 0, typecode)
+        g._load(width, height, buf)
+        return g
+
+    @classmethod
+    def wrap(cls, width, height, data, typecode="B"):
+        """Grid over an existing bytearray / array(typecode) without copying it."""
+        if len(data) != width * height:
+            raise ValueError(f"expected {width * height} values, got {len(data)}")
+        g = cls(0, 0, typecode)
+        g._set_data(width, height, data)
+        return g
+
+    def adopt(self, other):
+        """Take over other's buffer and size without copying (other shouldn't be used after)."""
+        if other.typecode != self.typecode:
+            raise TypeError(f"can't adopt a {other.typecode!r} grid into a {self.typecode!r} grid")
+        self._set_data(other.width, other.height, other.data)
+
+    def _set_data(self, width, height, data):
+        # a fresh buffer on every reshape: live row views / ndarrays pin the old one
+        self.width = width
+        self.height = height
+        self.stride = width
+        self.data = data
+        view = memoryview(data)
+        self._rows = [view[y * width:(y + 1) * width] for y in range(height)]
+        self._array = None
+
+    def _load(self, width, height, buf):
+        if self.typecode == "B":
+            data = bytearray(buf)
+        else:
+            data = array(self.typecode)
+            data.frombytes(memoryview(buf).cast("B"))
+        if len(data) != width * height:
+            raise ValueError(f"expected {width * height} values, got {len(data)}")
+        self._set_data(width, height, data)
+
+    # ---- list-of-rows compatibility ----
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, y):
+        return self._rows[y]
+
+    def __setitem__(self, key, rows):
+        """grid[:] = rows replaces the whole grid (and may change its size)."""
+        if key != slice(None):
+            raise TypeError("assign whole rows through grid[y][x] or replace the grid with grid[:]")
+        if isinstance(rows, TileGrid):
+            self._load(rows.width, rows.height, rows.data)
+            return
+        h = len(rows); w = len(rows[0]) if h else 0
+        data = _alloc(self.typecode, w * h)
+        for y, row in enumerate(rows):
+            if len(row) != w:
+                raise ValueError(f"row {y} has {len(row)} cells, expected {w}")
+            data[y * w:(y + 1) * w] = (bytes(row) if self.typecode == "B" else array(self.typecode, row))
+        self._set_data(w, h, data)
+
+    def __eq__(self, other):
+        if isinstance(other, TileGrid):
+            return (self.width, self.height, self.data) == (other.width, other.height, other.data)
+        return self.tolist() == other
+
+    def tolist(self):
+        return [row.tolist() for row in self._rows]
+
+    # ---- flat access ----
+    def get(self, x, y):
+        return self.data[y * self.stride + x]
+
+    def set(self, x, y, v):
+        self.data[y * self.stride + x] = v
+
+    def fill(self, v):
+        if self.typecode == "B":
+            self.data[:] = bytes((v,)) * len(self.data)
+        else:
+            self.data[:] = array(self.typecode, (v,)) * len(self.data)
+
+    @property
+    def nbytes(self):
+        return memoryview(self.data).nbytes
+
+    def array(self):
+        """Zero-copy (height, width) ndarray over the grid's buffer (needs numpy);
+        writes through either side are visible to the other."""
+        if self._array is None:
+            self._array = np.frombuffer(self.data, dtype=NP_DTYPES[self.typecode]).reshape(self.height, self.width)
+        return self._array